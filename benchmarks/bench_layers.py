@@ -0,0 +1,140 @@
+"""Benchmark of every preprocessing and augmentation layer in isolation.
+
+Each layer transforms a synthetic image of every resolution, channel count and dtype, and the time of its
+_apply_layer() call is written to a JSON file. Combinations that a layer does not support are recorded with the error.
+With --fanout, only the augmentation layers are timed, each of them producing that many outputs per image, which
+shows the per-output overhead on small images.
+
+Run it from the root of the repository with Hocrox installed:
+
+    python benchmarks/bench_layers.py --resolutions 224px 1080p --output layers.json
+    python benchmarks/bench_layers.py --compare layers.json
+    python benchmarks/bench_layers.py --resolutions 32px --fanout 50 --output fanout.json
+"""
+import argparse
+import random
+import sys
+
+import numpy as np
+
+from common import CHANNELS, DTYPES, add_common_arguments, compare_results, synthetic_image, time_call, write_results
+
+from hocrox.layer.augmentation.color import RandomBrightness, RandomChannelShift
+from hocrox.layer.augmentation.flip import RandomFlip, RandomHorizontalFlip, RandomVerticalFlip
+from hocrox.layer.augmentation.shift import RandomHorizontalShift, RandomVerticalShift
+from hocrox.layer.augmentation.transformation import RandomRotate, RandomZoom
+from hocrox.layer.preprocessing.blur import AverageBlur, BilateralBlur, GaussianBlur, MedianBlur
+from hocrox.layer.preprocessing.color import Brightness, ChannelShift, Grayscale, Rescale
+from hocrox.layer.preprocessing.flip import HorizontalFlip, VerticalFlip
+from hocrox.layer.preprocessing.shift import HorizontalShift, VerticalShift
+from hocrox.layer.preprocessing.transformation import Convolution, Crop, Padding, Resize, Rotate
+
+"""Layers to benchmark, created with representative parameters."""
+LAYERS = {
+    # Preprocessing layers
+    "average_blur": lambda: AverageBlur(kernel_size=(5, 5)),
+    "bilateral_blur": lambda: BilateralBlur(d=9, sigma_color=75, sigma_space=75),
+    "gaussian_blur": lambda: GaussianBlur(kernel_size=(5, 5), sigma_x=0),
+    "median_blur": lambda: MedianBlur(kernel_size=5),
+    "brightness": lambda: Brightness(level=1.5),
+    "channel_shift": lambda: ChannelShift(value=10),
+    "grayscale": lambda: Grayscale(),
+    "rescale": lambda: Rescale(rescale=1 / 255),
+    "horizontal_flip": lambda: HorizontalFlip(),
+    "vertical_flip": lambda: VerticalFlip(),
+    "horizontal_shift": lambda: HorizontalShift(by=0.2),
+    "vertical_shift": lambda: VerticalShift(by=0.2),
+    "convolution": lambda: Convolution(ddepth=-1, kernel=np.ones((5, 5), np.float32) / 25),
+    "crop": lambda: Crop(x=10, y=10, w=200, h=200),
+    "padding": lambda: Padding(top=10, bottom=10, left=10, right=10),
+    "resize": lambda: Resize(dim=(224, 224)),
+    "rotate": lambda: Rotate(angle=15.0),
+    # Augmentation layers, with a single output by default so the time is comparable to the preprocessing layers
+    "random_brightness": lambda outputs=1: RandomBrightness(low=0.5, high=1.5, number_of_outputs=outputs),
+    "random_channel_shift": lambda outputs=1: RandomChannelShift(low=1, high=10, number_of_outputs=outputs),
+    "random_flip": lambda outputs=1: RandomFlip(number_of_outputs=outputs),
+    "random_horizontal_flip": lambda outputs=1: RandomHorizontalFlip(number_of_outputs=outputs),
+    "random_vertical_flip": lambda outputs=1: RandomVerticalFlip(number_of_outputs=outputs),
+    "random_horizontal_shift": lambda outputs=1: RandomHorizontalShift(ratio=0.2, number_of_outputs=outputs),
+    "random_vertical_shift": lambda outputs=1: RandomVerticalShift(ratio=0.2, number_of_outputs=outputs),
+    "random_rotate": lambda outputs=1: RandomRotate(start_angle=-15.0, end_angle=15.0, number_of_outputs=outputs),
+    "random_zoom": lambda outputs=1: RandomZoom(start=0.8, end=1.0, number_of_outputs=outputs),
+}
+
+
+def benchmark_layer(name, resolution, channels, dtype, repeat, fanout=1):
+    """Time a single layer on a synthetic image.
+
+    Args:
+        name (str): Name of the layer, one of LAYERS.
+        resolution (str): Name of the resolution.
+        channels (int): Number of channels of the image.
+        dtype (str): Data type of the image.
+        repeat (int): Number of timed runs.
+        fanout (int, optional): Number of outputs of the augmentation layers. Defaults to 1.
+
+    Returns:
+        dict: Result of the benchmark.
+    """
+    result = {
+        "id": f"{name}/{resolution}/{channels}ch/{dtype}" + (f"/x{fanout}" if fanout > 1 else ""),
+        "layer": name,
+        "resolution": resolution,
+        "channels": channels,
+        "dtype": dtype,
+        "fanout": fanout,
+    }
+
+    layer = LAYERS[name](fanout) if fanout > 1 else LAYERS[name]()
+    image = synthetic_image(resolution, channels, dtype)
+
+    # Same random parameters on every run
+    random.seed(0)
+
+    try:
+        result.update(time_call(lambda: layer._apply_layer([image], "image.png"), repeat))
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {str(e).strip().splitlines()[-1]}"
+
+        return result
+
+    result["megapixels_per_second"] = image.shape[0] * image.shape[1] / 1000 / result["median_ms"]
+
+    return result
+
+
+def main():
+    """Run the benchmark of the layers."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_common_arguments(parser, "bench_layers.json")
+    parser.add_argument("--layers", nargs="+", default=list(LAYERS), choices=list(LAYERS))
+    parser.add_argument("--channels", nargs="+", type=int, default=list(CHANNELS), choices=list(CHANNELS))
+    parser.add_argument("--dtypes", nargs="+", default=list(DTYPES), choices=list(DTYPES))
+    parser.add_argument(
+        "--fanout", type=int, default=1, help="Number of outputs of the augmentation layers, the others are skipped"
+    )
+    args = parser.parse_args()
+
+    results = []
+    layers = [name for name in args.layers if args.fanout == 1 or name.startswith("random_")]
+
+    for name in layers:
+        for resolution in args.resolutions:
+            for channels in args.channels:
+                for dtype in args.dtypes:
+                    result = benchmark_layer(name, resolution, channels, dtype, args.repeat, args.fanout)
+                    results.append(result)
+
+                    if "error" in result:
+                        print(f"{result['id']:<50} {'unsupported':>12}  {result['error']}")
+                    else:
+                        print(f"{result['id']:<50} {result['median_ms']:>9.3f} ms")
+
+    write_results(args.output, "layers", results)
+
+    if args.compare and compare_results(args.compare, results, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
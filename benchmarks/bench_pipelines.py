@@ -0,0 +1,163 @@
+"""Benchmark of representative end to end models, from Read to Save.
+
+Synthetic JPEG images are written to a temporary directory, on tmpfs when available, and every model transforms them
+with each executor, with and without .compile(). The time per image is written to a JSON file.
+
+Run it from the root of the repository with Hocrox installed:
+
+    python benchmarks/bench_pipelines.py --resolutions 1080p --images 32 --output pipelines.json
+    python benchmarks/bench_pipelines.py --compare pipelines.json
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+
+from common import add_common_arguments, compare_results, fast_temp_dir, time_call, write_images, write_results
+
+from hocrox.layer import Read, Save
+from hocrox.layer.augmentation.color import RandomBrightness, RandomChannelShift
+from hocrox.layer.augmentation.flip import RandomFlip
+from hocrox.layer.augmentation.shift import RandomHorizontalShift
+from hocrox.layer.augmentation.transformation import RandomRotate, RandomZoom
+from hocrox.layer.preprocessing.color import Grayscale, Rescale
+from hocrox.layer.preprocessing.transformation import Resize
+from hocrox.model import Model
+
+"""Layers of the models to benchmark, between the Read and the Save layers."""
+PIPELINES = {
+    "preprocessing": lambda: [
+        Resize(dim=(224, 224)),
+        Grayscale(),
+        Rescale(rescale=1 / 255),
+    ],
+    "augmentation": lambda: [
+        Resize(dim=(224, 224)),
+        RandomRotate(start_angle=-10.0, end_angle=10.0, number_of_outputs=5),
+        RandomFlip(probability=0.5),
+    ],
+    "geometric": lambda: [
+        RandomZoom(start=0.8, end=1.0, number_of_outputs=2),
+        RandomRotate(start_angle=-10.0, end_angle=10.0),
+        RandomHorizontalShift(ratio=0.2),
+        Resize(dim=(224, 224)),
+    ],
+    "color": lambda: [
+        RandomChannelShift(low=1, high=10, number_of_outputs=2),
+        RandomBrightness(low=0.5, high=1.5),
+        Resize(dim=(224, 224)),
+    ],
+}
+
+"""Executors to benchmark."""
+EXECUTORS = ("sequential", "thread", "process")
+
+
+def build_model(name, input_path, output_path, compile_model):
+    """Build a model from Read to Save.
+
+    Args:
+        name (str): Name of the pipeline, one of PIPELINES.
+        input_path (str): Directory with the input images.
+        output_path (str): Directory to save the images to.
+        compile_model (bool): Compile the model before running it.
+
+    Returns:
+        Model: Model to benchmark.
+    """
+    model = Model()
+    model.add(Read(path=input_path))
+
+    for layer in PIPELINES[name]():
+        model.add(layer)
+
+    model.add(Save(output_path, format="npy"))
+
+    if compile_model:
+        model.compile()
+
+    return model
+
+
+def benchmark_pipeline(name, resolution, executor, compile_model, input_path, output_path, images, args):
+    """Time a model on the images of one resolution.
+
+    Args:
+        name (str): Name of the pipeline.
+        resolution (str): Name of the resolution.
+        executor (str): Executor of the model.
+        compile_model (bool): Compile the model before running it.
+        input_path (str): Directory with the input images.
+        output_path (str): Directory to save the images to.
+        images (int): Number of input images.
+        args (Namespace): Arguments of the benchmark.
+
+    Returns:
+        dict: Result of the benchmark.
+    """
+    result = {
+        "id": f"{name}/{resolution}/{executor}/{'compiled' if compile_model else 'plain'}",
+        "pipeline": name,
+        "resolution": resolution,
+        "executor": executor,
+        "compiled": compile_model,
+        "images": images,
+    }
+
+    model = build_model(name, input_path, output_path, compile_model)
+    random.seed(0)
+
+    def run():
+        shutil.rmtree(output_path, ignore_errors=True)
+        os.makedirs(output_path)
+        model.transform(executor=executor, workers=args.workers, batch_size=args.batch_size)
+
+    result.update(time_call(run, args.repeat))
+    result["ms_per_image"] = result["median_ms"] / images
+
+    return result
+
+
+def main():
+    """Run the benchmark of the models."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_common_arguments(parser, "bench_pipelines.json")
+    parser.add_argument("--pipelines", nargs="+", default=list(PIPELINES), choices=list(PIPELINES))
+    parser.add_argument("--executors", nargs="+", default=list(EXECUTORS), choices=list(EXECUTORS))
+    parser.add_argument("--images", type=int, default=16, help="Number of synthetic images per resolution")
+    parser.add_argument("--workers", type=int, default=None, help="Number of workers of the executors")
+    parser.add_argument("--batch-size", type=int, default=None, help="Batch size of the models")
+    args = parser.parse_args()
+
+    root = fast_temp_dir()
+    results = []
+
+    try:
+        for resolution in args.resolutions:
+            input_path = os.path.join(root, resolution)
+            output_path = os.path.join(root, f"{resolution}_output")
+
+            os.makedirs(input_path)
+            write_images(input_path, resolution, args.images)
+
+            for name in args.pipelines:
+                for executor in args.executors:
+                    for compile_model in (False, True):
+                        result = benchmark_pipeline(
+                            name, resolution, executor, compile_model, input_path, output_path, args.images, args
+                        )
+                        results.append(result)
+
+                        print(f"{result['id']:<50} {result['ms_per_image']:>9.3f} ms/image", file=sys.stderr)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    write_results(args.output, "pipelines", results)
+
+    if args.compare and compare_results(args.compare, results, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
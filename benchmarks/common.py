@@ -0,0 +1,190 @@
+"""Common helpers for the Hocrox benchmarks."""
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+"""Resolutions of the synthetic images as (width, height)."""
+RESOLUTIONS = {
+    "32px": (32, 32),
+    "224px": (224, 224),
+    "1080p": (1920, 1080),
+    "4k": (3840, 2160),
+}
+
+"""Number of channels of the synthetic images."""
+CHANNELS = (1, 3, 4)
+
+"""Data types of the synthetic images."""
+DTYPES = ("uint8", "float32")
+
+
+def synthetic_image(resolution, channels=3, dtype="uint8", seed=0):
+    """Generate a synthetic image made of smooth gradients and noise, so it compresses like a photo.
+
+    Args:
+        resolution (str): Name of the resolution, one of RESOLUTIONS.
+        channels (int, optional): Number of channels, single channel images are 2D like the ones of OpenCV.
+            Defaults to 3.
+        dtype (str, optional): Data type of the image, float images are in the range [0, 1]. Defaults to "uint8".
+        seed (int, optional): Seed of the noise. Defaults to 0.
+
+    Returns:
+        ndarray: Synthetic image.
+    """
+    width, height = RESOLUTIONS[resolution]
+    rng = np.random.default_rng(seed)
+
+    x = np.linspace(0, 1, width, dtype=np.float32)[None, :]
+    y = np.linspace(0, 1, height, dtype=np.float32)[:, None]
+
+    planes = []
+
+    for channel in range(channels):
+        phase = channel / max(channels, 1)
+        plane = 0.5 + 0.25 * np.sin(2 * np.pi * (x * (channel + 1) + phase)) + 0.25 * np.cos(2 * np.pi * y * 3)
+        plane = plane + rng.normal(0, 0.03, (height, width)).astype(np.float32)
+        planes.append(np.clip(plane, 0, 1))
+
+    image = planes[0] if channels == 1 else np.dstack(planes)
+
+    if dtype == "uint8":
+        return (image * 255).astype(np.uint8)
+
+    return image.astype(dtype)
+
+
+def write_images(path, resolution, count, extension=".jpg"):
+    """Write synthetic BGR images on the disk, used as the input of the end to end benchmarks.
+
+    Args:
+        path (str): Directory to write the images to.
+        resolution (str): Name of the resolution, one of RESOLUTIONS.
+        count (int): Number of images.
+        extension (str, optional): Extension of the images, which decides the encoding. Defaults to ".jpg".
+    """
+    for index in range(count):
+        image = synthetic_image(resolution, channels=3, dtype="uint8", seed=index)
+        cv2.imwrite(os.path.join(path, f"image_{index:05d}{extension}"), image)
+
+
+def fast_temp_dir():
+    """Create a temporary directory, on tmpfs when available so the disk does not dominate the timings.
+
+    Returns:
+        str: Path of the temporary directory.
+    """
+    base = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
+    return tempfile.mkdtemp(prefix="hocrox_bench_", dir=base)
+
+
+def time_call(fn, repeat, warmup=1):
+    """Time a function call.
+
+    Args:
+        fn (function): Function to time, called without arguments.
+        repeat (int): Number of timed calls.
+        warmup (int, optional): Number of calls before timing. Defaults to 1.
+
+    Returns:
+        dict: Minimum, median and mean time in milliseconds.
+    """
+    for _ in range(warmup):
+        fn()
+
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "min_ms": min(timings),
+        "median_ms": statistics.median(timings),
+        "mean_ms": statistics.mean(timings),
+        "repeat": repeat,
+    }
+
+
+def environment():
+    """Describe the environment the benchmarks ran in.
+
+    Returns:
+        dict: Versions of the dependencies and information about the machine.
+    """
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "opencv_threads": cv2.getNumThreads(),
+    }
+
+
+def write_results(path, kind, results):
+    """Write the results of a benchmark to a JSON file.
+
+    Args:
+        path (str): Path of the JSON file.
+        kind (str): Name of the benchmark.
+        results (list[dict]): Results of the benchmark, each of them identified by its "id".
+    """
+    with open(path, "w") as f:
+        json.dump({"benchmark": kind, "environment": environment(), "results": results}, f, indent=2)
+
+
+def compare_results(path, results, threshold):
+    """Compare the results against a baseline JSON file and print the changes.
+
+    Args:
+        path (str): Path of the baseline JSON file.
+        results (list[dict]): Results of the current run.
+        threshold (float): Relative slowdown of the median time reported as a regression, like 0.1 for 10%.
+
+    Returns:
+        list[str]: Ids of the regressed results.
+    """
+    with open(path, "r") as f:
+        baseline = {result["id"]: result for result in json.load(f)["results"]}
+
+    regressions = []
+
+    for result in results:
+        previous = baseline.get(result["id"])
+
+        if previous is None or "median_ms" not in previous or "median_ms" not in result:
+            continue
+
+        change = result["median_ms"] / previous["median_ms"] - 1 if previous["median_ms"] > 0 else 0.0
+        marker = "REGRESSION" if change > threshold else ""
+
+        timings = f"{previous['median_ms']:>10.3f} -> {result['median_ms']:>10.3f} ms"
+        print(f"{result['id']:<60} {timings} {change:+.1%} {marker}")
+
+        if change > threshold:
+            regressions.append(result["id"])
+
+    return regressions
+
+
+def add_common_arguments(parser, output):
+    """Add the arguments shared by every benchmark.
+
+    Args:
+        parser (ArgumentParser): Parser of the benchmark.
+        output (str): Default path of the JSON file.
+    """
+    parser.add_argument("--resolutions", nargs="+", default=list(RESOLUTIONS), choices=list(RESOLUTIONS))
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed runs")
+    parser.add_argument("--output", default=output, help="Path of the JSON file with the results")
+    parser.add_argument("--compare", default=None, help="Path of a baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative slowdown reported as a regression")
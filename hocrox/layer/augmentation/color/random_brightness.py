@@ -1,9 +1,9 @@
 """RandomBrightness layer for Hocrox."""
-import cv2
-import random
 import numpy as np
 
 from hocrox.utils import Layer
+from hocrox.utils.dtype import scale_hsv
+from hocrox.utils.lut import apply_hsv_lut, brightness_lut
 
 __all__ = ["RandomBrightness"]
 
@@ -30,6 +30,8 @@ class RandomBrightness(Layer):
     ```
     """
 
+    LUT_COLOR_SPACE = "hsv"
+
     def __init__(self, low=0.5, high=3.0, probability=1.0, number_of_outputs=1, name=None):
         """Init method for the RandomBrightness layer.
 
@@ -72,6 +74,43 @@ class RandomBrightness(Layer):
         self.__high = high
         self.__probability = probability
 
+    def _get_number_of_outputs(self):
+        """Return the number of images the layer outputs for each input image.
+
+        Returns:
+            int: Number of outputs.
+        """
+        return self.__number_of_outputs
+
+    def __sample(self, name, input_index):
+        """Sample the brightness value of every output of an input image in one draw.
+
+        Args:
+            name (str): Name of the image series, used to get the random generator.
+            input_index (int): Index of the input image among the images the layer receives for the series.
+
+        Returns:
+            list[float]: Brightness value of each output image, None for the images left unchanged.
+        """
+        generator = self._get_generator(name, input_index)
+        should_perform = self._get_probabilities(self.__probability, generator, self.__number_of_outputs)
+        values = generator.uniform(self.__low, self.__high, self.__number_of_outputs)
+
+        return [value if perform else None for value, perform in zip(values.tolist(), should_perform.tolist())]
+
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {
+            "low": self.__low,
+            "high": self.__high,
+            "probability": self.__probability,
+            "number_of_outputs": self.__number_of_outputs,
+        }
+
     def _apply_layer(self, images, name=None):
         """Apply the transformation method to change the layer.
 
@@ -84,42 +123,43 @@ class RandomBrightness(Layer):
         """
         transformed_images = []
 
-        for image in images:
-            for _ in range(self.__number_of_outputs):
-                should_perform = self._get_probability(self.__probability)
+        for input_index, image in enumerate(images):
+            if image is None or len(image) == 0:
+                continue
 
-                if image is not None and len(image) != 0:
-                    transformed_image = self.__brightness(image, self.__low, self.__high) if should_perform else image
+            for value in self.__sample(name, input_index):
+                transformed_image = self.__brightness(image, value) if value is not None else image
 
-                    if transformed_image is not None and len(transformed_image) != 0:
-                        transformed_images.append(transformed_image)
+                if transformed_image is not None and len(transformed_image) != 0:
+                    transformed_images.append(transformed_image)
 
         return transformed_images
 
+    def _sample_lut(self, name=None, input_index=0):
+        """Sample the transformation of the layer as lookup tables, used by Model.compile() to fuse layers.
+
+        Args:
+            name (str, optional): Name of the image series, used to get the random generator. Defaults to None.
+            input_index (int, optional): Index of the input image among the images the layer receives for the series.
+                Defaults to 0.
+
+        Returns:
+            list[ndarray]: Table of each output image, None stands for an unchanged image.
+        """
+        return [brightness_lut(value) if value is not None else None for value in self.__sample(name, input_index)]
+
     @staticmethod
-    def __brightness(img, low, high):
+    def __brightness(img, value):
         """Apply brightness function to the image.
 
         Args:
             img (ndarray): Image to change the brightness
-            low (float): Low range of the brightness
-            high (float): High range of the brightness
+            value (float): Value of the brightness, sampled by the layer
 
         Returns:
             ndarray: Updated image
         """
-        value = random.uniform(low, high)
-
-        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-        hsv = np.array(hsv, dtype=np.float64)
-
-        hsv[:, :, 1] = hsv[:, :, 1] * value
-        hsv[:, :, 1][hsv[:, :, 1] > 255] = 255
-        hsv[:, :, 2] = hsv[:, :, 2] * value
-        hsv[:, :, 2][hsv[:, :, 2] > 255] = 255
-
-        hsv = np.array(hsv, dtype=np.uint8)
-
-        img = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
+        if img.dtype == np.uint8:
+            return apply_hsv_lut(img, brightness_lut(value))
 
-        return img
+        return scale_hsv(img, value)
@@ -1,8 +1,9 @@
 """RandomChannelShift layer for Hocrox."""
-import random
 import numpy as np
 
 from hocrox.utils import Layer
+from hocrox.utils.dtype import shift_image
+from hocrox.utils.lut import apply_lut, shift_lut
 
 __all__ = ["RandomChannelShift"]
 
@@ -29,6 +30,8 @@ class RandomChannelShift(Layer):
     ```
     """
 
+    LUT_COLOR_SPACE = "bgr"
+
     def __init__(self, low=1, high=5, probability=1.0, number_of_outputs=1, name=None):
         """Init method for the RandomChannelShift layer.
 
@@ -71,6 +74,43 @@ class RandomChannelShift(Layer):
         self.__high = high
         self.__probability = probability
 
+    def _get_number_of_outputs(self):
+        """Return the number of images the layer outputs for each input image.
+
+        Returns:
+            int: Number of outputs.
+        """
+        return self.__number_of_outputs
+
+    def __sample(self, name, input_index):
+        """Sample the channel shift value of every output of an input image in one draw.
+
+        Args:
+            name (str): Name of the image series, used to get the random generator.
+            input_index (int): Index of the input image among the images the layer receives for the series.
+
+        Returns:
+            list[float]: Channel shift value of each output image, None for the images left unchanged.
+        """
+        generator = self._get_generator(name, input_index)
+        should_perform = self._get_probabilities(self.__probability, generator, self.__number_of_outputs)
+        values = generator.uniform(self.__low, self.__high, self.__number_of_outputs)
+
+        return [value if perform else None for value, perform in zip(values.tolist(), should_perform.tolist())]
+
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {
+            "low": self.__low,
+            "high": self.__high,
+            "probability": self.__probability,
+            "number_of_outputs": self.__number_of_outputs,
+        }
+
     def _apply_layer(self, images, name=None):
         """Apply the transformation method to change the layer.
 
@@ -83,38 +123,43 @@ class RandomChannelShift(Layer):
         """
         transformed_images = []
 
-        for image in images:
-            for _ in range(self.__number_of_outputs):
-                should_perform = self._get_probability(self.__probability)
+        for input_index, image in enumerate(images):
+            if image is None or len(image) == 0:
+                continue
 
-                if image is not None and len(image) != 0:
-                    transformed_image = (
-                        self.__channel_shift(image, self.__low, self.__high) if should_perform else image
-                    )
+            for value in self.__sample(name, input_index):
+                transformed_image = self.__channel_shift(image, value) if value is not None else image
 
-                    if transformed_image is not None and len(transformed_image) != 0:
-                        transformed_images.append(transformed_image)
+                if transformed_image is not None and len(transformed_image) != 0:
+                    transformed_images.append(transformed_image)
 
         return transformed_images
 
+    def _sample_lut(self, name=None, input_index=0):
+        """Sample the transformation of the layer as lookup tables, used by Model.compile() to fuse layers.
+
+        Args:
+            name (str, optional): Name of the image series, used to get the random generator. Defaults to None.
+            input_index (int, optional): Index of the input image among the images the layer receives for the series.
+                Defaults to 0.
+
+        Returns:
+            list[ndarray]: Table of each output image, None stands for an unchanged image.
+        """
+        return [shift_lut(value) if value is not None else None for value in self.__sample(name, input_index)]
+
     @staticmethod
-    def __channel_shift(img, low, high):
+    def __channel_shift(img, value):
         """Apply channel_shift function to the image.
 
         Args:
-            img (ndarray): Image to change the brightness
-            low (float): Low range of the brightness
-            high (float): High range of the brightness
+            img (ndarray): Image to change the channel shift
+            value (float): Value of the channel shift, sampled by the layer
 
         Returns:
             ndarray: Updated image
         """
-        value = random.uniform(low, high)
-
-        img = img + value
-        img[:, :, :][img[:, :, :] > 255] = 255
-        img[:, :, :][img[:, :, :] < 0] = 0
-
-        img = img.astype(np.uint8)
+        if img.dtype == np.uint8:
+            return apply_lut(img, shift_lut(value))
 
-        return img
+        return shift_image(img, value)
@@ -1,8 +1,7 @@
 """RandomFlip layer for Hocrox."""
-import cv2
-import random
-
 from hocrox.utils import Layer
+from hocrox.utils.affine import flip_matrix, identity_matrix
+from hocrox.utils.view import flip_view
 
 __all__ = ["RandomFlip"]
 
@@ -59,6 +58,61 @@ class RandomFlip(Layer):
         self.__number_of_outputs = number_of_outputs
         self.__probability = probability
 
+    def _get_number_of_outputs(self):
+        """Return the number of images the layer outputs for each input image.
+
+        Returns:
+            int: Number of outputs.
+        """
+        return self.__number_of_outputs
+
+    def __sample(self, name, input_index):
+        """Sample the flip of every output of an input image in one draw.
+
+        Args:
+            name (str): Name of the image series, used to get the random generator.
+            input_index (int): Index of the input image among the images the layer receives for the series.
+
+        Returns:
+            list[int]: Flip code of each output image, 0 for vertical and 1 for horizontal, None for the images left
+                unchanged.
+        """
+        generator = self._get_generator(name, input_index)
+        should_perform = self._get_probabilities(self.__probability, generator, self.__number_of_outputs)
+        flips = generator.integers(0, 2, self.__number_of_outputs)
+
+        return [flip if perform else None for flip, perform in zip(flips.tolist(), should_perform.tolist())]
+
+    def _sample_affine(self, width, height, name=None, input_index=0):
+        """Sample the transformation of the layer as affine matrices, used by Model.compile() to fuse layers.
+
+        Args:
+            width (int): Width of the input image.
+            height (int): Height of the input image.
+            name (str, optional): Name of the image series, used to get the random generator. Defaults to None.
+            input_index (int, optional): Index of the input image among the images the layer receives for the series.
+                Defaults to 0.
+
+        Returns:
+            list[tuple]: Matrix and size (width, height) of each output image, the matrix is None when the image is
+                dropped.
+        """
+        return [
+            (flip_matrix(flip, width, height) if flip is not None else identity_matrix(), (width, height))
+            for flip in self.__sample(name, input_index)
+        ]
+
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {
+            "probability": self.__probability,
+            "number_of_outputs": self.__number_of_outputs,
+        }
+
     def _apply_layer(self, images, name=None):
         """Apply the transformation method to change the layer.
 
@@ -71,15 +125,17 @@ class RandomFlip(Layer):
         """
         transformed_images = []
 
-        for image in images:
-            for _ in range(self.__number_of_outputs):
-                flip = random.randint(0, 1)
-                should_perform = self._get_probability(self.__probability)
+        for input_index, image in enumerate(images):
+            if image is None or len(image) == 0:
+                continue
+
+            # There are only two flips, so each of them is computed once for all the outputs of the image
+            flipped_images = {None: image}
 
-                if image is not None and len(image) != 0:
-                    transformed_image = cv2.flip(image, flip) if should_perform else image
+            for flip in self.__sample(name, input_index):
+                if flip not in flipped_images:
+                    flipped_images[flip] = flip_view(image, flip)
 
-                    if transformed_image is not None and len(transformed_image) != 0:
-                        transformed_images.append(transformed_image)
+                transformed_images.append(flipped_images[flip])
 
         return transformed_images
@@ -1,7 +1,7 @@
 """RandomHorizontalFlip layer for Hocrox."""
-import cv2
-
 from hocrox.utils import Layer
+from hocrox.utils.affine import flip_matrix, identity_matrix
+from hocrox.utils.view import flip_view
 
 __all__ = ["RandomHorizontalFlip"]
 
@@ -58,6 +58,58 @@ class RandomHorizontalFlip(Layer):
         self.__number_of_outputs = number_of_outputs
         self.__probability = probability
 
+    def _get_number_of_outputs(self):
+        """Return the number of images the layer outputs for each input image.
+
+        Returns:
+            int: Number of outputs.
+        """
+        return self.__number_of_outputs
+
+    def __sample(self, name, input_index):
+        """Sample which outputs of an input image are flipped, in one draw.
+
+        Args:
+            name (str): Name of the image series, used to get the random generator.
+            input_index (int): Index of the input image among the images the layer receives for the series.
+
+        Returns:
+            list[bool]: True for each output image that is flipped.
+        """
+        generator = self._get_generator(name, input_index)
+
+        return self._get_probabilities(self.__probability, generator, self.__number_of_outputs).tolist()
+
+    def _sample_affine(self, width, height, name=None, input_index=0):
+        """Sample the transformation of the layer as affine matrices, used by Model.compile() to fuse layers.
+
+        Args:
+            width (int): Width of the input image.
+            height (int): Height of the input image.
+            name (str, optional): Name of the image series, used to get the random generator. Defaults to None.
+            input_index (int, optional): Index of the input image among the images the layer receives for the series.
+                Defaults to 0.
+
+        Returns:
+            list[tuple]: Matrix and size (width, height) of each output image, the matrix is None when the image is
+                dropped.
+        """
+        return [
+            (flip_matrix(1, width, height) if should_perform else identity_matrix(), (width, height))
+            for should_perform in self.__sample(name, input_index)
+        ]
+
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {
+            "probability": self.__probability,
+            "number_of_outputs": self.__number_of_outputs,
+        }
+
     def _apply_layer(self, images, name=None):
         """Apply the transformation method to change the layer.
 
@@ -70,14 +122,21 @@ class RandomHorizontalFlip(Layer):
         """
         transformed_images = []
 
-        for image in images:
-            for _ in range(self.__number_of_outputs):
-                should_perform = self._get_probability(self.__probability)
+        for input_index, image in enumerate(images):
+            if image is None or len(image) == 0:
+                continue
+
+            flipped_image = None
+
+            for should_perform in self.__sample(name, input_index):
+                if not should_perform:
+                    transformed_images.append(image)
+                    continue
 
-                if image is not None and len(image) != 0:
-                    transformed_image = cv2.flip(image, 1) if should_perform else image
+                # Every flipped output of the image is the same, so it is only computed once
+                if flipped_image is None:
+                    flipped_image = flip_view(image, 1)
 
-                    if transformed_image is not None and len(transformed_image) != 0:
-                        transformed_images.append(transformed_image)
+                transformed_images.append(flipped_image)
 
         return transformed_images
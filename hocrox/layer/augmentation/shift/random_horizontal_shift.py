@@ -1,8 +1,8 @@
 """RandomHorizontalShift layer for Hocrox."""
-import random
 import cv2
 
 from hocrox.utils import Layer
+from hocrox.utils.affine import crop_resize_matrix, identity_matrix
 
 __all__ = ["RandomHorizontalShift"]
 
@@ -65,6 +65,76 @@ class RandomHorizontalShift(Layer):
         self.__ratio = ratio
         self.__probability = probability
 
+    def _get_number_of_outputs(self):
+        """Return the number of images the layer outputs for each input image.
+
+        Returns:
+            int: Number of outputs.
+        """
+        return self.__number_of_outputs
+
+    def __sample(self, name, input_index):
+        """Sample the shift ratio of every output of an input image in one draw.
+
+        Args:
+            name (str): Name of the image series, used to get the random generator.
+            input_index (int): Index of the input image among the images the layer receives for the series.
+
+        Returns:
+            list[float]: Shift ratio of each output image, None for the images left unchanged.
+        """
+        generator = self._get_generator(name, input_index)
+        should_perform = self._get_probabilities(self.__probability, generator, self.__number_of_outputs)
+        ratios = generator.uniform(-self.__ratio, self.__ratio, self.__number_of_outputs)
+
+        return [ratio if perform else None for ratio, perform in zip(ratios.tolist(), should_perform.tolist())]
+
+    def _sample_affine(self, width, height, name=None, input_index=0):
+        """Sample the transformation of the layer as affine matrices, used by Model.compile() to fuse layers.
+
+        Args:
+            width (int): Width of the input image.
+            height (int): Height of the input image.
+            name (str, optional): Name of the image series, used to get the random generator. Defaults to None.
+            input_index (int, optional): Index of the input image among the images the layer receives for the series.
+                Defaults to 0.
+
+        Returns:
+            list[tuple]: Matrix and size (width, height) of each output image, the matrix is None when the image is
+                dropped.
+        """
+        transforms = []
+
+        for ratio in self.__sample(name, input_index):
+            if ratio is None:
+                transforms.append((identity_matrix(), (width, height)))
+                continue
+
+            to_shift = width * ratio
+            start, end = 0, width
+
+            if ratio > 0:
+                end = int(width - to_shift)
+            if ratio < 0:
+                start = int(-1 * to_shift)
+
+            # The layer resizes the shifted image to (height, width), so the fused layer does the same
+            transforms.append((crop_resize_matrix(start, 0, end - start, height, height, width), (height, width)))
+
+        return transforms
+
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {
+            "ratio": self.__ratio,
+            "probability": self.__probability,
+            "number_of_outputs": self.__number_of_outputs,
+        }
+
     def _apply_layer(self, images, name=None):
         """Apply the transformation method to change the layer.
 
@@ -77,15 +147,15 @@ class RandomHorizontalShift(Layer):
         """
         transformed_images = []
 
-        for image in images:
-            for _ in range(self.__number_of_outputs):
-                should_perform = self._get_probability(self.__probability)
+        for input_index, image in enumerate(images):
+            if image is None or len(image) == 0:
+                continue
 
-                if image is not None and len(image) != 0:
-                    transformed_image = self.__horizontal_shift(image, self.__ratio) if should_perform else image
+            for ratio in self.__sample(name, input_index):
+                transformed_image = self.__horizontal_shift(image, ratio) if ratio is not None else image
 
-                    if transformed_image is not None and len(transformed_image) != 0:
-                        transformed_images.append(transformed_image)
+                if transformed_image is not None and len(transformed_image) != 0:
+                    transformed_images.append(transformed_image)
 
         return transformed_images
 
@@ -94,14 +164,12 @@ class RandomHorizontalShift(Layer):
         """Apply horizontal_shift function to the image.
 
         Args:
-            img (ndarray): Image to change the brightness
-            ratio (float): High range of the brightness
+            img (ndarray): Image to shift
+            ratio (float): Ratio of the shift, sampled by the layer
 
         Returns:
             ndarray: Updated image
         """
-        ratio = random.uniform(-ratio, ratio)
-
         h, w = img.shape[:2]
         to_shift = w * ratio
 
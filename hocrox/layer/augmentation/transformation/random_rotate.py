@@ -1,9 +1,9 @@
 """RandomRotate layer for Hocrox."""
 import cv2
-import random
 import numpy as np
 
 from hocrox.utils import Layer
+from hocrox.utils.affine import identity_matrix, rotation_matrix
 
 __all__ = ["RandomRotate"]
 
@@ -92,6 +92,62 @@ class RandomRotate(Layer):
             f"Probability: {probability}, Number of Outputs: {number_of_outputs}",
         )
 
+    def _get_number_of_outputs(self):
+        """Return the number of images the layer outputs for each input image.
+
+        Returns:
+            int: Number of outputs.
+        """
+        return self.__number_of_outputs
+
+    def __sample(self, name, input_index):
+        """Sample the angle of every output of an input image in one draw.
+
+        Args:
+            name (str): Name of the image series, used to get the random generator.
+            input_index (int): Index of the input image among the images the layer receives for the series.
+
+        Returns:
+            list[float]: Angle of each output image, None for the images left unchanged.
+        """
+        generator = self._get_generator(name, input_index)
+        should_perform = self._get_probabilities(self.__probability, generator, self.__number_of_outputs)
+        angles = generator.uniform(self.__start_angle, self.__end_angle, self.__number_of_outputs)
+
+        return [angle if perform else None for angle, perform in zip(angles.tolist(), should_perform.tolist())]
+
+    def _sample_affine(self, width, height, name=None, input_index=0):
+        """Sample the transformation of the layer as affine matrices, used by Model.compile() to fuse layers.
+
+        Args:
+            width (int): Width of the input image.
+            height (int): Height of the input image.
+            name (str, optional): Name of the image series, used to get the random generator. Defaults to None.
+            input_index (int, optional): Index of the input image among the images the layer receives for the series.
+                Defaults to 0.
+
+        Returns:
+            list[tuple]: Matrix and size (width, height) of each output image, the matrix is None when the image is
+                dropped.
+        """
+        return [
+            (rotation_matrix(angle, width, height) if angle is not None else identity_matrix(), (width, height))
+            for angle in self.__sample(name, input_index)
+        ]
+
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {
+            "start_angle": self.__start_angle,
+            "end_angle": self.__end_angle,
+            "probability": self.__probability,
+            "number_of_outputs": self.__number_of_outputs,
+        }
+
     def _apply_layer(self, images, name=None):
         """Apply the transformation method to change the layer.
 
@@ -104,15 +160,14 @@ class RandomRotate(Layer):
         """
         transformed_images = []
 
-        for image in images:
-            for _ in range(self.__number_of_outputs):
-                angle = random.uniform(self.__start_angle, self.__end_angle)
-                should_perform = self._get_probability(self.__probability)
+        for input_index, image in enumerate(images):
+            if image is None or len(image) == 0:
+                continue
 
-                if image is not None and len(image) != 0:
-                    transformed_image = self.__rotate_image(image, angle) if should_perform else image
+            for angle in self.__sample(name, input_index):
+                transformed_image = self.__rotate_image(image, angle) if angle is not None else image
 
-                    if transformed_image is not None and len(transformed_image) != 0:
-                        transformed_images.append(transformed_image)
+                if transformed_image is not None and len(transformed_image) != 0:
+                    transformed_images.append(transformed_image)
 
         return transformed_images
@@ -1,8 +1,8 @@
 """RandomZoom layer for Hocrox."""
 import cv2
-import random
 
 from hocrox.utils import Layer
+from hocrox.utils.affine import crop_resize_matrix, identity_matrix
 
 __all__ = ["RandomZoom"]
 
@@ -71,6 +71,72 @@ class RandomZoom(Layer):
         self.__end = end
         self.__probability = probability
 
+    def _get_number_of_outputs(self):
+        """Return the number of images the layer outputs for each input image.
+
+        Returns:
+            int: Number of outputs.
+        """
+        return self.__number_of_outputs
+
+    def __sample(self, width, height, name, input_index):
+        """Sample the crop of every output of an input image in one draw.
+
+        Args:
+            width (int): Width of the input image.
+            height (int): Height of the input image.
+            name (str): Name of the image series, used to get the random generator.
+            input_index (int): Index of the input image among the images the layer receives for the series.
+
+        Returns:
+            list[tuple]: Crop (x, y, width, height) of each output image, None for the images left unchanged.
+        """
+        generator = self._get_generator(name, input_index)
+        should_perform = self._get_probabilities(self.__probability, generator, self.__number_of_outputs)
+        zoom_values = generator.uniform(self.__start, self.__end, self.__number_of_outputs)
+
+        h_taken = (zoom_values * height).astype(int)
+        w_taken = (zoom_values * width).astype(int)
+
+        h_start = generator.integers(0, height - h_taken + 1)
+        w_start = generator.integers(0, width - w_taken + 1)
+
+        crops = zip(w_start.tolist(), h_start.tolist(), w_taken.tolist(), h_taken.tolist())
+
+        return [crop if perform else None for crop, perform in zip(crops, should_perform.tolist())]
+
+    def _sample_affine(self, width, height, name=None, input_index=0):
+        """Sample the transformation of the layer as affine matrices, used by Model.compile() to fuse layers.
+
+        Args:
+            width (int): Width of the input image.
+            height (int): Height of the input image.
+            name (str, optional): Name of the image series, used to get the random generator. Defaults to None.
+            input_index (int, optional): Index of the input image among the images the layer receives for the series.
+                Defaults to 0.
+
+        Returns:
+            list[tuple]: Matrix and size (width, height) of each output image, the matrix is None when the image is
+                dropped.
+        """
+        return [
+            (crop_resize_matrix(*crop, width, height) if crop is not None else identity_matrix(), (width, height))
+            for crop in self.__sample(width, height, name, input_index)
+        ]
+
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {
+            "start": self.__start,
+            "end": self.__end,
+            "probability": self.__probability,
+            "number_of_outputs": self.__number_of_outputs,
+        }
+
     def _apply_layer(self, images, name=None):
         """Apply the transformation method to change the layer.
 
@@ -83,40 +149,34 @@ class RandomZoom(Layer):
         """
         transformed_images = []
 
-        for image in images:
-            for _ in range(self.__number_of_outputs):
-                should_perform = self._get_probability(self.__probability)
+        for input_index, image in enumerate(images):
+            if image is None or len(image) == 0:
+                continue
+
+            height, width = image.shape[:2]
 
-                if image is not None and len(image) != 0:
-                    transformed_image = self.__zoom(image, self.__start, self.__end) if should_perform else image
+            for crop in self.__sample(width, height, name, input_index):
+                transformed_image = self.__zoom(image, crop) if crop is not None else image
 
-                    if transformed_image is not None and len(transformed_image) != 0:
-                        transformed_images.append(transformed_image)
+                if transformed_image is not None and len(transformed_image) != 0:
+                    transformed_images.append(transformed_image)
 
         return transformed_images
 
     @staticmethod
-    def __zoom(img, start, end):
+    def __zoom(img, crop):
         """Zoom the image.
 
         Args:
             img (ndarray): Image to zoom
-            start (float): Start range of the zoom
-            end (float): End range of the zoom
+            crop (tuple): Crop (x, y, width, height) of the zoom, sampled by the layer
 
         Returns:
             ndarray: Zoomed image
         """
-        zoom_value = random.uniform(start, end)
-
+        w_start, h_start, w_taken, h_taken = crop
         h, w = img.shape[:2]
 
-        h_taken = int(zoom_value * h)
-        w_taken = int(zoom_value * w)
-
-        h_start = random.randint(0, h - h_taken)
-        w_start = random.randint(0, w - w_taken)
-
         img = img[h_start : h_start + h_taken, w_start : w_start + w_taken, :]
 
         if img is None or len(img) == 0:
@@ -28,6 +28,8 @@ class BilateralBlur(Layer):
     ```
     """
 
+    DETERMINISTIC = True
+
     def __init__(self, d, sigma_color, sigma_space, name=None):
         """Init method for BilateralBlur layer.
 
@@ -69,6 +71,18 @@ class BilateralBlur(Layer):
             f"D: {self.__d}, Sigma Space: {self.__sigma_space}, Sigma Color: {self.__sigma_color}",
         )
 
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {
+            "d": self.__d,
+            "sigma_color": self.__sigma_color,
+            "sigma_space": self.__sigma_space,
+        }
+
     def _apply_layer(self, images, name=None):
         """Apply the transformation method to change the layer.
 
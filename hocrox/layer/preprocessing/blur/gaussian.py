@@ -28,6 +28,8 @@ class GaussianBlur(Layer):
     ```
     """
 
+    DETERMINISTIC = True
+
     def __init__(self, kernel_size, sigma_x, sigma_y=0, name=None):
         """Init method for GaussianBlur layer.
 
@@ -65,6 +67,18 @@ class GaussianBlur(Layer):
             f"Kernel Size: {self.__kernel_size}, Sigma X: {self.__sigma_x}, Sigma Y: {self.__sigma_y}",
         )
 
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {
+            "kernel_size": self.__kernel_size,
+            "sigma_x": self.__sigma_x,
+            "sigma_y": self.__sigma_y,
+        }
+
     def _apply_layer(self, images, name=None):
         """Apply the transformation method to change the layer.
 
@@ -28,6 +28,8 @@ class MedianBlur(Layer):
     ```
     """
 
+    DETERMINISTIC = True
+
     def __init__(self, kernel_size, name=None):
         """Init method for MedianBlur layer.
 
@@ -50,6 +52,14 @@ class MedianBlur(Layer):
             f"Kernel Size: {self.__kernel_size}",
         )
 
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {"kernel_size": self.__kernel_size}
+
     def _apply_layer(self, images, name=None):
         """Apply the transformation method to change the layer.
 
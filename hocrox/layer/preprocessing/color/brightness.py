@@ -1,8 +1,9 @@
 """Brightness layer for Hocrox."""
-import cv2
 import numpy as np
 
 from hocrox.utils import Layer
+from hocrox.utils.dtype import scale_hsv
+from hocrox.utils.lut import apply_hsv_lut, brightness_lut
 
 __all__ = ["Brightness"]
 
@@ -29,6 +30,9 @@ class Brightness(Layer):
     ```
     """
 
+    DETERMINISTIC = True
+    LUT_COLOR_SPACE = "hsv"
+
     def __init__(self, level=0.5, name=None):
         """Init method for the Brightness layer.
 
@@ -52,6 +56,14 @@ class Brightness(Layer):
 
         self.__level = level
 
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {"level": self.__level}
+
     def _apply_layer(self, images, name=None):
         """Apply the transformation method to change the layer.
 
@@ -73,6 +85,18 @@ class Brightness(Layer):
 
         return transformed_images
 
+    def _sample_lut(self, name=None, input_index=0):
+        """Sample the transformation of the layer as lookup tables, used by Model.compile() to fuse layers.
+
+        Args:
+            name (str, optional): Name of the image series, unused as the layer is not random. Defaults to None.
+            input_index (int, optional): Index of the input image, unused as the layer is not random. Defaults to 0.
+
+        Returns:
+            list[ndarray]: Table of each output image, None stands for an unchanged image.
+        """
+        return [brightness_lut(self.__level)]
+
     @staticmethod
     def __brightness(img, value):
         """Apply brightness function to the image.
@@ -84,16 +108,7 @@ class Brightness(Layer):
         Returns:
             ndarray: Updated image
         """
-        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-        hsv = np.array(hsv, dtype=np.float64)
-
-        hsv[:, :, 1] = hsv[:, :, 1] * value
-        hsv[:, :, 1][hsv[:, :, 1] > 255] = 255
-        hsv[:, :, 2] = hsv[:, :, 2] * value
-        hsv[:, :, 2][hsv[:, :, 2] > 255] = 255
-
-        hsv = np.array(hsv, dtype=np.uint8)
-
-        img = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
+        if img.dtype == np.uint8:
+            return apply_hsv_lut(img, brightness_lut(value))
 
-        return img
+        return scale_hsv(img, value)
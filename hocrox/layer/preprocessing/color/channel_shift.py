@@ -2,6 +2,8 @@
 import numpy as np
 
 from hocrox.utils import Layer
+from hocrox.utils.dtype import shift_image
+from hocrox.utils.lut import apply_lut, shift_lut
 
 __all__ = ["ChannelShift"]
 
@@ -28,6 +30,10 @@ class ChannelShift(Layer):
     ```
     """
 
+    DETERMINISTIC = True
+    SUPPORTS_BATCH = True
+    LUT_COLOR_SPACE = "bgr"
+
     def __init__(self, value=1, name=None):
         """Init method for the ChannelShift layer.
 
@@ -51,16 +57,27 @@ class ChannelShift(Layer):
 
         self.__value = value
 
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {"value": self.__value}
+
     def _apply_layer(self, images, name=None):
         """Apply the transformation method to change the layer.
 
         Args:
-            images (list[ndarray]): List of images to transform.
+            images (list[ndarray] | ndarray): List of images to transform, or a batch of images of shape (N, H, W, C).
             name (str, optional): Name of the image series, used for saving the images. Defaults to None.
 
         Returns:
-            list[ndarray]: Return the transform images
+            list[ndarray] | ndarray: Return the transform images, as a batch if a batch was given
         """
+        if isinstance(images, np.ndarray):
+            return self.__channel_shift(images, self.__value)
+
         transformed_images = []
 
         for image in images:
@@ -72,6 +89,18 @@ class ChannelShift(Layer):
 
         return transformed_images
 
+    def _sample_lut(self, name=None, input_index=0):
+        """Sample the transformation of the layer as lookup tables, used by Model.compile() to fuse layers.
+
+        Args:
+            name (str, optional): Name of the image series, unused as the layer is not random. Defaults to None.
+            input_index (int, optional): Index of the input image, unused as the layer is not random. Defaults to 0.
+
+        Returns:
+            list[ndarray]: Table of each output image, None stands for an unchanged image.
+        """
+        return [shift_lut(self.__value)]
+
     @staticmethod
     def __channel_shift(img, value):
         """Apply channel_shift function to the image.
@@ -83,10 +112,7 @@ class ChannelShift(Layer):
         Returns:
             ndarray: Updated image
         """
-        img = img + value
-        img[:, :, :][img[:, :, :] > 255] = 255
-        img[:, :, :][img[:, :, :] < 0] = 0
-
-        img = img.astype(np.uint8)
+        if img.dtype == np.uint8:
+            return apply_lut(img, shift_lut(value))
 
-        return img
+        return shift_image(img, value)
@@ -1,5 +1,6 @@
 """Grayscale layer for Hocrox."""
 import cv2
+import numpy as np
 
 from hocrox.utils import Layer
 
@@ -28,6 +29,9 @@ class Grayscale(Layer):
     ```
     """
 
+    DETERMINISTIC = True
+    SUPPORTS_BATCH = True
+
     def __init__(self, name=None):
         """Init method for grayscale layer.
 
@@ -43,16 +47,31 @@ class Grayscale(Layer):
             "-",
         )
 
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {}
+
     def _apply_layer(self, images, name=None):
         """Apply the transformation method to change the layer.
 
         Args:
-            images (list[ndarray]): List of images to transform.
+            images (list[ndarray] | ndarray): List of images to transform, or a batch of images of shape (N, H, W, C).
             name (str, optional): Name of the image series, used for saving the images. Defaults to None.
 
         Returns:
-            list[ndarray]: Return the transform images
+            list[ndarray] | ndarray: Return the transform images, as a batch if a batch was given
         """
+        if isinstance(images, np.ndarray):
+            # OpenCV sees the batch as one tall image, so the whole batch is converted with a single call
+            n, h, w = images.shape[:3]
+            batch = np.ascontiguousarray(images).reshape(n * h, w, -1)
+
+            return cv2.cvtColor(batch, cv2.COLOR_BGR2GRAY).reshape(n, h, w)
+
         transformed_images = []
 
         for image in images:
@@ -1,5 +1,9 @@
 """Rescale layer for Hocrox."""
+import numpy as np
+
 from hocrox.utils import Layer
+from hocrox.utils.dtype import cast_image
+from hocrox.utils.lut import apply_lut, rescale_lut
 
 __all__ = ["Rescale"]
 
@@ -7,6 +11,10 @@ __all__ = ["Rescale"]
 class Rescale(Layer):
     """Rescale layer rescales an image.
 
+    The images are rescaled in float32, or in the float dtype of the images if they are already floats, never in
+    float64. When the model has the uint8 dtype policy, uint8 images stay uint8 and are rescaled with a lookup table,
+    with the results rounded and clipped to the range of uint8.
+
     Here is an example code to use the Rescale layer in a model.
 
     ```python
@@ -26,6 +34,9 @@ class Rescale(Layer):
     ```
     """
 
+    DETERMINISTIC = True
+    SUPPORTS_BATCH = True
+
     def __init__(self, rescale=1.0 / 255.0, name=None):
         """Init method for Resize layer.
 
@@ -49,23 +60,56 @@ class Rescale(Layer):
             f"Rescale: {self.__rescale}",
         )
 
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {"rescale": self.__rescale}
+
     def _apply_layer(self, images, name=None):
         """Apply the transformation method to change the layer.
 
         Args:
-            images (list[ndarray]): List of images to transform.
+            images (list[ndarray] | ndarray): List of images to transform, or a batch of images of shape (N, H, W, C).
             name (str, optional): Name of the image series, used for saving the images. Defaults to None.
 
         Returns:
-            list[ndarray]: Return the transform images
+            list[ndarray] | ndarray: Return the transform images, as a batch if a batch was given
         """
+        if isinstance(images, np.ndarray):
+            return self.__rescale_image(images)
+
         transformed_images = []
 
         for image in images:
             if image is not None and len(image) != 0:
-                transformed_image = image * self.__rescale
+                transformed_image = self.__rescale_image(image)
 
                 if transformed_image is not None and len(transformed_image) != 0:
                     transformed_images.append(transformed_image)
 
         return transformed_images
+
+    def __rescale_image(self, img):
+        """Rescale an image or a batch of images following the dtype policy of the model.
+
+        Args:
+            img (ndarray): Image or batch of images to rescale.
+
+        Returns:
+            ndarray: Rescaled image.
+        """
+        dtype = self._get_dtype()
+
+        if dtype == np.uint8 and img.dtype == np.uint8:
+            return apply_lut(img, rescale_lut(self.__rescale))
+
+        if img.dtype.kind == "f" and dtype is None:
+            return np.multiply(img, img.dtype.type(self.__rescale))
+
+        # float16 images are cast at the output of the model, as OpenCV layers can still follow
+        rescaled = np.multiply(img, np.float32(self.__rescale), dtype=np.float32)
+
+        return cast_image(rescaled, dtype) if dtype == np.uint8 else rescaled
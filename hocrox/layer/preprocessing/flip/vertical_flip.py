@@ -1,7 +1,9 @@
 """VerticalFlip layer for Hocrox."""
-import cv2
+import numpy as np
 
 from hocrox.utils import Layer
+from hocrox.utils.affine import flip_matrix
+from hocrox.utils.view import flip_view
 
 __all__ = ["VerticalFlip"]
 
@@ -28,6 +30,9 @@ class VerticalFlip(Layer):
     ```
     """
 
+    DETERMINISTIC = True
+    SUPPORTS_BATCH = True
+
     def __init__(self, name=None):
         """Init method for horizontal flip layer.
 
@@ -43,21 +48,48 @@ class VerticalFlip(Layer):
             "-",
         )
 
+    def _sample_affine(self, width, height, name=None, input_index=0):
+        """Sample the transformation of the layer as affine matrices, used by Model.compile() to fuse layers.
+
+        Args:
+            width (int): Width of the input image.
+            height (int): Height of the input image.
+            name (str, optional): Name of the image series, unused as the layer is not random. Defaults to None.
+            input_index (int, optional): Index of the input image, unused as the layer is not random. Defaults to 0.
+
+        Returns:
+            list[tuple]: Matrix and size (width, height) of each output image, the matrix is None when the image is
+                dropped.
+        """
+        return [(flip_matrix(0, width, height), (width, height))]
+
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {}
+
     def _apply_layer(self, images, name=None):
         """Apply the transformation method to change the layer.
 
         Args:
-            images (list[ndarray]): List of images to transform.
+            images (list[ndarray] | ndarray): List of images to transform, or a batch of images of shape (N, H, W, C).
             name (str, optional): Name of the image series, used for saving the images. Defaults to None.
 
         Returns:
-            list[ndarray]: Return the transform images
+            list[ndarray] | ndarray: Return the transform images as views of the given images, as a batch if a batch
+                was given
         """
+        if isinstance(images, np.ndarray):
+            return images[:, ::-1]
+
         transformed_images = []
 
         for image in images:
             if image is not None and len(image) != 0:
-                transformed_image = cv2.flip(image, 0)
+                transformed_image = flip_view(image, 0)
 
                 if transformed_image is not None and len(transformed_image) != 0:
                     transformed_images.append(transformed_image)
@@ -2,6 +2,7 @@
 import cv2
 
 from hocrox.utils import Layer
+from hocrox.utils.affine import crop_resize_matrix
 
 __all__ = ["HorizontalShift"]
 
@@ -28,6 +29,8 @@ class HorizontalShift(Layer):
     ```
     """
 
+    DETERMINISTIC = True
+
     def __init__(self, by=0.7, name=None):
         """Init method for the HorizontalShift layer.
 
@@ -51,6 +54,37 @@ class HorizontalShift(Layer):
 
         self.__by = by
 
+    def _sample_affine(self, width, height, name=None, input_index=0):
+        """Sample the transformation of the layer as affine matrices, used by Model.compile() to fuse layers.
+
+        Args:
+            width (int): Width of the input image.
+            height (int): Height of the input image.
+            name (str, optional): Name of the image series, unused as the layer is not random. Defaults to None.
+            input_index (int, optional): Index of the input image, unused as the layer is not random. Defaults to 0.
+
+        Returns:
+            list[tuple]: Matrix and size (width, height) of each output image, the matrix is None when the image is
+                dropped.
+        """
+        to_shift = width * self.__by
+        start, end = 0, width
+
+        if self.__by > 0:
+            end = int(width - to_shift)
+        if self.__by < 0:
+            start = int(-1 * to_shift)
+
+        return [(crop_resize_matrix(start, 0, end - start, height, width, height), (width, height))]
+
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {"by": self.__by}
+
     def _apply_layer(self, images, name=None):
         """Apply the transformation method to change the layer.
 
@@ -91,7 +125,8 @@ class HorizontalShift(Layer):
         if by < 0:
             img = img[:, int(-1 * to_shift) :, :]
 
-        if img is None or len(img) == 0:
+        # A shift smaller than a pixel keeps the whole image, which is returned as a view instead of being resized
+        if img is None or len(img) == 0 or img.shape[:2] == (h, w):
             return img
 
         img = cv2.resize(img, (w, h), cv2.INTER_CUBIC)
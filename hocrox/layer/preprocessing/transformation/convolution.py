@@ -32,6 +32,8 @@ class Convolution(Layer):
     ```
     """
 
+    DETERMINISTIC = True
+
     def __init__(self, ddepth, kernel, name=None):
         """Init method for the crop layer.
 
@@ -63,6 +65,14 @@ class Convolution(Layer):
             f"Ddepth: {self.__ddepth}, Kernel: {self.__kernel}",
         )
 
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {"ddepth": self.__ddepth, "kernel": self.__kernel}
+
     def _apply_layer(self, images, name=None):
         """Apply the transformation method to change the layer.
 
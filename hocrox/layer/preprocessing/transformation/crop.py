@@ -1,4 +1,6 @@
 """Crop layer for Hocrox."""
+import numpy as np
+
 from hocrox.utils import Layer
 
 __all__ = ["Crop"]
@@ -26,6 +28,9 @@ class Crop(Layer):
     ```
     """
 
+    DETERMINISTIC = True
+    SUPPORTS_BATCH = True
+
     def __init__(self, x, y, w, h, name=None):
         """Init method for the crop layer.
 
@@ -67,16 +72,29 @@ class Crop(Layer):
             f"X: {self.__x}, Y: {self.__y}, W: {self.__w}, H: {self.__h}",
         )
 
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {"x": self.__x, "y": self.__y, "w": self.__w, "h": self.__h}
+
     def _apply_layer(self, images, name=None):
         """Apply the transformation method to change the layer.
 
         Args:
-            images (list[ndarray]): List of images to transform.
+            images (list[ndarray] | ndarray): List of images to transform, or a batch of images of shape (N, H, W, C).
             name (str, optional): Name of the image series, used for saving the images. Defaults to None.
 
         Returns:
-            list[ndarray]: Return the transform images
+            list[ndarray] | ndarray: Return the transform images, as a batch if a batch was given
         """
+        if isinstance(images, np.ndarray):
+            transformed_images = images[:, self.__x : self.__x + self.__w, self.__y : self.__y + self.__h]
+
+            return transformed_images if transformed_images.shape[1] != 0 else []
+
         transformed_images = []
 
         for image in images:
@@ -28,6 +28,8 @@ class Padding(Layer):
     ```
     """
 
+    DETERMINISTIC = True
+
     def __init__(self, top, bottom, left, right, color=[255, 255, 255], name=None):
         """Init method for Padding layer.
 
@@ -75,6 +77,20 @@ class Padding(Layer):
             f"Top: {self.__top}, Bottom: {self.__bottom}, Left: {self.__left}, Right: {self.__right}",
         )
 
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {
+            "top": self.__top,
+            "bottom": self.__bottom,
+            "left": self.__left,
+            "right": self.__right,
+            "color": self.__color,
+        }
+
     def _apply_layer(self, images, name=None):
         """Apply the transformation method to change the layer.
 
@@ -28,6 +28,8 @@ class Resize(Layer):
     ```
     """
 
+    DETERMINISTIC = True
+
     def __init__(self, dim, interpolation="INTER_LINEAR", name=None):
         """Init method for Resize layer.
 
@@ -67,6 +69,22 @@ class Resize(Layer):
             f"Dim: {self.__dim}, Interpolation: {self.__interpolation}",
         )
 
+    def _get_dim(self):
+        """Return the new dimension of the images.
+
+        Returns:
+            tuple: New (width, height) of the images.
+        """
+        return self.__dim
+
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {"dim": self.__dim, "interpolation": self.__interpolation}
+
     def _apply_layer(self, images, name=None):
         """Apply the transformation method to change the layer.
 
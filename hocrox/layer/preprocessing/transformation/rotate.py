@@ -3,6 +3,7 @@ import cv2
 import numpy as np
 
 from hocrox.utils import Layer
+from hocrox.utils.affine import rotation_matrix
 
 __all__ = ["Rotate"]
 
@@ -29,6 +30,8 @@ class Rotate(Layer):
     ```
     """
 
+    DETERMINISTIC = True
+
     @staticmethod
     def __rotate_image(image, angle):
         """Rotate an image to certain angle.
@@ -68,6 +71,29 @@ class Rotate(Layer):
             f"Angle: {self.__angle}",
         )
 
+    def _sample_affine(self, width, height, name=None, input_index=0):
+        """Sample the transformation of the layer as affine matrices, used by Model.compile() to fuse layers.
+
+        Args:
+            width (int): Width of the input image.
+            height (int): Height of the input image.
+            name (str, optional): Name of the image series, unused as the layer is not random. Defaults to None.
+            input_index (int, optional): Index of the input image, unused as the layer is not random. Defaults to 0.
+
+        Returns:
+            list[tuple]: Matrix and size (width, height) of each output image, the matrix is None when the image is
+                dropped.
+        """
+        return [(rotation_matrix(self.__angle, width, height), (width, height))]
+
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {"angle": self.__angle}
+
     def _apply_layer(self, images, name=None):
         """Apply the transformation method to change the layer.
 
@@ -1,13 +1,65 @@
 """Read layer for Hocrox."""
+import hashlib
 import os
+import tarfile
+import zipfile
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
 import cv2
+import numpy as np
+
+from hocrox.utils import DiskCache, Layer, MemoryCache
+from hocrox.utils.bounded_queue import BoundedQueue
+from hocrox.utils.probe import probe_image, probe_image_size
+
+"""Extensions of the image formats that cv2.imread can decode."""
+IMAGE_EXTENSIONS = (
+    ".bmp",
+    ".dib",
+    ".jpeg",
+    ".jpg",
+    ".jpe",
+    ".jp2",
+    ".png",
+    ".webp",
+    ".pbm",
+    ".pgm",
+    ".ppm",
+    ".pxm",
+    ".pnm",
+    ".sr",
+    ".ras",
+    ".tiff",
+    ".tif",
+    ".exr",
+    ".hdr",
+    ".pic",
+)
+
+"""Extensions of the archives the images can be streamed from."""
+ARCHIVE_EXTENSIONS = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz", ".zip")
+
+"""Number of images each archive can read ahead when several archives are read in parallel."""
+ARCHIVE_PREFETCH = 8
+
+# Marks the end of an archive read in parallel
+_END_OF_ARCHIVE = object()
 
-from hocrox.utils import Layer
+"""Decode flags of cv2.imread that downscale the image while decoding it, from the largest reduction."""
+REDUCED_READ_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
 
 
 class Read(Layer):
     """Read layer reads images from the local filesystem.
 
+    The path can also be a tar or zip archive, whose images are streamed and decoded in memory without extracting
+    the archive.
+
     Here is an example code to use the Read layer in a model.
 
     ```python
@@ -18,36 +70,411 @@ class Read(Layer):
     model = Model()
 
     # Adding model layers
-    model.add(Read(path="./img"))
+    model.add(Read(path="./img", recursive=True))
+
+    # Images can also be streamed from archives, like a single archive or a folder of archives read in parallel
+    # model.add(Read(path="./img.tar"))
+    # model.add(Read(path="./archives", archives=True, workers=4))
+
+    # Corrupt files can be skipped before they are decoded, they are listed by model.quarantine()
+    # model.add(Read(path="./img", probe=True))
+
+    # The decoded images can be kept in memory for the next epochs of model.flow()
+    # model.add(Read(path="./img", cache=MemoryCache(max_bytes=4 * 1024**3)))
 
     # Printing the summary of the model
     print(model.summary())
     ```
     """
 
-    def __init__(self, path, name=None):
+    DETERMINISTIC = True
+
+    def __init__(
+        self,
+        path,
+        recursive=False,
+        extensions=IMAGE_EXTENSIONS,
+        workers=1,
+        target_size=None,
+        archives=False,
+        probe=False,
+        cache=None,
+        name=None,
+    ):
         """Init method for the Read layer.
 
         Args:
-            path (str): Path to store the image
+            path (str): Path of the folder with the images, or of a tar or zip archive with the images
+            recursive (bool, optional): Read the images of the subdirectories too, their names keep the relative
+                path. Defaults to False.
+            extensions (list[str], optional): Extensions of the files to read, case insensitive. Other files are
+                skipped, None reads every file. Defaults to IMAGE_EXTENSIONS.
+            workers (int, optional): Number of threads walking the subdirectories in parallel, which helps on slow or
+                network filesystems. When reading archives, it is the number of archives read in parallel.
+                Defaults to 1.
+            target_size (tuple, optional): Smallest (width, height) the images are used at, usually the dimension of
+                a following Resize layer. Large JPEG images are then downscaled by 2, 4 or 8 while they are decoded,
+                as long as they stay larger than this size. Model.compile() sets it from a Resize layer that directly
+                follows the Read layer. Defaults to None.
+            archives (bool, optional): Read the images inside the tar and zip archives of the folder, instead of the
+                images of the folder. The names of the images start with the name of their archive, without its
+                extension. Defaults to False.
+            probe (bool, optional): Check the first and last bytes of every image while the images are discovered,
+                and skip the empty files, the files that are not images and the truncated JPEG, PNG and BMP images
+                before they enter the model. The skipped files are listed by Model.quarantine(). Defaults to False.
+            cache (MemoryCache | DiskCache, optional): Cache of the decoded images, keyed by the path of the image,
+                its size and modification time, so an image read again, like at every epoch of Model.flow(), is not
+                decoded again until it changes. The cached images are read-only. Defaults to None.
             name (str, optional): Name of the layer, if not provided then automatically generates a unique name for
                 the layer. Defaults to None.
 
         Raises:
             ValueError: If the name parameter is invalid
+            ValueError: If the recursive parameter is invalid
+            ValueError: If the extensions parameter is invalid
+            ValueError: If the workers parameter is invalid
+            ValueError: If the target_size parameter is invalid
+            ValueError: If the archives parameter is invalid
+            ValueError: If the probe parameter is invalid
+            ValueError: If the cache parameter is invalid
         """
         if path and not isinstance(path, str):
             raise ValueError(f"The value {path} for the argument path is not valid")
 
+        if not isinstance(recursive, bool):
+            raise ValueError(f"The value {recursive} for the argument recursive is not valid")
+
+        if extensions is not None and (
+            not isinstance(extensions, (list, tuple)) or not all(isinstance(e, str) for e in extensions)
+        ):
+            raise ValueError(f"The value {extensions} for the argument extensions is not valid")
+
+        if not isinstance(workers, int) or isinstance(workers, bool) or workers < 1:
+            raise ValueError(f"The value {workers} for the argument workers is not valid")
+
+        if target_size is not None and (
+            not isinstance(target_size, tuple) or len(target_size) != 2 or target_size[0] <= 0 or target_size[1] <= 0
+        ):
+            raise ValueError(f"The value {target_size} for the argument target_size is not valid")
+
+        if not isinstance(archives, bool):
+            raise ValueError(f"The value {archives} for the argument archives is not valid")
+
+        if not isinstance(probe, bool):
+            raise ValueError(f"The value {probe} for the argument probe is not valid")
+
+        if cache is not None and not isinstance(cache, (MemoryCache, DiskCache)):
+            raise ValueError(f"The value {cache} for the argument cache is not valid")
+
         self.__path = path
+        self.__recursive = recursive
+        self.__extensions = tuple(e.lower() for e in extensions) if extensions is not None else None
+        self.__workers = workers
+        self.__target_size = target_size
+        self.__archives = archives
+        self.__probe = probe
+        self.__cache = cache
+
+        # Files skipped by the probing, with the reason, filled by the discovery threads
+        self.__quarantine = {}
 
         super().__init__(
             name,
             "read",
             [],  # Read layer does not support any parent layers
-            f"Path: {self.__path}",
+            f"Path: {self.__path}, Recursive: {self.__recursive}",
         )
 
+    def __setstate__(self, state):
+        """Restore the state of the layer after unpickling, with the default arguments for the missing ones.
+
+        Args:
+            state (dict): State of the layer.
+        """
+        state.setdefault("_Read__recursive", False)
+        state.setdefault("_Read__extensions", IMAGE_EXTENSIONS)
+        state.setdefault("_Read__workers", 1)
+        state.setdefault("_Read__target_size", None)
+        state.setdefault("_Read__archives", False)
+        state.setdefault("_Read__probe", False)
+        state.setdefault("_Read__cache", None)
+        state.setdefault("_Read__quarantine", {})
+
+        super().__setstate__(state)
+
+    @staticmethod
+    def __is_archive(name):
+        """Check if a file is an archive, based on its extension.
+
+        Args:
+            name (str): Name of the file.
+
+        Returns:
+            bool: True if the file is an archive, else False.
+        """
+        return name.lower().endswith(ARCHIVE_EXTENSIONS)
+
+    def __is_image(self, name):
+        """Check if a file is an image to read, based on its extension.
+
+        Args:
+            name (str): Name of the file.
+
+        Returns:
+            bool: True if the file must be read, else False.
+        """
+        return self.__extensions is None or os.path.splitext(name)[1].lower() in self.__extensions
+
+    def __is_valid(self, name, source):
+        """Probe an image when the probing is enabled, and quarantine it if it is not a complete image.
+
+        Args:
+            name (str): Name of the image.
+            source (str | bytes): Path of the image, or the encoded image.
+
+        Returns:
+            bool: True if the image must be read, else False.
+        """
+        if not self.__probe:
+            return True
+
+        reason = probe_image(source)
+
+        if reason is not None:
+            self.__quarantine[name] = reason
+
+        return reason is None
+
+    def __scan_dir(self, directory):
+        """Scan a single directory.
+
+        Args:
+            directory (str): Directory to scan, relative to the path of the layer.
+
+        Returns:
+            tuple: List of the images and list of the subdirectories, both relative to the path of the layer.
+        """
+        images = []
+        subdirectories = []
+
+        with os.scandir(os.path.join(self.__path, directory)) as entries:
+            for entry in entries:
+                name = os.path.join(directory, entry.name) if directory else entry.name
+
+                # Symbolic links to directories are not followed, they could create cycles
+                if entry.is_dir(follow_symlinks=False):
+                    if self.__recursive:
+                        subdirectories.append(name)
+                elif entry.is_file():
+                    if self.__archives:
+                        if self.__is_archive(entry.name):
+                            images.append(name)
+                    elif self.__is_image(entry.name) and self.__is_valid(name, entry.path):
+                        images.append(name)
+
+        return images, subdirectories
+
+    def __discover_images(self):
+        """Discover the images in the path and yields their names as soon as they are found.
+
+        Yields:
+            str: Name of the image, relative to the path of the layer.
+        """
+        if self.__workers == 1 or not self.__recursive:
+            directories = [""]
+
+            while directories:
+                images, subdirectories = self.__scan_dir(directories.pop())
+                directories.extend(reversed(subdirectories))
+
+                yield from images
+
+            return
+
+        with ThreadPoolExecutor(self.__workers) as pool:
+            pending = {pool.submit(self.__scan_dir, "")}
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    images, subdirectories = future.result()
+                    pending.update(pool.submit(self.__scan_dir, directory) for directory in subdirectories)
+
+                    yield from images
+
+    def __get_archives(self):
+        """Return the archives to read.
+
+        Returns:
+            list[tuple]: Path of each archive and the prefix of the names of its images, or None if the layer reads
+                a folder of images.
+        """
+        if os.path.isfile(self.__path) and self.__is_archive(self.__path):
+            return [(self.__path, "")]
+
+        if not self.__archives:
+            return None
+
+        archives = []
+
+        for archive in self.__discover_images():
+            prefix = archive[: -len(next(e for e in ARCHIVE_EXTENSIONS if archive.lower().endswith(e)))]
+            archives.append((os.path.join(self.__path, archive), prefix))
+
+        return archives
+
+    @staticmethod
+    def __get_member_name(prefix, member):
+        """Return the name of an image of an archive.
+
+        Args:
+            prefix (str): Prefix of the names of the images of the archive.
+            member (str): Name of the image inside the archive.
+
+        Returns:
+            str: Name of the image, without the parts that would let a Save layer write outside of its path.
+        """
+        parts = [part for part in member.replace("\\", "/").split("/") if part not in ("", ".", "..")]
+
+        return os.path.join(prefix, *parts)
+
+    def __read_archive(self, path, prefix, names_only=False):
+        """Read the images of an archive sequentially, in the order they are stored.
+
+        Args:
+            path (str): Path of the archive.
+            prefix (str): Prefix of the names of the images.
+            names_only (bool, optional): Only list the names of the images, without reading them. Defaults to False.
+
+        Yields:
+            tuple | str: Name and encoded bytes of each image, or only the name.
+        """
+        # The images are read even when only the names are needed if they must be probed
+        read_data = not names_only or self.__probe
+
+        if path.lower().endswith(".zip"):
+            with zipfile.ZipFile(path) as archive:
+                for info in archive.infolist():
+                    if info.is_dir() or not self.__is_image(info.filename):
+                        continue
+
+                    name = self.__get_member_name(prefix, info.filename)
+                    data = archive.read(info) if read_data else None
+
+                    if data is None or self.__is_valid(name, data):
+                        yield name if names_only else (name, data)
+
+            return
+
+        # The stream mode reads the archive once from the start, which suits compressed and remote archives
+        with tarfile.open(path, "r|*") as archive:
+            for member in archive:
+                if member.isfile() and self.__is_image(member.name):
+                    name = self.__get_member_name(prefix, member.name)
+                    data = archive.extractfile(member).read() if read_data else None
+
+                    if data is None or self.__is_valid(name, data):
+                        yield name if names_only else (name, data)
+
+    def __read_archives(self, archives):
+        """Read the images of several archives, in parallel when workers is more than 1.
+
+        Args:
+            archives (list[tuple]): Path of each archive and the prefix of the names of its images.
+
+        Yields:
+            tuple: Name and encoded bytes of each image.
+        """
+        if self.__workers == 1 or len(archives) == 1:
+            for path, prefix in archives:
+                yield from self.__read_archive(path, prefix)
+        else:
+            yield from self.__read_archives_parallel(archives)
+
+    def __read_archives_parallel(self, archives):
+        """Read the images of several archives on a pool of threads, each of them reading one archive at a time.
+
+        Args:
+            archives (list[tuple]): Path of each archive and the prefix of the names of its images.
+
+        Raises:
+            Exception: Any exception raised while reading an archive.
+
+        Yields:
+            tuple: Name and encoded bytes of each image, in the order they are read.
+        """
+        items = BoundedQueue(self.__workers * ARCHIVE_PREFETCH)
+
+        def read(path, prefix):
+            try:
+                for item in self.__read_archive(path, prefix):
+                    if not items.put(item):
+                        return
+            except BaseException as e:
+                items.put(e)
+
+            items.put(_END_OF_ARCHIVE)
+
+        with ThreadPoolExecutor(self.__workers) as pool:
+            for path, prefix in archives:
+                pool.submit(read, path, prefix)
+
+            try:
+                remaining = len(archives)
+
+                while remaining:
+                    item = items.get()
+
+                    if item is _END_OF_ARCHIVE:
+                        remaining -= 1
+                    elif isinstance(item, BaseException):
+                        raise item
+                    else:
+                        yield item
+            finally:
+                # Unblocks the readers when the consumer stops early
+                items.stop()
+
+    def _list_images(self):
+        """List the names of the images without reading them, used when the layers need every name upfront.
+
+        Returns:
+            list[str]: Names of the images, the same as the ones returned by _read_image().
+        """
+        archives = self.__get_archives()
+
+        if archives is None:
+            return list(self.__discover_images())
+
+        return [name for path, prefix in archives for name in self.__read_archive(path, prefix, names_only=True)]
+
+    def _get_quarantine(self):
+        """Return the files skipped by the probing since the images were last discovered.
+
+        Returns:
+            list[dict]: Name of each skipped file and the reason it was skipped, sorted by name.
+        """
+        return [{"source": name, "reason": reason} for name, reason in sorted(self.__quarantine.items())]
+
+    def _get_signature(self, path):
+        """Return a signature of an image that changes when the image changes, used by incremental transforms.
+
+        Args:
+            path (str | tuple): Name of the image, or the name and encoded bytes of an image read from an archive.
+
+        Returns:
+            str: Size and modification time of the file, or size and checksum of the bytes read from an archive.
+        """
+        if isinstance(path, tuple):
+            _, data = path
+
+            return f"{len(data)}:crc32:{zlib.crc32(data):08x}"
+
+        stat = os.stat(os.path.join(self.__path, path))
+
+        return f"{stat.st_size}:mtime:{stat.st_mtime_ns}"
+
     def __read_image_gen(self, images):
         """Read images from the filesystem and returns a generator.
 
@@ -58,17 +485,147 @@ class Read(Layer):
             ndarray: Image in the form of numpy ndarray.
         """
         for path in images:
-            image = cv2.imread(os.path.join(self.__path, path), 1)
+            yield self._read_image(path)
+
+    def _get_target_size(self):
+        """Return the smallest size the images are used at.
+
+        Returns:
+            tuple: Target (width, height) of the images, or None if they are decoded at full size.
+        """
+        return self.__target_size
 
-            yield path, [image]
+    def _set_target_size(self, target_size):
+        """Set the smallest size the images are used at, used by the model compilation.
+
+        Args:
+            target_size (tuple): Target (width, height) of the images.
+        """
+        self.__target_size = target_size
+
+    def __get_read_flag(self, source):
+        """Return the flag of cv2.imread with the largest reduction that keeps the image larger than the target size.
+
+        Args:
+            source (str | bytes): Path of the image, or the encoded image.
+
+        Returns:
+            int: Flag for cv2.imread.
+        """
+        if self.__target_size is None:
+            return cv2.IMREAD_COLOR
+
+        size = probe_image_size(source)
+
+        if size is None:
+            return cv2.IMREAD_COLOR
+
+        # The header gives the size before the EXIF orientation is applied, so both orientations must be large enough
+        smallest_side = min(size)
+        largest_target = max(self.__target_size)
+
+        for factor, flag in REDUCED_READ_FLAGS:
+            if smallest_side // factor >= largest_target:
+                return flag
+
+        return cv2.IMREAD_COLOR
+
+    def _read_image(self, path):
+        """Read a single image from the filesystem, or from the cache of the layer.
+
+        It is used by the generator and by the parallel executors, where each worker reads its own share of images.
+
+        Args:
+            path (str | tuple): Name of the image to read, or the name and encoded bytes of an image read from an
+                archive.
+
+        Returns:
+            tuple: Name of the image and a list with the image in the form of numpy ndarray.
+        """
+        if self.__cache is None:
+            return self.__decode_image(path)
+
+        name = path[0] if isinstance(path, tuple) else path
+
+        # The target size changes the decoded size, and a compiled copy of the layer shares the same cache
+        key = hashlib.sha256(
+            f"{self.__path}|{name}|{self._get_signature(path)}|{self.__target_size}".encode()
+        ).hexdigest()
+        images = self.__cache.get(key)
+
+        if images is not None:
+            return name, images
+
+        name, images = self.__decode_image(path)
+
+        # Images that could not be decoded are not cached, so they are read again once they are fixed
+        if all(image is not None for image in images):
+            self.__cache.put(key, images)
+
+        return name, images
+
+    def __decode_image(self, path):
+        """Read and decode a single image.
+
+        Args:
+            path (str | tuple): Name of the image to read, or the name and encoded bytes of an image read from an
+                archive.
+
+        Returns:
+            tuple: Name of the image and a list with the image in the form of numpy ndarray, or None if the image
+                could not be decoded.
+        """
+        if isinstance(path, tuple):
+            name, data = path
+
+            # Unlike cv2.imread, cv2.imdecode raises on empty data, archives can hold empty members
+            if len(data) == 0:
+                return name, [None]
+
+            try:
+                image = cv2.imdecode(np.frombuffer(data, np.uint8), self.__get_read_flag(data))
+            except cv2.error:
+                image = None
+
+            return name, [image]
+
+        full_path = os.path.join(self.__path, path)
+        image = cv2.imread(full_path, self.__get_read_flag(full_path))
+
+        return path, [image]
+
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model.
+
+        The number of workers and the probing of the files only change how the images are read, not the images.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {
+            "path": self.__path,
+            "recursive": self.__recursive,
+            "extensions": self.__extensions,
+            "target_size": self.__target_size,
+            "archives": self.__archives,
+        }
 
     def _apply_layer(self):
         """Apply the transformation method to change the layer.
 
+        The names of the images are discovered lazily, so the images can be transformed while the directories are
+        still being walked. Images of archives are read while they are discovered, and are given as tuples of the
+        name and the encoded bytes of the image.
+
         Returns:
-            tuple: List of images and a generator function to read the image once at a time.
+            tuple: Iterable of the names of the images and a generator function to read the image once at a time,
+                both share the same discovery.
         """
-        images = os.listdir(self.__path)
+        # Cleared rather than replaced, a copy of the layer made by the model compilation shares the same report
+        self.__quarantine.clear()
+
+        archives = self.__get_archives()
+        images = self.__discover_images() if archives is None else self.__read_archives(archives)
         gen = self.__read_image_gen(images)
 
         return images, gen
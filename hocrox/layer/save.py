@@ -1,9 +1,24 @@
 """Save layer for Hocrox."""
+import io
+import json
 import os
+import tarfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2
 import numpy as np
 
 from hocrox.utils import Layer
+from hocrox.utils.dtype import cast_image
+
+"""Number of pending writes allowed per writer thread before the pipeline waits for the disk."""
+PENDING_WRITES_PER_WRITER = 4
+
+"""Default size of the shard files in bytes."""
+DEFAULT_SHARD_SIZE = 256 * 1024 * 1024
 
 
 class Save(Layer):
@@ -20,34 +35,80 @@ class Save(Layer):
 
     # Adding model layers
     model.add(Read(path="./img"))
-    model.add(Save(path="./img_to_store", format="npy"))
+    model.add(Save(path="./img_to_store", format="npy", writers=4))
 
     # Printing the summary of the model
     print(model.summary())
     ```
     """
 
-    def __init__(self, path, format="npy", name=None):
+    def __init__(
+        self, path, format="npy", writers=0, shard_size=DEFAULT_SHARD_SIZE, shape=None, dtype="uint8", name=None
+    ):
         """Init method for the Save layer.
 
         Args:
             path (str): Path to store the image
-            format (str, optional): Format to save the image. Supported formats are npy and img. Defaults to "npy".
+            format (str, optional): Format to save the image. Supported formats are npy, img, shard and memmap. The
+                shard format appends the images as .npy files to tar files of about shard_size bytes, named
+                shard-{process id}-{run id}-{number}.tar, and describes them in an index-{process id}-{run id}.jsonl
+                file with one line per image. The run id is random, so every run of every Save layer writes new files.
+                The memmap format writes every image into its own row of a single preallocated .npy file
+                of shape (number of images * number of outputs, *shape), named after the layer, along with a .json
+                file giving the source image of the rows. Defaults to "npy".
+            writers (int, optional): Number of background threads writing the files. When more than 0, the images
+                are encoded by the layer and written in the background, so the next images are transformed while the
+                files are written. Errors are raised at the end of the transformation. Defaults to 0.
+            shard_size (int, optional): Size in bytes after which a new shard file is started, only used by the
+                shard format. Defaults to 256 MiB.
+            shape (tuple, optional): Shape of every image, like (224, 224, 3), required by the memmap format.
+                Defaults to None.
+            dtype (str, optional): Data type of the memmap file, images are cast to it. Defaults to "uint8".
             name (str, optional): Name of the layer, if not provided then automatically generates a unique name for
                 the layer. Defaults to None.
 
         Raises:
             ValueError: If the name parameter is invalid
             ValueError: If the format parameter is invalid
+            ValueError: If the writers parameter is invalid
+            ValueError: If the shard_size parameter is invalid
+            ValueError: If the shape parameter is invalid
+            ValueError: If the dtype parameter is invalid
         """
         if path and not isinstance(path, str):
             raise ValueError(f"The value {path} for the argument path is not valid")
 
-        if format not in ("npy", "img"):
+        if format not in ("npy", "img", "shard", "memmap"):
             raise ValueError(f"The value {format} for the argument format is not valid")
 
+        if not isinstance(writers, int) or isinstance(writers, bool) or writers < 0:
+            raise ValueError(f"The value {writers} for the argument writers is not valid")
+
+        if not isinstance(shard_size, int) or isinstance(shard_size, bool) or shard_size <= 0:
+            raise ValueError(f"The value {shard_size} for the argument shard_size is not valid")
+
+        if (format == "memmap" or shape is not None) and (
+            not isinstance(shape, tuple) or not all(isinstance(d, int) and d > 0 for d in shape)
+        ):
+            raise ValueError(f"The value {shape} for the argument shape is not valid")
+
+        try:
+            np.dtype(dtype)
+        except TypeError:
+            raise ValueError(f"The value {dtype} for the argument dtype is not valid")
+
         self.__path = path
         self.__format = format
+        self.__writers = writers
+        self.__shard_size = shard_size
+        self.__shape = shape
+        self.__dtype = dtype
+
+        # Row of the first output of each source image, set by _prepare() for the memmap format
+        self.__rows = None
+        self.__fanout = None
+
+        self.__init_writer()
 
         super().__init__(
             name,
@@ -56,6 +117,342 @@ class Save(Layer):
             f"Path: {self.__path}, Format: {self.__format}",
         )
 
+    def __init_writer(self):
+        """Initialize the state of the background writer, the pool itself is started on the first write."""
+        self.__pool = None
+        self.__lock = threading.Lock()
+        self.__slots = threading.BoundedSemaphore(max(1, self.__writers * PENDING_WRITES_PER_WRITER))
+        self.__errors = []
+
+        # State of the shard format, the files are opened on the first write and stay open until the shard is full
+        # or the run is done
+        self.__shard_lock = threading.Lock()
+        self.__shard_number = 0
+        self.__shard_run = None
+        self.__shard = None
+        self.__shard_index = None
+
+        # Memmap file of the memmap format, opened on the first write by each process
+        self.__memmap = None
+
+        # Files written for each image series by the npy and img formats, returned by _pop_outputs()
+        self.__outputs = {}
+
+    @staticmethod
+    def __encode(image, filename, format):
+        """Encode an image the same way it would be saved.
+
+        Args:
+            image (ndarray): Image to encode.
+            filename (str): Name of the file, its extension decides the image encoding.
+            format (str): Format to save the image.
+
+        Returns:
+            memoryview: Encoded image.
+        """
+        if format in ("npy", "shard"):
+            buffer = io.BytesIO()
+            np.lib.format.write_array(buffer, np.asanyarray(image), allow_pickle=False)
+
+            return buffer.getbuffer()
+
+        _, encoded = cv2.imencode(os.path.splitext(filename)[1], image)
+
+        return encoded.data
+
+    @staticmethod
+    def __write(path, data):
+        """Write an encoded image on the filesystem.
+
+        Args:
+            path (str): Path of the file.
+            data (memoryview): Encoded image.
+        """
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def _get_path(self):
+        """Return the path the images are saved to.
+
+        Returns:
+            str: Path of the layer.
+        """
+        return self.__path
+
+    def _get_format(self):
+        """Return the format the images are saved in.
+
+        Returns:
+            str: Format of the layer.
+        """
+        return self.__format
+
+    def _needs_sources(self):
+        """Check if the layer needs the full list of images before the transformation starts.
+
+        Returns:
+            bool: True for the memmap format, which preallocates a row for every image.
+        """
+        return self.__format == "memmap"
+
+    def __get_memmap_path(self, extension):
+        """Return the path of a file of the memmap format.
+
+        Args:
+            extension (str): Extension of the file.
+
+        Returns:
+            str: Path of the file.
+        """
+        return os.path.join(self.__path, f"{self._get_name()}{extension}")
+
+    def _prepare(self, sources, fanout, resume=False):
+        """Preallocate the memmap file and write the row to source mapping, only used by the memmap format.
+
+        Args:
+            sources (list): Names of every image returned by the read layer.
+            fanout (int): Number of images the layer receives for each source image.
+            resume (bool, optional): Whether the transformation resumes from a checkpoint, in which case an existing
+                memmap file is reopened instead of recreated, so the rows already written are kept. Defaults to False.
+
+        Raises:
+            ValueError: If the memmap file of a resumed transformation does not match the model or the images.
+        """
+        if self.__format != "memmap":
+            return
+
+        self.__rows = {source: index * fanout for index, source in enumerate(sources)}
+        self.__fanout = fanout
+
+        path = self.__get_memmap_path(".npy")
+        shape = (len(sources) * fanout,) + self.__shape
+
+        if resume and os.path.exists(path):
+            memmap = np.lib.format.open_memmap(path, mode="r+")
+
+            try:
+                with open(self.__get_memmap_path(".json")) as f:
+                    layout = json.load(f)
+            except (OSError, ValueError):
+                layout = None
+
+            if (
+                memmap.shape != shape
+                or memmap.dtype != np.dtype(self.__dtype)
+                or layout is None
+                or layout.get("fanout") != fanout
+                or layout.get("sources") != list(sources)
+            ):
+                raise ValueError(f"The memmap file {path} does not match the model and can not be resumed")
+
+            del memmap
+
+            return
+
+        memmap = np.lib.format.open_memmap(path, mode="w+", dtype=self.__dtype, shape=shape)
+        del memmap
+
+        # Row r holds the output r % fanout of the source r // fanout
+        with open(self.__get_memmap_path(".json"), "w") as f:
+            json.dump({"shape": [len(sources) * fanout, *self.__shape], "fanout": fanout, "sources": sources}, f)
+
+    def __write_memmap(self, image, name, index):
+        """Write an image into its row of the memmap file.
+
+        Args:
+            image (ndarray): Image to write.
+            name (str): Name of the image series.
+            index (int): Index of the image in the series.
+
+        Raises:
+            ValueError: If the model was not prepared, or the image does not fit in its row.
+        """
+        if self.__rows is None or name not in self.__rows or index >= self.__fanout:
+            raise ValueError(f"The image {index} of {name} has no row in the memmap file")
+
+        if image.shape != self.__shape:
+            raise ValueError(f"The shape {image.shape} of the image {index} of {name} is not {self.__shape}")
+
+        if self.__memmap is None:
+            with self.__lock:
+                if self.__memmap is None:
+                    self.__memmap = np.load(self.__get_memmap_path(".npy"), mmap_mode="r+")
+
+        self.__memmap[self.__rows[name] + index] = image
+
+    def __get_shard_name(self):
+        """Return the file name of the current shard.
+
+        Returns:
+            str: File name of the shard, unique for each run of the layer.
+        """
+        return f"shard-{self.__shard_run}-{self.__shard_number:06d}.tar"
+
+    def __open_shard(self, size):
+        """Open the current shard, or start a new one if adding size bytes would make it too large.
+
+        Args:
+            size (int): Size of the next image.
+        """
+        if self.__shard is not None and self.__shard.offset > 0 and self.__shard.offset + size > self.__shard_size:
+            self.__shard.close()
+            self.__shard = None
+            self.__shard_number += 1
+
+        # Other Save layers writing to the same path, or previous runs of this one, have their own run id
+        if self.__shard_run is None:
+            self.__shard_run = f"{os.getpid()}-{uuid.uuid4().hex[:12]}"
+
+        if self.__shard is None:
+            self.__shard = tarfile.open(os.path.join(self.__path, self.__get_shard_name()), "x")
+
+        if self.__shard_index is None:
+            self.__shard_index = open(os.path.join(self.__path, f"index-{self.__shard_run}.jsonl"), "x")
+
+    def __sync_shard(self):
+        """Write the buffered data of the current shard and of its index file to the filesystem.
+
+        The shard is still a readable tar file without its end of archive marker, so the images are kept if the
+        worker process is stopped before it closes the shard.
+        """
+        if self.__shard is not None:
+            self.__shard.fileobj.flush()
+
+        if self.__shard_index is not None:
+            self.__shard_index.flush()
+
+    def __close_shard(self):
+        """Close the current shard and its index file, the next run of the model starts new files with a new run id."""
+        if self.__shard is not None:
+            self.__shard.close()
+            self.__shard = None
+
+        if self.__shard_index is not None:
+            self.__shard_index.close()
+            self.__shard_index = None
+
+        self.__shard_number = 0
+        self.__shard_run = None
+
+    def __write_shard(self, member, data, name, index):
+        """Append an encoded image to the current shard and describe it in the index file.
+
+        Args:
+            member (str): Name of the image inside the shard.
+            data (memoryview): Encoded image.
+            name (str): Name of the image series.
+            index (int): Index of the image in the series.
+        """
+        with self.__shard_lock:
+            self.__open_shard(len(data))
+
+            info = tarfile.TarInfo(member)
+            info.size = len(data)
+            info.mtime = time.time()
+
+            self.__shard.addfile(info, io.BytesIO(data))
+
+            # The content is padded to a multiple of the tar block size
+            blocks, remainder = divmod(info.size, tarfile.BLOCKSIZE)
+            offset = self.__shard.offset - (blocks + (remainder > 0)) * tarfile.BLOCKSIZE
+
+            entry = {
+                "shard": self.__get_shard_name(),
+                "member": member,
+                "offset": offset,
+                "size": info.size,
+                "source": name,
+                "output": index,
+            }
+            self.__shard_index.write(json.dumps(entry) + "\n")
+
+    def __done(self, future):
+        """Release the slot of a finished write and keep its error, if any.
+
+        Args:
+            future (Future): Finished write.
+        """
+        with self.__lock:
+            if future.exception() is not None:
+                self.__errors.append(future.exception())
+
+        self.__slots.release()
+
+    def __write_async(self, write, *args):
+        """Hand an encoded image to the writer threads, waiting when too many writes are pending.
+
+        Args:
+            write (function): Function writing the image.
+            *args: Arguments of the function.
+        """
+        self.__slots.acquire()
+
+        with self.__lock:
+            if self.__pool is None:
+                self.__pool = ThreadPoolExecutor(self.__writers)
+
+            future = self.__pool.submit(write, *args)
+
+        future.add_done_callback(self.__done)
+
+    def _flush(self):
+        """Wait for the pending writes and raise the errors of the failed ones.
+
+        Raises:
+            RuntimeError: If some images could not be saved.
+        """
+        with self.__lock:
+            pool, self.__pool = self.__pool, None
+
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+        with self.__shard_lock:
+            self.__sync_shard()
+
+        if self.__memmap is not None:
+            self.__memmap.flush()
+
+        with self.__lock:
+            errors, self.__errors = self.__errors, []
+
+        if errors:
+            message = f"{len(errors)} images could not be saved, the first error was: {errors[0]}"
+
+            raise RuntimeError(message) from errors[0]
+
+    def _close(self):
+        """Close the current shard and its index file, called once the run is done or the worker process exits."""
+        with self.__shard_lock:
+            self.__close_shard()
+
+    def _pop_outputs(self):
+        """Return the files written by the npy and img formats since the last call, used by incremental transforms.
+
+        Returns:
+            dict: Paths of the files written for each image series.
+        """
+        with self.__lock:
+            outputs, self.__outputs = self.__outputs, {}
+
+        return outputs
+
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model.
+
+        The number of writers only changes how the files are written, not the files.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {
+            "path": self.__path,
+            "format": self.__format,
+            "shard_size": self.__shard_size,
+            "shape": self.__shape,
+            "dtype": self.__dtype,
+        }
+
     def _apply_layer(self, images, name=None):
         """Apply the transformation method to change the layer.
 
@@ -66,14 +463,87 @@ class Save(Layer):
         Returns:
             list[ndarray]: Return the transform images
         """
+        # Images read from subdirectories are saved in the same subdirectories
+        subdirectory, basename = os.path.split(str(name))
+        directory = os.path.join(self.__path, subdirectory)
+
+        if subdirectory and self.__format in ("npy", "img"):
+            os.makedirs(directory, exist_ok=True)
+
         for index, image in enumerate(images):
             if image is not None and len(image) != 0:
                 layer_name = self._get_name()
-                filename = f"{layer_name}_{index}_{name}"
+                filename = f"{layer_name}_{index}_{basename}"
+
+                # Arrays are written in the dtype of the model, the other formats keep their own dtype
+                if self.__format in ("npy", "shard"):
+                    image = cast_image(image, self._get_dtype())
 
-                if self.__format == "npy":
-                    np.save(os.path.join(self.__path, filename + ".npy"), image)
+                if self.__format == "memmap":
+                    self.__write_memmap(image, name, index)
+                elif self.__format == "shard":
+                    member = os.path.join(subdirectory, filename + ".npy").replace(os.sep, "/")
+                    data = self.__encode(image, filename, self.__format)
+
+                    if self.__writers > 0:
+                        self.__write_async(self.__write_shard, member, data, name, index)
+                    else:
+                        self.__write_shard(member, data, name, index)
                 else:
-                    cv2.imwrite(os.path.join(self.__path, filename), image)
+                    filename = filename + ".npy" if self.__format == "npy" else filename
+                    output = os.path.join(directory, filename)
+
+                    if self.__writers > 0:
+                        self.__write_async(self.__write, output, self.__encode(image, filename, self.__format))
+                    elif self.__format == "npy":
+                        np.save(output, image)
+                    else:
+                        cv2.imwrite(output, image)
+
+                    with self.__lock:
+                        self.__outputs.setdefault(str(name), []).append(output)
 
         return images
+
+    def __getstate__(self):
+        """Return the state of the layer for pickling, without the background writer.
+
+        Returns:
+            dict: State of the layer.
+        """
+        state = self.__dict__.copy()
+
+        for attribute in (
+            "pool",
+            "lock",
+            "slots",
+            "errors",
+            "shard_lock",
+            "shard_number",
+            "shard_run",
+            "shard",
+            "shard_index",
+            "memmap",
+            "outputs",
+        ):
+            del state[f"_Save__{attribute}"]
+
+        return state
+
+    def __setstate__(self, state):
+        """Restore the state of the layer after unpickling, with a new background writer.
+
+        Layers pickled by older versions of Hocrox get the default arguments for the missing ones.
+
+        Args:
+            state (dict): State of the layer.
+        """
+        state.setdefault("_Save__writers", 0)
+        state.setdefault("_Save__shard_size", DEFAULT_SHARD_SIZE)
+        state.setdefault("_Save__shape", None)
+        state.setdefault("_Save__dtype", "uint8")
+        state.setdefault("_Save__rows", None)
+        state.setdefault("_Save__fanout", None)
+
+        super().__setstate__(state)
+        self.__init_writer()
@@ -4,6 +4,7 @@ Models are the heart of Hocrox. In Hocrox, the model is used to make the entire
 augmenting the image.
 """
 
+from .branch import Branch
 from .model import Model
 
-__all__ = ["Model"]
+__all__ = ["Branch", "Model"]
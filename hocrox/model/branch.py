@@ -0,0 +1,203 @@
+"""Branches let a model send the output of its shared layers to several lists of layers.
+
+The shared layers of the model, like Read, Crop and Grayscale, run once per image. Their output is then given to every
+branch, each with its own layers and usually its own Save layer, so several variants of a dataset are produced without
+reading and decoding the images again. The shared images are made read-only, so a branch can not change the images
+seen by the other branches.
+"""
+import numpy as np
+
+from hocrox.utils import Layer
+
+__all__ = ["Branch", "Branches"]
+
+
+class Branch:
+    """Branch class holds the layers of one branch of a model, it is created with Model.branch().
+
+    Here is an example code to make a model with two branches.
+
+    ```python
+    from hocrox.model import Model
+    from hocrox.layer.preprocessing.color import Grayscale
+    from hocrox.layer.preprocessing.transformation import Resize
+    from hocrox.layer import Read, Save
+
+    # Initializing the model
+    model = Model()
+
+    # Adding the shared layers, they run once per image
+    model.add(Read(path="./img"))
+    model.add(Grayscale())
+
+    # Adding the layers of each branch
+    small = model.branch()
+    small.add(Resize((224, 224)))
+    small.add(Save("./img_224"))
+
+    large = model.branch()
+    large.add(Resize((512, 512)))
+    large.add(Save("./img_512"))
+
+    # Printing the summary of the model
+    print(model.summary())
+    ```
+    """
+
+    def __init__(self, model, layers=None):
+        """Init method for the Branch class.
+
+        Args:
+            model (Model): Model the branch belongs to.
+            layers (list, optional): Layers of the branch, used when a model is loaded. Defaults to None.
+        """
+        self.__model = model
+        self.__layers = list(layers) if layers is not None else []
+
+    def add(self, layer):
+        """Add a new layer to the branch, it is the same as model.add(layer, branch=branch).
+
+        Args:
+            layer (layer): Layer class to add into the branch.
+
+        Raises:
+            ValueError: If the model is frozen.
+            ValueError: If the layer is not valid.
+            ValueError: If the layer does support the parent layer.
+        """
+        self.__model.add(layer, branch=self)
+
+    def _get_layers(self):
+        """Return the layers of the branch.
+
+        Returns:
+            list: List of layers of the branch.
+        """
+        return self.__layers
+
+
+class Branches(Layer):
+    """Branches layer applies several lists of layers to the same images and returns the images of all of them.
+
+    It is the last layer executed by a branched model, after its shared layers.
+    """
+
+    def __init__(self, branches, name=None):
+        """Init method for the Branches layer.
+
+        Args:
+            branches (list[list]): Layers of each branch.
+            name (str, optional): Name of the layer, if not provided then automatically generates a unique name for
+                the layer. Defaults to None.
+        """
+        self.__branches = branches
+
+        super().__init__(
+            name,
+            "branches",
+            self.STANDARD_SUPPORTED_LAYERS,
+            f"Branches: {len(branches)}",
+            bypass_validation=True,
+        )
+
+    def _get_branches(self):
+        """Return the layers of each branch.
+
+        Returns:
+            list[list]: Layers of each branch.
+        """
+        return self.__branches
+
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model along with the layers of the branches.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {}
+
+    def _get_number_of_outputs(self):
+        """Return the number of images the branches output for each input image.
+
+        Returns:
+            int: Number of outputs, summed over the branches.
+        """
+        return sum(int(np.prod([layer._get_number_of_outputs() for layer in branch])) for branch in self.__branches)
+
+    def _needs_sources(self):
+        """Check if a layer of a branch needs the full list of images before the transformation starts.
+
+        Returns:
+            bool: True if the model must call _prepare() before running, else False.
+        """
+        return any(layer._needs_sources() for branch in self.__branches for layer in branch)
+
+    def _prepare(self, sources, fanout, resume=False):
+        """Prepare the layers of every branch before the transformation starts.
+
+        Args:
+            sources (list): Names of every image returned by the read layer.
+            fanout (int): Number of images the branches receive for each source image.
+            resume (bool, optional): Whether the transformation resumes from a checkpoint. Defaults to False.
+        """
+        for branch in self.__branches:
+            branch_fanout = fanout
+
+            for layer in branch:
+                layer._prepare(sources, branch_fanout, resume)
+                branch_fanout *= layer._get_number_of_outputs()
+
+    def _flush(self):
+        """Finish the pending work of the layers of every branch."""
+        for branch in self.__branches:
+            for layer in branch:
+                layer._flush()
+
+    def _close(self):
+        """Release what the layers of every branch keep open across flushes."""
+        for branch in self.__branches:
+            for layer in branch:
+                layer._close()
+
+    def _pop_outputs(self):
+        """Return the files written by the layers of every branch since the last call.
+
+        Returns:
+            dict: Paths of the files written for each image series.
+        """
+        outputs = {}
+
+        for branch in self.__branches:
+            for layer in branch:
+                for name, paths in layer._pop_outputs().items():
+                    outputs.setdefault(name, []).extend(paths)
+
+        return outputs
+
+    def _apply_layer(self, images, name=None):
+        """Apply the layers of every branch to the images.
+
+        Args:
+            images (list[ndarray]): List of images to transform.
+            name (str, optional): Name of the image series, used for saving the images. Defaults to None.
+
+        Returns:
+            list[ndarray]: Return the transform images of every branch, one branch after the other
+        """
+        # The images are shared by the branches, a layer writing into them would change the images of the others
+        if len(self.__branches) > 1:
+            for image in images:
+                if isinstance(image, np.ndarray):
+                    image.setflags(write=False)
+
+        transformed_images = []
+
+        for branch in self.__branches:
+            branch_images = images
+
+            for layer in branch:
+                branch_images = layer._apply_layer(branch_images, name)
+
+            transformed_images.extend(branch_images)
+
+        return transformed_images
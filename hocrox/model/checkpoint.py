@@ -0,0 +1,161 @@
+"""Checkpoint is used by the Model class to resume a long transformation after it was interrupted.
+
+The images returned by the read layer are sorted by name and identified by their index in this order. While the
+model runs, the indices of the transformed images are written periodically to a JSON file as a list of ranges, along
+with the state of the random generator used by the augmentation layers. Parallel executors finish the images out of
+order, so the ranges can have gaps, and a resumed transformation only skips the indices that were recorded.
+"""
+import hashlib
+import json
+import os
+import random
+import time
+
+__all__ = ["CHECKPOINT_INTERVAL", "Checkpoint"]
+
+"""Minimum number of seconds between two writes of the checkpoint file."""
+CHECKPOINT_INTERVAL = 30.0
+
+
+def _to_ranges(indices):
+    """Compress a set of indices into ranges.
+
+    Args:
+        indices (set[int]): Indices to compress.
+
+    Returns:
+        list[list[int]]: Ranges as [start, end] pairs, end excluded.
+    """
+    ranges = []
+
+    for index in sorted(indices):
+        if ranges and ranges[-1][1] == index:
+            ranges[-1][1] = index + 1
+        else:
+            ranges.append([index, index + 1])
+
+    return ranges
+
+
+def _from_ranges(ranges):
+    """Expand ranges into a set of indices.
+
+    Args:
+        ranges (list[list[int]]): Ranges as [start, end] pairs, end excluded.
+
+    Returns:
+        set[int]: Indices of the ranges.
+    """
+    return {index for start, end in ranges for index in range(start, end)}
+
+
+def _to_tuple(value):
+    """Convert the nested lists of a JSON random state back to tuples.
+
+    Args:
+        value (object): Value to convert.
+
+    Returns:
+        object: Value with tuples instead of lists.
+    """
+    return tuple(_to_tuple(item) for item in value) if isinstance(value, list) else value
+
+
+class Checkpoint:
+    """Checkpoint keeps track of the images transformed by a model and saves them periodically to a file."""
+
+    def __init__(self, path, fingerprint, sources, resume=False):
+        """Init method for the Checkpoint class.
+
+        Args:
+            path (str): Path of the checkpoint file.
+            fingerprint (str): Fingerprint of the model.
+            sources (list[str]): Names of every image returned by the read layer.
+            resume (bool, optional): Continue from the existing checkpoint file, if any. Defaults to False.
+
+        Raises:
+            ValueError: If the checkpoint file belongs to another model or to other images.
+        """
+        sources = sorted(sources)
+
+        self.__path = path
+        self.__fingerprint = fingerprint
+        self.__sources_digest = hashlib.sha256("\n".join(sources).encode()).hexdigest()
+        self.__indices = {source: index for index, source in enumerate(sources)}
+        self.__total = len(sources)
+        self.__completed = set()
+        self.__random_state = random.getstate()
+        self.__last_save = time.monotonic()
+
+        if resume and os.path.isfile(path):
+            self.__load()
+
+    def __load(self):
+        """Load the transformed images and the random state from the checkpoint file.
+
+        Raises:
+            ValueError: If the checkpoint file belongs to another model or to other images.
+        """
+        with open(self.__path, "r") as f:
+            state = json.load(f)
+
+        if state["fingerprint"] != self.__fingerprint:
+            raise ValueError(f"The checkpoint {self.__path} was made by a different model")
+
+        if state["sources"] != self.__sources_digest:
+            raise ValueError(f"The checkpoint {self.__path} was made on different images")
+
+        self.__completed = _from_ranges(state["completed"])
+
+        # Sequential runs continue with the same augmentations they would have produced without the interruption
+        self.__random_state = _to_tuple(state["random_state"])
+        random.setstate(self.__random_state)
+
+    def filter(self, images):
+        """Skip the images that were already transformed.
+
+        Args:
+            images (iterable): Names of the images returned by the read layer.
+
+        Yields:
+            str | tuple: Images to transform.
+        """
+        for image in images:
+            source = image[0] if isinstance(image, tuple) else image
+
+            if self.__indices.get(source) not in self.__completed:
+                yield image
+
+    def record(self, sources):
+        """Record images as transformed, and save the checkpoint file if the last save is old enough.
+
+        Args:
+            sources (list[str]): Names of the transformed images.
+        """
+        for source in sources:
+            if source in self.__indices:
+                self.__completed.add(self.__indices[source])
+
+        # Taken right after the images are done, an image that fails later must not change the saved state
+        self.__random_state = random.getstate()
+
+        if time.monotonic() - self.__last_save >= CHECKPOINT_INTERVAL:
+            self.save()
+
+    def save(self):
+        """Save the checkpoint file, the previous file is only replaced once the new one is complete."""
+        state = {
+            "fingerprint": self.__fingerprint,
+            "sources": self.__sources_digest,
+            "total": self.__total,
+            "completed": _to_ranges(self.__completed),
+            "random_state": self.__random_state,
+        }
+
+        temporary_path = f"{self.__path}.tmp"
+
+        with open(temporary_path, "w") as f:
+            json.dump(state, f)
+
+        os.replace(temporary_path, self.__path)
+        self.__last_save = time.monotonic()
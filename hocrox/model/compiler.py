@@ -0,0 +1,376 @@
+"""Compiler is used by the Model class to optimize the layers of a model before running it.
+
+Consecutive geometric layers like Rotate, HorizontalShift, RandomZoom or RandomFlip resample the image once each. The
+compiler replaces every run of such layers with a single AffineFusion layer, which multiplies the affine matrices of
+the layers and resamples each output image only once with cv2.warpAffine.
+
+Similarly, consecutive color layers like ChannelShift or RandomBrightness that work in the same color space, given by
+their LUT_COLOR_SPACE attribute, are replaced with a single LutFusion layer, which composes their lookup tables and
+applies them on uint8 images with one cv2.LUT call.
+
+When a Resize layer directly follows the Read layer, the read layer is given the size of the Resize layer as a target
+size, so large JPEG images are downscaled while they are decoded.
+"""
+import copy
+
+import cv2
+import numpy as np
+
+from hocrox.utils import Layer
+from hocrox.utils.affine import identity_matrix
+from hocrox.utils.lut import apply_hsv_lut, apply_lut, compose_luts
+
+__all__ = ["AffineFusion", "LutFusion", "compile_layers"]
+
+"""Types of the geometric layers that resample the image, runs of flips alone are cheaper without fusion."""
+RESAMPLING_LAYERS = (
+    "rotate",
+    "random_rotate",
+    "horizontal_shift",
+    "vertical_shift",
+    "random_horizontal_shift",
+    "random_vertical_shift",
+    "random_zoom",
+)
+
+"""Types of the rotation layers, which show the parts of the image that the resampling layers before them cropped."""
+ROTATE_LAYERS = ("rotate", "random_rotate")
+
+
+class AffineFusion(Layer):
+    """AffineFusion layer applies a run of geometric layers with a single cv2.warpAffine call per output image.
+
+    The random parameters of every layer are still sampled for each output image, so the fused layer produces the
+    same number of images as the original layers.
+    """
+
+    def __init__(self, layers, name=None):
+        """Init method for the AffineFusion layer.
+
+        Args:
+            layers (list): List of geometric layers to fuse, each of them must implement _sample_affine().
+            name (str, optional): Name of the layer, if not provided then automatically generates a unique name for
+                the layer. Defaults to None.
+        """
+        self.__layers = layers
+
+        # Rotations leave black corners in the image, the crops of the other layers never reach the borders
+        rotates = any(layer._get_type() in ROTATE_LAYERS for layer in layers)
+        self.__border_mode = cv2.BORDER_CONSTANT if rotates else cv2.BORDER_REPLICATE
+        self.DETERMINISTIC = all(layer.DETERMINISTIC for layer in layers)
+
+        super().__init__(
+            name,
+            "affine_fusion",
+            self.STANDARD_SUPPORTED_LAYERS,
+            f"Layers: {', '.join(layer._get_name() for layer in layers)}",
+        )
+
+    def _get_layers(self):
+        """Return the fused layers.
+
+        Returns:
+            list: List of fused layers.
+        """
+        return self.__layers
+
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model along with the fused layers.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {"border_mode": self.__border_mode}
+
+    def _get_number_of_outputs(self):
+        """Return the number of images the fused layers output for each input image.
+
+        Returns:
+            int: Number of outputs.
+        """
+        return int(np.prod([layer._get_number_of_outputs() for layer in self.__layers]))
+
+    def __sample(self, width, height, name, input_counts):
+        """Sample the combined transformation of every output image.
+
+        Args:
+            width (int): Width of the input image.
+            height (int): Height of the input image.
+            name (str): Name of the image series, used to get the random generators.
+            input_counts (list[int]): Number of images each fused layer already received for the series, updated in
+                place, so every output is sampled with the random generator it gets without fusion.
+
+        Returns:
+            list[tuple]: Matrix and size (width, height) of each output image.
+        """
+        transforms = [(identity_matrix(), (width, height))]
+
+        for index, layer in enumerate(self.__layers):
+            sampled = []
+
+            for matrix, size in transforms:
+                for layer_matrix, layer_size in layer._sample_affine(*size, name, input_counts[index]):
+                    # Dropped images are not passed to the next layers
+                    if layer_matrix is not None:
+                        sampled.append((layer_matrix @ matrix, layer_size))
+
+                input_counts[index] += 1
+
+            transforms = sampled
+
+        return transforms
+
+    def _apply_layer(self, images, name=None):
+        """Apply the transformation method to change the layer.
+
+        Args:
+            images (list[ndarray]): List of images to transform.
+            name (str, optional): Name of the image series, used for saving the images. Defaults to None.
+
+        Returns:
+            list[ndarray]: Return the transform images
+        """
+        transformed_images = []
+        input_counts = [0] * len(self.__layers)
+
+        for image in images:
+            if image is None or len(image) == 0:
+                input_counts[0] += 1
+                continue
+
+            height, width = image.shape[:2]
+
+            for matrix, size in self.__sample(width, height, name, input_counts):
+                if size == (width, height) and np.array_equal(matrix, identity_matrix()):
+                    transformed_images.append(image)
+                    continue
+
+                transformed_image = cv2.warpAffine(
+                    image, matrix[:2], size, flags=cv2.INTER_LINEAR, borderMode=self.__border_mode
+                )
+
+                if transformed_image is not None and len(transformed_image) != 0:
+                    transformed_images.append(transformed_image)
+
+        return transformed_images
+
+
+class LutFusion(Layer):
+    """LutFusion layer applies a run of color layers with a single lookup table per output image.
+
+    The random parameters of every layer are still sampled for each output image. Series with images that are not
+    uint8 are transformed by the original layers.
+    """
+
+    def __init__(self, layers, name=None):
+        """Init method for the LutFusion layer.
+
+        Args:
+            layers (list): List of color layers to fuse, each of them must implement _sample_lut() and share the same
+                LUT_COLOR_SPACE.
+            name (str, optional): Name of the layer, if not provided then automatically generates a unique name for
+                the layer. Defaults to None.
+        """
+        self.__layers = layers
+        self.__color_space = layers[0].LUT_COLOR_SPACE
+        self.DETERMINISTIC = all(layer.DETERMINISTIC for layer in layers)
+
+        super().__init__(
+            name,
+            "lut_fusion",
+            self.STANDARD_SUPPORTED_LAYERS,
+            f"Layers: {', '.join(layer._get_name() for layer in layers)}",
+        )
+
+    def _get_layers(self):
+        """Return the fused layers.
+
+        Returns:
+            list: List of fused layers.
+        """
+        return self.__layers
+
+    def _get_params(self):
+        """Return the parameters of the layer, used to fingerprint the model along with the fused layers.
+
+        Returns:
+            dict: Parameters of the layer.
+        """
+        return {"color_space": self.__color_space}
+
+    def _get_number_of_outputs(self):
+        """Return the number of images the fused layers output for each input image.
+
+        Returns:
+            int: Number of outputs.
+        """
+        return int(np.prod([layer._get_number_of_outputs() for layer in self.__layers]))
+
+    def __sample(self, name, input_counts):
+        """Sample the combined lookup table of every output image.
+
+        Args:
+            name (str): Name of the image series, used to get the random generators.
+            input_counts (list[int]): Number of images each fused layer already received for the series, updated in
+                place, so every output is sampled with the random generator it gets without fusion.
+
+        Returns:
+            list[ndarray]: Table of each output image, None stands for an unchanged image.
+        """
+        luts = [None]
+
+        for index, layer in enumerate(self.__layers):
+            sampled = []
+
+            for lut in luts:
+                layer_luts = layer._sample_lut(name, input_counts[index])
+                sampled.extend(compose_luts(lut, layer_lut) for layer_lut in layer_luts)
+                input_counts[index] += 1
+
+            luts = sampled
+
+        return luts
+
+    def _apply_layer(self, images, name=None):
+        """Apply the transformation method to change the layer.
+
+        Args:
+            images (list[ndarray]): List of images to transform.
+            name (str, optional): Name of the image series, used for saving the images. Defaults to None.
+
+        Returns:
+            list[ndarray]: Return the transform images
+        """
+        if any(image is not None and len(image) != 0 and image.dtype != np.uint8 for image in images):
+            for layer in self.__layers:
+                images = layer._apply_layer(images, name)
+
+            return images
+
+        transformed_images = []
+        input_counts = [0] * len(self.__layers)
+
+        for image in images:
+            if image is None or len(image) == 0:
+                input_counts[0] += 1
+                continue
+
+            for lut in self.__sample(name, input_counts):
+                if lut is None:
+                    transformed_images.append(image)
+                elif self.__color_space == "hsv":
+                    transformed_images.append(apply_hsv_lut(image, lut))
+                else:
+                    transformed_images.append(apply_lut(image, lut))
+
+        return transformed_images
+
+
+def _get_kind(layer):
+    """Return the kind of fusion a layer takes part in.
+
+    Args:
+        layer (layer): Layer to check.
+
+    Returns:
+        str: "affine" for geometric layers, "lut_<color space>" for color layers, or None.
+    """
+    if hasattr(layer, "_sample_affine"):
+        return "affine"
+
+    if hasattr(layer, "_sample_lut"):
+        return f"lut_{layer.LUT_COLOR_SPACE}"
+
+    return None
+
+
+def _ends_run(run, layer):
+    """Check if a layer must start a new run, even though it has the same kind as the layers of the run.
+
+    The corners of a rotated image are filled with the border color. Fused with the layers that crop the image before
+    it, like RandomZoom or a shift, a rotation would fill them with the cropped parts of the image instead, so the
+    rotation starts a new run.
+
+    Args:
+        run (list): List of consecutive layers of the same kind.
+        layer (layer): Next layer of the same kind.
+
+    Returns:
+        bool: True if the run ends before the layer, else False.
+    """
+    return layer._get_type() in ROTATE_LAYERS and any(previous._get_type() in RESAMPLING_LAYERS for previous in run)
+
+
+def _fuse(run, kind):
+    """Fuse a run of layers if it is worth it.
+
+    Args:
+        run (list): List of consecutive layers of the same kind.
+        kind (str): Kind of the layers.
+
+    Returns:
+        list: List with the fused layer, or the original layers.
+    """
+    if len(run) < 2:
+        return run
+
+    if kind == "affine" and any(layer._get_type() in RESAMPLING_LAYERS for layer in run):
+        return [AffineFusion(run)]
+
+    if kind is not None and kind.startswith("lut_"):
+        return [LutFusion(run)]
+
+    return run
+
+
+def _set_read_target_size(layers):
+    """Give the read layer the dimension of a Resize layer that directly follows it.
+
+    The read layer is copied, so the layers of the model are left unchanged.
+
+    Args:
+        layers (list): List of layers of the model.
+
+    Returns:
+        list: List of layers with the updated read layer.
+    """
+    if len(layers) < 2 or not hasattr(layers[0], "_set_target_size") or layers[1]._get_type() != "resize":
+        return layers
+
+    # A target size given by the user is kept
+    if layers[0]._get_target_size() is not None:
+        return layers
+
+    read_layer = copy.copy(layers[0])
+    read_layer._set_target_size(layers[1]._get_dim())
+
+    return [read_layer] + layers[1:]
+
+
+def compile_layers(layers):
+    """Compile the layers of a model into the layers that are actually executed.
+
+    Args:
+        layers (list): List of layers of the model.
+
+    Returns:
+        list: List of layers to execute.
+    """
+    layers = _set_read_target_size(layers)
+    compiled = []
+    run = []
+    run_kind = None
+
+    for layer in layers:
+        kind = _get_kind(layer)
+
+        if kind is None or kind != run_kind or (kind == "affine" and _ends_run(run, layer)):
+            compiled.extend(_fuse(run, run_kind))
+            run = []
+
+        run.append(layer)
+        run_kind = kind
+
+    compiled.extend(_fuse(run, run_kind))
+
+    return compiled
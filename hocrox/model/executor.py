@@ -0,0 +1,831 @@
+"""Executors are used by the Model class to run the layers of a model on the images.
+
+The sequential executor runs everything in the current process. The process executor shards the images returned by
+the read layer across a pool of worker processes, where each worker reads its share of images and runs the full layer
+chain on them. The thread executor runs the layer chain of each image on a pool of threads, it avoids the pickling and
+forking cost of processes and scales well when the layers spend their time in OpenCV or NumPy calls that release the
+GIL.
+
+The model can also be consumed as a stream with run_flow, which yields the transformed images instead of relying on a
+Save layer, optionally computing a bounded number of images ahead on a background thread. run_flow_thread and
+run_flow_process do the same on a pool of threads or processes, the worker processes send the images back through a
+ring of shared memory slots.
+"""
+import itertools
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from multiprocessing import Pool, util
+
+import cv2
+import numpy as np
+from tqdm import tqdm
+
+from hocrox.model.transport import SharedMemoryRing, pack_series
+from hocrox.utils import materialize, stack_images
+from hocrox.utils.bounded_queue import BoundedQueue
+
+__all__ = [
+    "EXECUTORS",
+    "apply_layers",
+    "flush_layers",
+    "close_layers",
+    "prepare_layers",
+    "run_sequential",
+    "run_process",
+    "run_thread",
+    "run_flow",
+    "run_flow_thread",
+    "run_flow_process",
+    "measure_gil",
+]
+
+"""List of supported executors."""
+EXECUTORS = ("sequential", "process", "thread")
+
+"""Maximum number of images sent to a worker at once, it keeps the progress bar responsive on large jobs."""
+MAX_CHUNK_SIZE = 64
+
+"""Number of images sent to a worker at once when the number of images is not known upfront."""
+STREAM_CHUNK_SIZE = 16
+
+"""Number of slots of the shared memory ring in addition to the chunks in flight, so the slots held by the consumer for
+the current images do not make the next chunks go through the pipe."""
+SPARE_SLOTS = 2
+
+# Layers of the model, set once per worker process by the pool initializer
+_worker_layers = None
+
+# Marks the end of the stream produced by the background thread of run_flow
+_END_OF_FLOW = object()
+
+
+def apply_layers(layers, images, path):
+    """Apply the layers one after another on the images of a single file.
+
+    Args:
+        layers (list): List of layers to apply, excluding the read layer.
+        images (list[ndarray]): List of images to transform.
+        path (str): Name of the image series.
+
+    Returns:
+        list[ndarray]: Transformed images.
+    """
+    for layer in layers:
+        images = layer._apply_layer(images, path)
+
+    return images
+
+
+def flush_layers(layers):
+    """Finish the pending work of the layers, like the files still being written in the background.
+
+    Args:
+        layers (list): List of layers of the model.
+    """
+    for layer in layers:
+        layer._flush()
+
+
+def close_layers(layers):
+    """Release what the layers keep open across flushes, like the current shard file, once a run is done.
+
+    Args:
+        layers (list): List of layers of the model.
+    """
+    for layer in layers:
+        layer._close()
+
+
+def pop_outputs(layers):
+    """Return the files written by the layers since the last call, like the images saved by the Save layers.
+
+    The executors call it after every chunk, so the layers do not keep the files of a long run in memory.
+
+    Args:
+        layers (list): List of layers of the model.
+
+    Returns:
+        dict: Paths of the files written for each image series.
+    """
+    outputs = {}
+
+    for layer in layers:
+        for name, paths in layer._pop_outputs().items():
+            outputs.setdefault(name, []).extend(paths)
+
+    return outputs
+
+
+def prepare_layers(layers, images, resume=False):
+    """Give the full list of images to the layers, if any of them needs it before the transformation starts.
+
+    Args:
+        layers (list): List of layers of the model.
+        images (iterable): Names of the images returned by the read layer.
+        resume (bool, optional): Whether the transformation resumes from a checkpoint. Defaults to False.
+
+    Returns:
+        iterable: Names of the images, to use instead of the given ones.
+    """
+    if not any(layer._needs_sources() for layer in layers[1:]):
+        return images
+
+    # Listing the names separately keeps the images streaming, like the ones read from archives
+    if hasattr(layers[0], "_list_images"):
+        sources = layers[0]._list_images()
+    else:
+        sources = images = list(images)
+
+    fanout = 1
+
+    for layer in layers[1:]:
+        layer._prepare(sources, fanout, resume)
+        fanout *= layer._get_number_of_outputs()
+
+    return images
+
+
+def _unbatch(batch, counts, series):
+    """Split a batch back into the image series it was made of.
+
+    Args:
+        batch (ndarray): Batch of images.
+        counts (list[int]): Number of images of each series in the batch.
+        series (list): List of image series, used for the names.
+
+    Returns:
+        list: List of image series, with the images as views of the batch.
+    """
+    unbatched = []
+    start = 0
+
+    for (path, _), count in zip(series, counts):
+        unbatched.append((path, list(batch[start : start + count])))
+        start += count
+
+    return unbatched
+
+
+def _apply_batch_layer(layer, images, path):
+    """Apply a layer that supports batches on the images of a single series.
+
+    Args:
+        layer (layer): Layer to apply.
+        images (list[ndarray]): List of images to transform.
+        path (str): Name of the image series.
+
+    Returns:
+        list[ndarray]: Transformed images.
+    """
+    batch = stack_images(images)
+
+    if batch is None:
+        return layer._apply_layer(images, path)
+
+    return list(layer._apply_layer(batch, path))
+
+
+def apply_layers_batched(layers, series):
+    """Apply the layers on several image series, passing the images as one batch to the layers that support it.
+
+    Layers that support batches receive a single (N, H, W, C) ndarray with the images of every series, as long as the
+    images share the same shape and dtype. The other layers receive the images of each series as usual.
+
+    Args:
+        layers (list): List of layers to apply, excluding the read layer.
+        series (list): List of image series, where each series is a tuple of the name and the list of images.
+
+    Returns:
+        list: List of transformed image series.
+    """
+    # Holds the images of every series in one batch along with the size of each series, if possible
+    batch = None
+
+    for layer in layers:
+        if getattr(layer, "SUPPORTS_BATCH", False):
+            if batch is None:
+                images = [image for _, series_images in series for image in series_images]
+                stacked = stack_images(images)
+                batch = (stacked, [len(series_images) for _, series_images in series]) if stacked is not None else None
+
+            if batch is not None:
+                output = layer._apply_layer(batch[0], None)
+
+                if isinstance(output, np.ndarray) and len(output) == len(batch[0]):
+                    batch = (output, batch[1])
+                else:
+                    # The layer dropped the images, which only happens when all of them became empty
+                    series = [(path, []) for path, _ in series]
+                    batch = None
+
+                continue
+
+            # The series do not share a shape, so each of them is batched on its own
+            series = [(path, _apply_batch_layer(layer, images, path)) for path, images in series]
+            continue
+
+        if batch is not None:
+            series = _unbatch(batch[0], batch[1], series)
+            batch = None
+
+        series = [(path, layer._apply_layer(images, path)) for path, images in series]
+
+    if batch is not None:
+        series = _unbatch(batch[0], batch[1], series)
+
+    return series
+
+
+def _transform_series(layers, series, batch_size=None):
+    """Apply the layers on several image series.
+
+    Args:
+        layers (list): List of layers to apply, excluding the read layer.
+        series (list): List of image series, where each series is a tuple of the name and the list of images.
+        batch_size (int, optional): Number of image series batched together. When None, the batch mode is disabled.
+            Defaults to None.
+
+    Returns:
+        list: List of transformed image series.
+    """
+    if batch_size is None:
+        return [(path, apply_layers(layers, images, path)) for path, images in series]
+
+    transformed = []
+
+    for group in _chunks(series, batch_size):
+        transformed.extend(apply_layers_batched(layers, group))
+
+    return transformed
+
+
+def _read_and_apply(layers, chunk, batch_size=None):
+    """Read a chunk of images and apply the layers on them.
+
+    Args:
+        layers (list): List of layers of the model.
+        chunk (list): Images to process.
+        batch_size (int, optional): Number of image series batched together. Defaults to None.
+
+    Returns:
+        list: List of transformed image series.
+    """
+    series = [layers[0]._read_image(image) for image in chunk]
+
+    return _transform_series(layers[1:], series, batch_size)
+
+
+def _read_images(read_layer, images, gen):
+    """Return the generator that reads the images one by one.
+
+    Args:
+        read_layer (layer): Read layer of the model.
+        images (iterable): Names of the images returned by the read layer.
+        gen (generator): Generator returned by the read layer.
+
+    Returns:
+        generator: Generator of the name and the list of images of each file.
+    """
+    # Reading through _read_image lets wrappers of the read layer, like the profiler, see every image
+    if hasattr(read_layer, "_read_image"):
+        return (read_layer._read_image(image) for image in images)
+
+    return gen
+
+
+def _total(images):
+    """Return the number of images for the progress bar.
+
+    Args:
+        images (iterable): Names of the images returned by the read layer.
+
+    Returns:
+        int: Number of images, or None if they are discovered lazily.
+    """
+    return len(images) if hasattr(images, "__len__") else None
+
+
+def run_sequential(layers, images, gen, batch_size=None, on_done=None):
+    """Run the model in the current process.
+
+    Args:
+        layers (list): List of layers of the model.
+        images (iterable): Names of the images returned by the read layer.
+        gen (generator): Generator returned by the read layer.
+        batch_size (int, optional): Number of image series batched together. Defaults to None.
+        on_done (function, optional): Called with the names of the images once they are transformed, and the files
+            written for them. Defaults to None.
+    """
+    with tqdm(total=_total(images)) as progress:
+        for chunk in _chunks(_read_images(layers[0], images, gen), batch_size or 1):
+            _transform_series(layers[1:], chunk, batch_size)
+            outputs = pop_outputs(layers)
+            progress.update(len(chunk))
+
+            if on_done is not None:
+                on_done([path for path, _ in chunk], outputs)
+
+
+def _chunks(images, size):
+    """Split the images into chunks.
+
+    Args:
+        images (iterable): Images to split.
+        size (int): Size of each chunk.
+
+    Yields:
+        list: Chunk of images.
+    """
+    chunk = []
+
+    for image in images:
+        chunk.append(image)
+
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def _init_worker(layers):
+    """Initialize a worker process of the process executor.
+
+    Args:
+        layers (list): List of layers of the model.
+    """
+    global _worker_layers
+
+    _worker_layers = layers
+
+    # Forked workers inherit the random state of the parent, without reseeding every worker produces the same
+    # augmentations
+    random.seed()
+
+    # Every worker already occupies a core, so OpenCV's own thread pool would only oversubscribe the machine
+    cv2.setNumThreads(1)
+
+    # The layers keep their files open across the chunks of the worker, they are closed when the worker exits
+    util.Finalize(None, close_layers, args=(layers,), exitpriority=0)
+
+
+def _process_chunk(args):
+    """Read and transform a chunk of images inside a worker process.
+
+    Args:
+        args (tuple): Images to process and the batch size.
+
+    Returns:
+        tuple: Names of the processed images, the measurements of the profiled layers, if any, and the files written
+            for the images.
+    """
+    chunk, batch_size = args
+
+    series = _read_and_apply(_worker_layers, chunk, batch_size)
+
+    # Workers can be stopped at any time once the pool is done, so the background work of each chunk is finished here
+    flush_layers(_worker_layers)
+
+    profiles = [layer._pop_profile() if hasattr(layer, "_pop_profile") else None for layer in _worker_layers]
+
+    return [path for path, _ in series], profiles, pop_outputs(_worker_layers)
+
+
+def run_process(layers, images, workers=None, batch_size=None, on_done=None):
+    """Run the model on a pool of worker processes.
+
+    Args:
+        layers (list): List of layers of the model.
+        images (iterable): Names of the images returned by the read layer.
+        workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        batch_size (int, optional): Number of image series batched together. Defaults to None.
+        on_done (function, optional): Called with the names of the images once they are transformed, and the files
+            written for them, in the order the chunks complete. Defaults to None.
+
+    Raises:
+        ValueError: If the read layer does not support reading a single image.
+    """
+    if not hasattr(layers[0], "_read_image"):
+        raise ValueError("The read layer does not support parallel execution")
+
+    workers = workers or os.cpu_count() or 1
+    total = _total(images)
+    chunk_size = min(MAX_CHUNK_SIZE, total // (workers * 4)) if total is not None else STREAM_CHUNK_SIZE
+    chunk_size = max(1, chunk_size, batch_size or 1)
+    chunks = ((chunk, batch_size) for chunk in _chunks(images, chunk_size))
+
+    with Pool(workers, initializer=_init_worker, initargs=(layers,)) as pool:
+        with tqdm(total=_total(images)) as progress:
+            for paths, profiles, outputs in pool.imap_unordered(_process_chunk, chunks):
+                for layer, profile in zip(layers, profiles):
+                    if profile is not None:
+                        layer._merge_profile(profile)
+
+                progress.update(len(paths))
+
+                if on_done is not None:
+                    on_done(paths, outputs)
+
+        # Lets the workers exit on their own, so they close the files of their layers
+        pool.close()
+        pool.join()
+
+
+def _bounded_map(pool, fn, items, limit):
+    """Submit the items to a pool while keeping at most limit of them in flight.
+
+    Args:
+        pool (Executor): Pool to submit the items to.
+        fn (function): Function to call on each item.
+        items (iterable): Items to process.
+        limit (int): Maximum number of pending items.
+
+    Yields:
+        object: Result of each item, in the order of completion.
+    """
+    pending = set()
+
+    for item in items:
+        if len(pending) >= limit:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                yield future.result()
+
+        pending.add(pool.submit(fn, item))
+
+    for future in pending:
+        yield future.result()
+
+
+def run_thread(layers, images, workers=None, batch_size=None, on_done=None):
+    """Run the model on a pool of threads.
+
+    Args:
+        layers (list): List of layers of the model.
+        images (iterable): Names of the images returned by the read layer.
+        workers (int, optional): Number of threads. Defaults to the number of CPUs.
+        batch_size (int, optional): Number of image series batched together. Defaults to None.
+        on_done (function, optional): Called in the current thread with the names of the images once they are
+            transformed, and the files written for them, in the order the chunks complete. The files of the images
+            still in progress on other threads can be given too. Defaults to None.
+
+    Raises:
+        ValueError: If the read layer does not support reading a single image.
+    """
+    if not hasattr(layers[0], "_read_image"):
+        raise ValueError("The read layer does not support parallel execution")
+
+    workers = workers or os.cpu_count() or 1
+
+    chunks = _chunks(images, batch_size or 1)
+
+    def process(chunk):
+        return _read_and_apply(layers, chunk, batch_size)
+
+    with ThreadPoolExecutor(workers) as pool:
+        with tqdm(total=_total(images)) as progress:
+            for series in _bounded_map(pool, process, chunks, workers * 4):
+                outputs = pop_outputs(layers)
+                progress.update(len(series))
+
+                if on_done is not None:
+                    on_done([path for path, _ in series], outputs)
+
+
+def _prefetch(gen, prefetch):
+    """Consume a generator on a background thread, keeping at most prefetch items ahead of the consumer.
+
+    Args:
+        gen (generator): Generator to consume.
+        prefetch (int): Maximum number of items computed ahead.
+
+    Raises:
+        Exception: Any exception raised by the generator, re-raised in the consumer thread.
+
+    Yields:
+        object: Items of the generator, in order.
+    """
+    items = BoundedQueue(prefetch)
+
+    def produce():
+        try:
+            for item in gen:
+                if not items.put(item):
+                    return
+
+            items.put(_END_OF_FLOW)
+        except BaseException as e:
+            items.put(e)
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item = items.get()
+
+            if item is _END_OF_FLOW:
+                break
+
+            if isinstance(item, BaseException):
+                raise item
+
+            yield item
+    finally:
+        # Unblocks the producer when the consumer stops early
+        items.stop()
+        thread.join()
+
+
+def run_flow(layers, images, gen, prefetch=0, batch_size=None):
+    """Run the model lazily and yield the transformed images.
+
+    Args:
+        layers (list): List of layers of the model.
+        images (iterable): Names of the images returned by the read layer.
+        gen (generator): Generator returned by the read layer.
+        prefetch (int, optional): Number of images transformed ahead on a background thread. When 0, every image is
+            transformed on demand in the consumer thread. Defaults to 0.
+        batch_size (int, optional): Number of image series batched together. Defaults to None.
+
+    Yields:
+        tuple: Name of the image series and the list of transformed images.
+    """
+
+    def transformed():
+        for chunk in _chunks(_read_images(layers[0], images, gen), batch_size or 1):
+            series = _transform_series(layers[1:], chunk, batch_size)
+
+            # The files written by the Save layers are only tracked by incremental transforms
+            pop_outputs(layers)
+
+            for path, transformed_images in series:
+                yield path, _visible(transformed_images)
+
+    if prefetch == 0:
+        yield from transformed()
+    else:
+        yield from _prefetch(transformed(), prefetch)
+
+
+def _visible(images):
+    """Drop the images removed by the layers and materialize the flipped views, for the consumer of a flow.
+
+    Args:
+        images (list[ndarray]): Transformed images.
+
+    Returns:
+        list[ndarray]: Images that are not None, without negative strides.
+    """
+    return [materialize(image) for image in images if image is not None]
+
+
+def run_flow_thread(layers, images, workers=None, prefetch=0, batch_size=None):
+    """Run the model lazily on a pool of threads and yield the transformed images, in the order they complete.
+
+    Args:
+        layers (list): List of layers of the model.
+        images (iterable): Names of the images returned by the read layer.
+        workers (int, optional): Number of threads. Defaults to the number of CPUs.
+        prefetch (int, optional): Number of chunks transformed ahead in addition to two chunks per thread. Defaults
+            to 0.
+        batch_size (int, optional): Number of image series batched together. Defaults to None.
+
+    Raises:
+        ValueError: If the read layer does not support reading a single image.
+
+    Yields:
+        tuple: Name of the image series and the list of transformed images.
+    """
+    if not hasattr(layers[0], "_read_image"):
+        raise ValueError("The read layer does not support parallel execution")
+
+    workers = workers or os.cpu_count() or 1
+
+    def process(chunk):
+        return _read_and_apply(layers, chunk, batch_size)
+
+    with ThreadPoolExecutor(workers) as pool:
+        for series in _bounded_map(pool, process, _chunks(images, batch_size or 1), workers * 2 + prefetch):
+            # The files written by the Save layers are only tracked by incremental transforms
+            pop_outputs(layers)
+
+            for path, transformed_images in series:
+                yield path, _visible(transformed_images)
+
+
+def _process_flow_chunk(args):
+    """Read and transform a chunk of images inside a worker process, and copy the images to a shared memory slot.
+
+    Args:
+        args (tuple): Images to process, the batch size and the slot given to the chunk.
+
+    Returns:
+        tuple: Transformed image series packed by pack_series(), the size needed to hold them in a slot and the
+            measurements of the profiled layers, if any.
+    """
+    chunk, batch_size, slot = args
+
+    series = _read_and_apply(_worker_layers, chunk, batch_size)
+    flush_layers(_worker_layers)
+
+    profiles = [layer._pop_profile() if hasattr(layer, "_pop_profile") else None for layer in _worker_layers]
+    packed, required = pack_series(series, slot)
+
+    # The files written by the Save layers are only tracked by incremental transforms
+    pop_outputs(_worker_layers)
+
+    return packed, required, profiles
+
+
+def run_flow_process(layers, images, workers=None, prefetch=0, batch_size=None):
+    """Run the model lazily on a pool of worker processes and yield the transformed images, in the order they complete.
+
+    The worker processes copy the transformed images into a ring of shared memory slots, and the images are yielded as
+    views of the slots, check hocrox.model.transport. The Save layers at the end of the model run in the current
+    process on these views, so the images are not copied to be saved either.
+
+    Args:
+        layers (list): List of layers of the model.
+        images (iterable): Names of the images returned by the read layer.
+        workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        prefetch (int, optional): Number of chunks transformed ahead in addition to two chunks per worker. Defaults
+            to 0.
+        batch_size (int, optional): Number of image series batched together. Defaults to None.
+
+    Raises:
+        ValueError: If the read layer does not support reading a single image.
+
+    Yields:
+        tuple: Name of the image series and the list of transformed images.
+    """
+    if not hasattr(layers[0], "_read_image"):
+        raise ValueError("The read layer does not support parallel execution")
+
+    workers = workers or os.cpu_count() or 1
+    limit = workers * 2 + prefetch
+
+    split = len(layers)
+
+    while split > 1 and layers[split - 1]._get_type() == "save":
+        split -= 1
+
+    ring = SharedMemoryRing(limit + SPARE_SLOTS)
+    results = queue.Queue()
+    chunks = _chunks(images, batch_size or 1)
+
+    def submit(chunk):
+        slot = ring.acquire()
+
+        pool.apply_async(
+            _process_flow_chunk,
+            ((chunk, batch_size, slot),),
+            callback=lambda result: results.put((slot, result)),
+            error_callback=lambda error: results.put((slot, error)),
+        )
+
+    try:
+        with Pool(workers, initializer=_init_worker, initargs=(layers[:split],)) as pool:
+            pending = 0
+
+            for chunk in itertools.islice(chunks, limit):
+                submit(chunk)
+                pending += 1
+
+            while pending > 0:
+                slot, result = results.get()
+                pending -= 1
+
+                if isinstance(result, BaseException):
+                    raise result
+
+                packed, required, profiles = result
+
+                for layer, profile in zip(layers, profiles):
+                    if profile is not None:
+                        layer._merge_profile(profile)
+
+                series = ring.unpack(packed, slot, required)
+
+                # Submitted before the images are yielded, so the workers stay busy while the consumer uses them
+                for chunk in itertools.islice(chunks, 1):
+                    submit(chunk)
+                    pending += 1
+
+                for path, transformed_images in series:
+                    transformed_images = apply_layers(layers[split:], transformed_images, path)
+                    pop_outputs(layers[split:])
+
+                    yield path, _visible(transformed_images)
+
+            pool.close()
+            pool.join()
+    finally:
+        ring.close()
+
+
+def _writes_files(layer):
+    """Check if a layer writes files when it is applied, like the Save layers.
+
+    Args:
+        layer (layer): Layer to check.
+
+    Returns:
+        bool: True if the layer, or a layer of its branches, writes files, else False.
+    """
+    if layer._get_type() == "save":
+        return True
+
+    return hasattr(layer, "_get_branches") and any(
+        _writes_files(branch_layer) for branch in layer._get_branches() for branch_layer in branch
+    )
+
+
+def measure_gil(layers, images, workers=None, samples=16):
+    """Measure how well each layer scales on a pool of threads.
+
+    Each layer is timed on the same inputs once in the current thread and once on a pool of threads. A layer that
+    releases the GIL runs close to workers times faster on the pool, while a layer that holds it barely speeds up.
+    The layers that write files are not applied, the Save layers give their inputs unchanged to the next layers, and
+    branches holding Save layers end the measurement.
+
+    Args:
+        layers (list): List of layers of the model.
+        images (iterable): Names of the images returned by the read layer.
+        workers (int, optional): Number of threads. Defaults to the number of CPUs.
+        samples (int, optional): Number of images used for the measurement. Defaults to 16.
+
+    Raises:
+        ValueError: If the read layer does not support reading a single image.
+
+    Returns:
+        list[dict]: Measurement of each layer, with the sequential and threaded time per image in milliseconds, the
+            speedup and whether the layer holds the GIL, which is None when only one CPU is available.
+    """
+    if not hasattr(layers[0], "_read_image"):
+        raise ValueError("The read layer does not support parallel execution")
+
+    workers = workers or os.cpu_count() or 1
+    ideal_speedup = min(workers, os.cpu_count() or 1)
+
+    # The Save layers output their inputs, they are skipped without changing the images of the next layers
+    measured = [layers[0]]
+
+    for layer in layers[1:]:
+        if layer._get_type() == "save":
+            continue
+
+        if _writes_files(layer):
+            break
+
+        measured.append(layer)
+
+    # Each entry holds the inputs of every sampled image for one layer
+    inputs = [list(itertools.islice(images, samples))]
+    outputs = [layers[0]._read_image(image) for image in inputs[0]]
+
+    for layer in measured[1:]:
+        inputs.append(outputs)
+        outputs = [(path, layer._apply_layer(series, path)) for path, series in outputs]
+
+    calls = [layers[0]._read_image]
+    calls += [lambda args, layer=layer: layer._apply_layer(args[1], args[0]) for layer in measured[1:]]
+    report = []
+
+    with ThreadPoolExecutor(workers) as pool:
+        for layer, call, layer_inputs in zip(measured, calls, inputs):
+            if not layer_inputs:
+                continue
+
+            start = time.perf_counter()
+            for args in layer_inputs:
+                call(args)
+            sequential_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            list(pool.map(call, layer_inputs))
+            threaded_time = time.perf_counter() - start
+
+            speedup = sequential_time / threaded_time if threaded_time > 0 else float(ideal_speedup)
+
+            report.append(
+                {
+                    "layer": layer,
+                    "sequential_ms": sequential_time * 1000 / len(layer_inputs),
+                    "threaded_ms": threaded_time * 1000 / len(layer_inputs),
+                    "speedup": speedup,
+                    # A single core cannot tell the two kinds of layers apart
+                    "holds_gil": speedup < (1 + ideal_speedup) / 2 if ideal_speedup > 1 else None,
+                }
+            )
+
+    flush_layers(measured)
+    close_layers(measured)
+
+    return report
@@ -0,0 +1,221 @@
+"""Manifest is used by the Model class to transform only the new or changed images on a re-run.
+
+The manifest is a JSON lines file stored next to the saved images. Its first line holds the fingerprint of the model,
+derived from the description and the parameters of every layer, and every other line records an image that was
+transformed along with a signature of the image, like its size and modification time, and the files saved for it. A
+re-run of the same model skips the images whose signature did not change and whose files still exist, while any change
+to the model invalidates the whole manifest.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+__all__ = ["MANIFEST_NAME", "Manifest", "fingerprint_layers"]
+
+"""Name of the manifest file, created in the path of the Save layer."""
+MANIFEST_NAME = ".hocrox_manifest.jsonl"
+
+
+def _describe_value(value):
+    """Describe a parameter of a layer in a stable way.
+
+    Args:
+        value (object): Value of the parameter.
+
+    Returns:
+        str: Description of the value, or None for values that are not parameters, like locks or thread pools.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return repr(value)
+
+    if isinstance(value, np.ndarray):
+        return f"ndarray({value.dtype}, {value.shape}, {hashlib.sha256(value.tobytes()).hexdigest()})"
+
+    if isinstance(value, (list, tuple)):
+        items = [_describe_value(item) for item in value]
+
+        return None if None in items else f"{type(value).__name__}({', '.join(items)})"
+
+    return None
+
+
+def fingerprint_layers(layers, compiled=False):
+    """Compute the fingerprint of the layers of a model.
+
+    Args:
+        layers (list): List of layers of the model.
+        compiled (bool, optional): Whether the model is compiled, which changes how the images are resampled.
+            Defaults to False.
+
+    Returns:
+        str: Fingerprint of the layers.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"compiled={compiled}".encode())
+
+    for layer in layers:
+        name, parameters = layer._get_description()
+        digest.update(f"{type(layer).__module__}.{type(layer).__qualname__}|{name}|{parameters}".encode())
+
+        # The description of some layers, like Convolution, does not show every parameter. Only the parameters are
+        # hashed, the state a layer builds while running must not change the fingerprint of the model
+        params = layer._get_params()
+
+        if params is None:
+            params = {key: value for key, value in vars(layer).items() if not key.startswith("_Layer__")}
+
+        for key, value in sorted(params.items()):
+            description = _describe_value(value)
+
+            if description is not None:
+                digest.update(f"|{key}={description}".encode())
+
+        digest.update(f"|dtype={layer._get_dtype()}".encode())
+
+        # The seed only changes the output of the layers that draw random numbers
+        if not layer.DETERMINISTIC:
+            seed, index = layer._get_random_state()
+            digest.update(f"|seed={seed}|index={index}".encode())
+
+        # The layers fused by the compilation are held by the fused layer
+        if hasattr(layer, "_get_layers"):
+            digest.update(f"|fused={fingerprint_layers(layer._get_layers(), compiled)}".encode())
+
+        # The layers of the branches of a branched model are held by its Branches layer
+        if hasattr(layer, "_get_branches"):
+            for branch in layer._get_branches():
+                digest.update(f"|branch={fingerprint_layers(branch, compiled)}".encode())
+
+    return digest.hexdigest()
+
+
+class Manifest:
+    """Manifest keeps track of the images already transformed by a model."""
+
+    def __init__(self, path, fingerprint):
+        """Init method for the Manifest class, loads the existing manifest of the same model, if any.
+
+        Args:
+            path (str): Directory of the manifest, usually the path of the Save layer.
+            fingerprint (str): Fingerprint of the model.
+        """
+        self.__directory = path
+        self.__path = os.path.join(path, MANIFEST_NAME)
+        self.__fingerprint = fingerprint
+        self.__entries = self.__load()
+        self.__pending = {}
+        self.__outputs = {}
+
+        # The manifest is rewritten without the outdated lines, then extended as images are transformed
+        self.__file = open(self.__path, "w")
+        self.__file.write(json.dumps({"fingerprint": fingerprint}) + "\n")
+
+        for source, entry in self.__entries.items():
+            self.__file.write(json.dumps({"source": source, **entry}) + "\n")
+
+        self.__file.flush()
+
+    def __load(self):
+        """Load the entries of the existing manifest.
+
+        Returns:
+            dict: Signature and saved files of each transformed image, empty if the manifest belongs to another model.
+        """
+        entries = {}
+
+        if not os.path.isfile(self.__path):
+            return entries
+
+        with open(self.__path, "r") as f:
+            for index, line in enumerate(f):
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # The last line can be incomplete if the previous run was killed while writing it
+                    continue
+
+                if index == 0:
+                    if entry.get("fingerprint") != self.__fingerprint:
+                        return entries
+
+                    continue
+
+                # Manifests written by older versions of Hocrox do not list the saved files, their images are
+                # transformed again
+                if entry.get("outputs"):
+                    entries[entry["source"]] = {"signature": entry["signature"], "outputs": entry["outputs"]}
+
+        return entries
+
+    def __is_saved(self, source, signature):
+        """Check if an image was transformed by the model, did not change since and its saved files still exist.
+
+        Args:
+            source (str): Name of the image.
+            signature (str): Current signature of the image.
+
+        Returns:
+            bool: True if the image can be skipped, else False.
+        """
+        entry = self.__entries.get(source)
+
+        if entry is None or entry["signature"] != signature:
+            return False
+
+        return all(os.path.isfile(os.path.join(self.__directory, output)) for output in entry["outputs"])
+
+    def filter(self, read_layer, images):
+        """Skip the images that were already transformed, did not change since and whose saved files still exist.
+
+        Args:
+            read_layer (layer): Read layer of the model.
+            images (iterable): Names of the images returned by the read layer.
+
+        Yields:
+            str | tuple: Images to transform.
+        """
+        for image in images:
+            source = image[0] if isinstance(image, tuple) else image
+            signature = read_layer._get_signature(image)
+
+            if self.__is_saved(source, signature):
+                continue
+
+            self.__pending[source] = signature
+
+            yield image
+
+    def record(self, sources, outputs):
+        """Record images as transformed, along with the files saved for them.
+
+        The images that did not save any file, like the ones that could not be decoded, are not recorded, so they are
+        transformed again by the next run.
+
+        Args:
+            sources (list[str]): Names of the transformed images.
+            outputs (dict): Paths of the files saved for each image, it can also hold the files of images that are
+                still being transformed.
+        """
+        for source, paths in outputs.items():
+            self.__outputs.setdefault(source, []).extend(paths)
+
+        for source in sources:
+            signature = self.__pending.pop(source, None)
+            paths = self.__outputs.pop(source, None)
+
+            if signature is None or not paths:
+                continue
+
+            # Relative to the manifest, the files of the Save layers of other branches live in other folders
+            entry = {"signature": signature, "outputs": [os.path.relpath(path, self.__directory) for path in paths]}
+
+            self.__entries[source] = entry
+            self.__file.write(json.dumps({"source": source, **entry}) + "\n")
+
+        self.__file.flush()
+
+    def close(self):
+        """Close the manifest file."""
+        self.__file.close()
@@ -3,9 +3,29 @@
 import pickle
 
 from prettytable import PrettyTable
-from tqdm import tqdm
 
-from hocrox.utils import is_valid_layer
+from hocrox.utils import DiskCache, MemoryCache, is_valid_layer
+from hocrox.utils.dtype import DTYPES, cast_image, get_dtype
+
+from hocrox.model.branch import Branch, Branches
+from hocrox.model.checkpoint import Checkpoint
+from hocrox.model.compiler import compile_layers
+from hocrox.model.executor import (
+    EXECUTORS,
+    close_layers,
+    flush_layers,
+    prepare_layers,
+    measure_gil,
+    run_flow,
+    run_flow_process,
+    run_flow_thread,
+    run_process,
+    run_sequential,
+    run_thread,
+)
+from hocrox.model.manifest import Manifest, fingerprint_layers
+from hocrox.model.prefix import cache_prefix
+from hocrox.model.profiler import ProfiledLayer
 
 __all__ = ["Model"]
 
@@ -33,20 +53,51 @@ class Model:
     ```
     """
 
-    def __init__(self):
-        """Init method for the Model class."""
+    def __init__(self, seed=None, dtype=None):
+        """Init method for the Model class.
+
+        Args:
+            seed (int, optional): Seed of the augmentation layers. With a seed, every image a layer receives gets its
+                own random generator derived from the seed, the name of the image, the index of the layer and the index
+                of the image, so the model produces the same images whatever the executor, the number of workers or
+                the order of the images. Defaults to None, which seeds the generators from the global random module.
+            dtype (str, optional): Dtype of the images output by the model, one of "uint8", "float16" and "float32".
+                The layers keep uint8 images uint8 as long as it is valid and never compute in float64, the layers
+                that need floats, like Rescale, work in float32 or stay in uint8 with the uint8 policy. The images are
+                cast to the dtype when they are yielded by .flow() and when the Save layer writes them in the npy or
+                shard format. Defaults to None, which keeps the dtype the layers output.
+
+        Raises:
+            ValueError: If the seed parameter is not valid.
+            ValueError: If the dtype parameter is not valid.
+        """
+        if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool) or seed < 0):
+            raise ValueError(f"The value {seed} for the argument seed is not valid")
+
+        if dtype is not None and dtype not in DTYPES:
+            raise ValueError(f"The value {dtype} for the argument dtype is not valid")
+
+        self.__seed = seed
+        self.__dtype = dtype
         self.__frozen = False
         self.__layers = []
+        self.__branches = []
+        self.__compiled_layers = None
+        self.__profiled_layers = None
 
-    def add(self, layer):
+    def add(self, layer, branch=None):
         """Add a new layer to the model.
 
         Args:
             layer (layer): Layer class to add into the model.
+            branch (Branch, optional): Branch of the model to add the layer to, check .branch() for more information.
+                Defaults to None, which adds the layer to the shared layers of the model.
 
         Raises:
             ValueError: If the model is frozen.
             ValueError: If the layer is not valid.
+            ValueError: If the branch is not a branch of the model.
+            ValueError: If the model is branched and no branch is given.
             ValueError: If the layer does support the parent layer.
             ValueError: If the first layer is not a read layer.
         """
@@ -56,11 +107,20 @@ class Model:
         if not is_valid_layer(layer):
             raise ValueError("The layer is not a valid layer")
 
+        if branch is not None and not any(branch is model_branch for model_branch in self.__branches):
+            raise ValueError("The branch is not a branch of the model")
+
+        if branch is None and self.__branches:
+            raise ValueError("The model is branched, the layer must be added to one of its branches")
+
         if len(self.__layers) == 0 and layer._get_type() != "read":
             raise ValueError("The first layer needed to be a read layer")
 
+        layers = branch._get_layers() if branch is not None else self.__layers
+
         if len(self.__layers) > 0:
-            previous_layer_type = self.__layers[-1]._get_type()
+            # The first layer of a branch follows the last shared layer
+            previous_layer_type = (layers or self.__layers)[-1]._get_type()
 
             if not layer._is_valid_child(previous_layer_type):
                 tp = layer._get_type()
@@ -68,7 +128,87 @@ class Model:
                     f"The layer of type '{tp}' does not support layer of type '{previous_layer_type}' as parent layer"
                 )
 
-        self.__layers.append(layer)
+        # Layers of different branches get different indices, so they never draw the same random numbers
+        layer._set_random_state(self.__seed, len(self.__get_all_layers()))
+        layer._set_dtype(self.__dtype)
+
+        layers.append(layer)
+        self.__compiled_layers = None
+        self.__profiled_layers = None
+
+    def branch(self):
+        """Create a new branch of the model.
+
+        The layers added to the model before its first branch are shared by every branch. They run once per image, and
+        their output is given to each branch, which applies its own layers, like a Resize and a Save layer. Several
+        variants of a dataset are then produced while the images are read and decoded only once. The shared images
+        are read-only, so a layer of a branch can not change the images of the other branches. Once the model has a
+        branch, the new layers must be added to one of the branches.
+
+        Here is an example code to use .branch() function in a model.
+
+        ```python
+        from hocrox.model import Model
+
+        # Initializing the model
+        model = Model()
+
+        ...
+        ...
+
+        # Make a 224px and a 512px variant of the images
+        small = model.branch()
+        small.add(Resize((224, 224)))
+        small.add(Save("./img_224"))
+
+        large = model.branch()
+        large.add(Resize((512, 512)))
+        large.add(Save("./img_512"))
+        ```
+
+        Raises:
+            ValueError: If the model is frozen.
+            ValueError: If the model has no read layer.
+
+        Returns:
+            Branch: New branch of the model, use its .add() method to add layers to it.
+        """
+        if self.__frozen:
+            raise ValueError("Model is frozen")
+
+        if len(self.__layers) == 0:
+            raise ValueError("The model needs a read layer before it can be branched")
+
+        branch = Branch(self)
+
+        self.__branches.append(branch)
+        self.__compiled_layers = None
+        self.__profiled_layers = None
+
+        return branch
+
+    def __get_all_layers(self):
+        """Return the shared layers of the model followed by the layers of every branch.
+
+        Returns:
+            list: List of every layer of the model.
+        """
+        return self.__layers + [layer for branch in self.__branches for layer in branch._get_layers()]
+
+    def __get_graph_layers(self, layers=None, branches=None):
+        """Return the layers to execute for the shared layers and the branches of the model.
+
+        Args:
+            layers (list, optional): Shared layers. Defaults to the shared layers of the model.
+            branches (list[list], optional): Layers of each branch. Defaults to the layers of the branches of the model.
+
+        Returns:
+            list: List of the shared layers, followed by a Branches layer if the model is branched.
+        """
+        layers = self.__layers if layers is None else layers
+        branches = [branch._get_layers() for branch in self.__branches] if branches is None else branches
+
+        return layers + [Branches(branches)] if branches else layers
 
     def summary(self):
         """Generate a summary of the model.
@@ -88,9 +228,32 @@ class Model:
         print(model.summary())
         ```
 
+        If the model was run with profiling enabled, the summary lists the executed layers along with their
+        measurements.
+
         Returns:
             str: Summary of the model.
         """
+        if self.__profiled_layers is not None:
+            t = PrettyTable(["Index", "Name", "Parameters", "Calls", "p50 (ms/image)", "p95 (ms/image)", "Share"])
+
+            for index, (layer, row) in enumerate(zip(self.__profiled_layers, self.profile())):
+                (name, parameters) = layer._get_description()
+
+                t.add_row(
+                    [
+                        f"#{index+1}",
+                        name,
+                        parameters,
+                        row["calls"],
+                        f"{row['p50_ms']:.3f}",
+                        f"{row['p95_ms']:.3f}",
+                        f"{row['share'] * 100:.1f}%",
+                    ]
+                )
+
+            return str(t)
+
         t = PrettyTable(["Index", "Name", "Parameters"])
 
         for index, layer in enumerate(self.__layers):
@@ -98,9 +261,174 @@ class Model:
 
             t.add_row([f"#{index+1}", name, parameters])
 
+        for branch_index, branch in enumerate(self.__branches):
+            for index, layer in enumerate(branch._get_layers()):
+                (name, parameters) = layer._get_description()
+
+                t.add_row([f"Branch {branch_index+1} #{index+1}", name, parameters])
+
         return str(t)
 
-    def transform(self):
+    def profile(self):
+        """Return the measurements of each layer from the last profiled run of the model.
+
+        Profiling is enabled with the profile argument of .transform() or .flow(). The time per image is measured
+        against the images going into each layer, so layers after a fan-out are measured per augmented image.
+
+        Here is an example code to use .profile() function in a model.
+
+        ```python
+        from hocrox.model import Model
+
+        # Initializing the model
+        model = Model()
+
+        ...
+        ...
+
+        # Transform the images while measuring each layer
+        model.transform(profile=True)
+
+        # Printing the measurements of the layers
+        print(model.profile())
+        print(model.summary())
+        ```
+
+        Raises:
+            ValueError: If the model was not profiled.
+
+        Returns:
+            list[dict]: Measurements of each executed layer, with the name, number of calls, total seconds, number of
+                images in and out, bytes allocated for new images, p50 and p95 milliseconds per image and share of the
+                total time.
+        """
+        if self.__profiled_layers is None:
+            raise ValueError("The model was not profiled, use profile=True in transform() or flow()")
+
+        profiles = [layer._get_profile() for layer in self.__profiled_layers]
+        total_seconds = sum(profile.seconds for profile in profiles)
+
+        report = []
+
+        for layer, profile in zip(self.__profiled_layers, profiles):
+            (name, _) = layer._get_description()
+
+            report.append(
+                {
+                    "name": name,
+                    "calls": profile.calls,
+                    "seconds": profile.seconds,
+                    "images_in": profile.images_in,
+                    "images_out": profile.images_out,
+                    "bytes_allocated": profile.bytes_allocated,
+                    "p50_ms": profile.percentile(50),
+                    "p95_ms": profile.percentile(95),
+                    "share": profile.seconds / total_seconds if total_seconds > 0 else 0.0,
+                }
+            )
+
+        return report
+
+    def quarantine(self):
+        """Return the files skipped by the read layer during the last run of the model.
+
+        Files are only skipped when the read layer probes them, with Read(probe=True). Empty files, files that are not
+        images and truncated images are then left out before they are decoded.
+
+        Here is an example code to use .quarantine() function in a model.
+
+        ```python
+        from hocrox.model import Model
+
+        # Initializing the model
+        model = Model()
+
+        ...
+        ...
+
+        # Transform the images, then list the files that were skipped
+        model.transform()
+
+        for entry in model.quarantine():
+            print(entry["source"], entry["reason"])
+        ```
+
+        Raises:
+            ValueError: If the model has no read layer.
+
+        Returns:
+            list[dict]: Name of each skipped file, relative to the path of the read layer, and the reason it was
+                skipped, like "empty file", "not an image", "invalid header" or "truncated file".
+        """
+        if len(self.__layers) == 0:
+            raise ValueError("The model does not have a read layer")
+
+        return self.__layers[0]._get_quarantine()
+
+    def compile(self):
+        """Compile the model to optimize the execution of its layers.
+
+        Runs of consecutive geometric layers like Rotate, HorizontalShift, RandomZoom or RandomFlip are fused into a
+        single layer. The fused layer multiplies the affine matrices of the layers, with the random parameters still
+        sampled for each output image, and resamples every output image only once. It reduces the memory traffic and
+        the blur caused by repeated interpolation. In the same way, consecutive color layers like ChannelShift or
+        RandomBrightness are fused into a single lookup table pass. Adding a new layer discards the compilation.
+
+        Here is an example code to use .compile() function in a model.
+
+        ```python
+        from hocrox.model import Model
+
+        # Initializing the model
+        model = Model()
+
+        ...
+        ...
+
+        # Compile the model before transforming the images
+        model.compile()
+        model.transform()
+        ```
+        """
+        self.__compiled_layers = self.__get_graph_layers(
+            compile_layers(self.__layers), [compile_layers(branch._get_layers()) for branch in self.__branches]
+        )
+        self.__profiled_layers = None
+
+    def __get_layers(self, profile=False, cache=None):
+        """Return the layers to execute, which are the compiled layers if the model is compiled.
+
+        Args:
+            profile (bool, optional): Wrap the layers to measure them, the measurements are kept for .profile().
+                Defaults to False.
+            cache (DiskCache | MemoryCache, optional): Cache of the output of the deterministic layers that follow the
+                read layer. Defaults to None.
+
+        Returns:
+            list: List of layers to execute.
+        """
+        layers = self.__compiled_layers or self.__get_graph_layers()
+
+        if cache is not None:
+            layers = cache_prefix(layers, cache)
+
+        if profile:
+            layers = [ProfiledLayer(layer) for layer in layers]
+            self.__profiled_layers = layers
+
+        return layers
+
+    def transform(
+        self,
+        executor="sequential",
+        workers=None,
+        batch_size=None,
+        profile=False,
+        incremental=False,
+        checkpoint=None,
+        resume=False,
+        cache=None,
+    ):
         """Perform the transformation of the images using the defined model pipeline.
 
         Here is an example code to use .transform() function in a model.
@@ -116,14 +444,359 @@ class Model:
 
         # Apply transformation to the images based on the defined model pipeline.
         model.transform()
+
+        # Apply transformation to the images using 8 worker processes.
+        model.transform(executor="process", workers=8)
+
+        # Only transform the images that were added or changed since the last incremental run.
+        model.transform(incremental=True)
+
+        # Save the progress to a checkpoint file, and continue from it after an interruption.
+        model.transform(checkpoint="./transform.ckpt", resume=True)
+
+        # Cache the output of the preprocessing layers, so the next runs only apply the augmentation layers.
+        model.transform(cache=DiskCache("./cache"))
+        ```
+
+        Args:
+            executor (str, optional): Executor used to run the model. Supported executors are sequential, process and
+                thread. The process executor shards the images across a pool of processes, where each process runs the
+                full pipeline. The thread executor runs the pipeline of each image on a pool of threads, which is
+                cheaper than processes when the layers release the GIL, check .gil_report() to decide between the two.
+                Defaults to "sequential".
+            workers (int, optional): Number of workers used by the process and thread executors. Defaults to the number
+                of CPUs.
+            batch_size (int, optional): Enables the batch mode, where the images of batch_size files are stacked into
+                one (N, H, W, C) ndarray for the layers that support batches, so they are transformed with a single
+                vectorized operation. Images with different shapes are batched per file. Defaults to None.
+            profile (bool, optional): Measure the time spent in each layer, check .profile() for the measurements.
+                Defaults to False.
+            incremental (bool, optional): Skip the images that were already transformed by the same model, did not
+                change since and whose saved files still exist, based on a manifest stored in the path of the Save
+                layer. Any change to the layers of the model transforms every image again. Only the npy and img
+                formats of the Save layer are supported. Defaults to False.
+            checkpoint (str, optional): Path of a checkpoint file, where the transformed images and the random state
+                are saved every 30 seconds and at the end of the transformation. Defaults to None.
+            resume (bool, optional): Continue from the checkpoint file, skipping the images it records as transformed.
+                The checkpoint must come from the same model and the same images. The npy, img and memmap formats of
+                the Save layer resume safely, the memmap file is reopened and keeps the rows already written. The
+                shard format starts new shard files, where the images transformed after the last save of the
+                checkpoint are written again. Defaults to False.
+            cache (DiskCache | MemoryCache, optional): Cache of the output of the longest run of deterministic layers
+                that follows the read layer, like Resize or Grayscale. The images found in the cache skip the reading
+                and these layers, so models that only differ by their augmentation layers share the cache. Defaults to
+                None.
+
+        Raises:
+            ValueError: If the executor parameter is not valid.
+            ValueError: If the workers parameter is not valid.
+            ValueError: If the batch_size parameter is not valid.
+            ValueError: If the profile parameter is not valid.
+            ValueError: If the incremental parameter is not valid.
+            ValueError: If the checkpoint parameter is not valid.
+            ValueError: If the resume parameter is not valid.
+            ValueError: If the cache parameter is not valid.
+        """
+        if executor not in EXECUTORS:
+            raise ValueError(f"The value {executor} for the argument executor is not valid")
+
+        if workers is not None and (not isinstance(workers, int) or workers < 1):
+            raise ValueError(f"The value {workers} for the argument workers is not valid")
+
+        if batch_size is not None and (not isinstance(batch_size, int) or batch_size < 1):
+            raise ValueError(f"The value {batch_size} for the argument batch_size is not valid")
+
+        if not isinstance(profile, bool):
+            raise ValueError(f"The value {profile} for the argument profile is not valid")
+
+        if not isinstance(incremental, bool):
+            raise ValueError(f"The value {incremental} for the argument incremental is not valid")
+
+        if checkpoint is not None and not isinstance(checkpoint, str):
+            raise ValueError(f"The value {checkpoint} for the argument checkpoint is not valid")
+
+        if not isinstance(resume, bool) or (resume and checkpoint is None):
+            raise ValueError(f"The value {resume} for the argument resume is not valid")
+
+        if cache is not None and not isinstance(cache, (DiskCache, MemoryCache)):
+            raise ValueError(f"The value {cache} for the argument cache is not valid")
+
+        manifest = self.__open_manifest() if incremental else None
+        tracker = self.__open_checkpoint(checkpoint, resume) if checkpoint is not None else None
+
+        layers = self.__get_layers(profile, cache)
+        images, gen = self.__layers[0]._apply_layer()
+        images = prepare_layers(layers, images, resume)
+
+        if manifest is not None:
+            images = manifest.filter(self.__layers[0], images)
+
+        if tracker is not None:
+            images = tracker.filter(images)
+
+        def on_done(sources, outputs):
+            if manifest is not None:
+                manifest.record(sources, outputs)
+
+            if tracker is not None:
+                tracker.record(sources)
+
+        try:
+            self.__run_executor(executor, layers, images, gen, workers, batch_size, on_done)
+            flush_layers(layers)
+        finally:
+            close_layers(layers)
+
+            if manifest is not None:
+                manifest.close()
+
+            # Also saved when the transformation fails, so the next run resumes from the last transformed image
+            if tracker is not None:
+                tracker.save()
+
+    @staticmethod
+    def __run_executor(executor, layers, images, gen, workers, batch_size, on_done):
+        """Run the layers on the images with an executor.
+
+        Args:
+            executor (str): Executor used to run the model.
+            layers (list): List of layers to execute.
+            images (iterable): Names of the images returned by the read layer.
+            gen (generator): Generator returned by the read layer.
+            workers (int): Number of workers used by the process and thread executors.
+            batch_size (int): Number of image series batched together.
+            on_done (function): Called with the names of the images once they are transformed, and the files written
+                for them.
+        """
+        if executor == "process":
+            run_process(layers, images, workers, batch_size, on_done)
+        elif executor == "thread":
+            run_thread(layers, images, workers, batch_size, on_done)
+        else:
+            run_sequential(layers, images, gen, batch_size, on_done)
+
+    def __open_checkpoint(self, path, resume):
+        """Open the checkpoint of the transformation.
+
+        Args:
+            path (str): Path of the checkpoint file.
+            resume (bool): Continue from the existing checkpoint file.
+
+        Raises:
+            ValueError: If the read layer can not list its images upfront.
+
+        Returns:
+            Checkpoint: Checkpoint of the transformation.
+        """
+        read_layer = self.__layers[0]
+
+        if not hasattr(read_layer, "_list_images"):
+            raise ValueError("The read layer does not support checkpoints")
+
+        fingerprint = fingerprint_layers(self.__get_graph_layers(), compiled=self.__compiled_layers is not None)
+
+        return Checkpoint(path, fingerprint, read_layer._list_images(), resume)
+
+    def __open_manifest(self):
+        """Open the manifest of the images already transformed, stored in the path of the last Save layer.
+
+        Raises:
+            ValueError: If the model has no Save layer, or its format does not support incremental transforms.
+
+        Returns:
+            Manifest: Manifest of the model.
+        """
+        save_layers = [layer for layer in self.__get_all_layers() if layer._get_type() == "save"]
+
+        if not save_layers:
+            raise ValueError("The model needs a Save layer for incremental transforms")
+
+        if any(layer._get_format() not in ("npy", "img") for layer in save_layers):
+            raise ValueError("Incremental transforms only support the npy and img formats of the Save layer")
+
+        fingerprint = fingerprint_layers(self.__get_graph_layers(), compiled=self.__compiled_layers is not None)
+
+        return Manifest(save_layers[-1]._get_path(), fingerprint)
+
+    def flow(self, prefetch=2, batch_size=None, profile=False, cache=None, executor="sequential", workers=None):
+        """Transform the images lazily and yield them instead of writing them to the filesystem.
+
+        The layers are applied on demand, so a training loop can consume the augmented images directly. A Save layer
+        is not needed, but if the model has one, the images are saved as well. Iterating over the model is the same as
+        calling .flow() with the default arguments.
+
+        Here is an example code to use .flow() function in a model.
+
+        ```python
+        from hocrox.model import Model
+
+        # Initializing the model
+        model = Model()
+
+        ...
+        ...
+
+        # Consume the transformed images directly
+        for path, images in model.flow(prefetch=8):
+            for image in images:
+                ...
+
+        # Transform the images on 8 worker processes, they are received through shared memory
+        for path, images in model.flow(executor="process", workers=8):
+            ...
         ```
+
+        Args:
+            prefetch (int, optional): Number of images transformed ahead on a background thread while the current one
+                is consumed. When 0, the images are only transformed when requested. Defaults to 2.
+            batch_size (int, optional): Enables the batch mode, check .transform() for more information. Defaults to
+                None.
+            profile (bool, optional): Measure the time spent in each layer, check .profile() for the measurements.
+                Defaults to False.
+            cache (DiskCache | MemoryCache, optional): Cache of the output of the deterministic layers that follow the
+                read layer, check .transform() for more information. A MemoryCache reused across the epochs of a
+                training loop skips the decoding and the preprocessing of the images after the first epoch. Defaults
+                to None.
+            executor (str, optional): Executor used to run the model, check .transform() for the supported
+                executors. With the thread and process executors, prefetch is the number of images transformed ahead
+                in addition to two per worker, and the images are yielded in the order they complete. The worker
+                processes copy the images into a ring of shared memory slots, and the images are yielded as views of
+                the slots, which go back to the ring once the views are garbage collected. Keeping the views holds the
+                slots, and the next images are pickled through the pipes instead, so copy the images that are kept.
+                The Save layers at the end of the model run in the current process on these views. Defaults to
+                "sequential".
+            workers (int, optional): Number of workers used by the process and thread executors. Defaults to the number
+                of CPUs.
+
+        Raises:
+            ValueError: If the prefetch parameter is not valid.
+            ValueError: If the batch_size parameter is not valid.
+            ValueError: If the profile parameter is not valid.
+            ValueError: If the cache parameter is not valid.
+            ValueError: If the executor parameter is not valid.
+            ValueError: If the workers parameter is not valid.
+
+        Yields:
+            tuple: Name of the image series and the list of transformed images as numpy ndarray.
         """
-        read_image_layer = self.__layers[0]
-        images, gen = read_image_layer._apply_layer()
+        if not isinstance(prefetch, int) or prefetch < 0:
+            raise ValueError(f"The value {prefetch} for the argument prefetch is not valid")
+
+        if batch_size is not None and (not isinstance(batch_size, int) or batch_size < 1):
+            raise ValueError(f"The value {batch_size} for the argument batch_size is not valid")
+
+        if not isinstance(profile, bool):
+            raise ValueError(f"The value {profile} for the argument profile is not valid")
+
+        if cache is not None and not isinstance(cache, (DiskCache, MemoryCache)):
+            raise ValueError(f"The value {cache} for the argument cache is not valid")
+
+        if executor not in EXECUTORS:
+            raise ValueError(f"The value {executor} for the argument executor is not valid")
+
+        if workers is not None and (not isinstance(workers, int) or workers < 1):
+            raise ValueError(f"The value {workers} for the argument workers is not valid")
+
+        layers = self.__get_layers(profile, cache)
+        images, gen = self.__layers[0]._apply_layer()
+        images = prepare_layers(layers, images)
+
+        if executor == "process":
+            series = run_flow_process(layers, images, workers, prefetch, batch_size)
+        elif executor == "thread":
+            series = run_flow_thread(layers, images, workers, prefetch, batch_size)
+        else:
+            series = run_flow(layers, images, gen, prefetch, batch_size)
+
+        dtype = get_dtype(self.__dtype)
 
-        for path, image in tqdm(gen, total=len(images)):
-            for layer in self.__layers[1:]:
-                image = layer._apply_layer(image, path)
+        try:
+            for path, transformed_images in series:
+                yield path, [cast_image(image, dtype) for image in transformed_images]
+        finally:
+            # Also runs when the consumer stops early, so the files written in the background are complete
+            series.close()
+
+            try:
+                flush_layers(layers)
+            finally:
+                close_layers(layers)
+
+    def __iter__(self):
+        """Iterate over the transformed images of the model.
+
+        Yields:
+            tuple: Name of the image series and the list of transformed images as numpy ndarray.
+        """
+        yield from self.flow()
+
+    def gil_report(self, workers=None, samples=16):
+        """Generate a report of the layers that hold the GIL.
+
+        Every layer is timed on a sample of the images, once in a single thread and once on a pool of threads. Layers
+        that spend their time in OpenCV or NumPy release the GIL and speed up on the pool, layers that run Python code
+        hold the GIL and do not. If most of the time is spent in layers that hold the GIL, the process executor is the
+        better choice, otherwise the thread executor is cheaper.
+
+        The Save layers are not measured, as they would write the sampled images, and neither are the branches of a
+        model when they hold Save layers.
+
+        Here is an example code to use .gil_report() function in a model.
+
+        ```python
+        from hocrox.model import Model
+
+        # Initializing the model
+        model = Model()
+
+        ...
+        ...
+
+        # Printing the GIL report of the model
+        print(model.gil_report(workers=8))
+        ```
+
+        Args:
+            workers (int, optional): Number of threads used for the measurement. Defaults to the number of CPUs.
+            samples (int, optional): Number of images used for the measurement. Defaults to 16.
+
+        Raises:
+            ValueError: If the workers parameter is not valid.
+            ValueError: If the samples parameter is not valid.
+
+        Returns:
+            str: GIL report of the model.
+        """
+        if workers is not None and (not isinstance(workers, int) or workers < 1):
+            raise ValueError(f"The value {workers} for the argument workers is not valid")
+
+        if not isinstance(samples, int) or samples < 1:
+            raise ValueError(f"The value {samples} for the argument samples is not valid")
+
+        images, _ = self.__layers[0]._apply_layer()
+        layers = self.__get_layers()
+        report = measure_gil(layers, images, workers, samples)
+
+        t = PrettyTable(["Index", "Name", "Sequential (ms/image)", "Threaded (ms/image)", "Speedup", "Holds GIL"])
+
+        for row in report:
+            # The Save layers are not measured, so the rows keep the index of their layer in the model
+            index = layers.index(row["layer"])
+            (name, _) = row["layer"]._get_description()
+            holds_gil = {True: "Yes", False: "No", None: "Unknown"}[row["holds_gil"]]
+
+            t.add_row(
+                [
+                    f"#{index+1}",
+                    name,
+                    f"{row['sequential_ms']:.3f}",
+                    f"{row['threaded_ms']:.3f}",
+                    f"{row['speedup']:.2f}x",
+                    holds_gil,
+                ]
+            )
+
+        return str(t)
 
     def freeze(self):
         """Freeze the model. Frozen models cannot be modified.
@@ -174,7 +847,13 @@ class Model:
         if not isinstance(path, str):
             raise ValueError("Path is not valid")
 
-        model_config = {"frozen": self.__frozen, "layers": self.__layers}
+        model_config = {
+            "frozen": self.__frozen,
+            "layers": self.__layers,
+            "branches": [branch._get_layers() for branch in self.__branches],
+            "seed": self.__seed,
+            "dtype": self.__dtype,
+        }
 
         with open(path, "wb") as f:
             pickle.dump(model_config, f)
@@ -211,3 +890,12 @@ class Model:
 
             self.__layers = model_config["layers"]
             self.__frozen = model_config["frozen"]
+            self.__branches = [Branch(self, layers) for layers in model_config.get("branches", [])]
+            self.__seed = model_config.get("seed")
+            self.__dtype = model_config.get("dtype")
+            self.__compiled_layers = None
+            self.__profiled_layers = None
+
+        # Layers follow the dtype policy of the loaded model, also the ones of models saved before the policy existed
+        for layer in self.__get_all_layers():
+            layer._set_dtype(self.__dtype)
@@ -0,0 +1,126 @@
+"""Prefix cache is used by the Model class to skip the deterministic layers that follow the read layer.
+
+The longest run of layers right after the read layer whose output only depends on their input, like Resize or
+Grayscale, is the prefix of the model. Its output for an image is stored in a cache, under a key derived from the
+fingerprint of the read layer and the prefix, the name of the image and its signature, like its size and modification
+time. A later run with the same prefix, even with different augmentation layers after it, reads the cached images
+instead of decoding and preprocessing the images again.
+"""
+import hashlib
+
+from hocrox.model.manifest import fingerprint_layers
+
+__all__ = ["CachedPrefix", "cache_prefix"]
+
+
+def cache_prefix(layers, cache):
+    """Replace the read layer and the prefix of the layers by a CachedPrefix.
+
+    Args:
+        layers (list): List of layers to execute, starting with the read layer.
+        cache (DiskCache | MemoryCache): Cache of the output of the prefix.
+
+    Returns:
+        list: List of layers to execute, starting with the CachedPrefix.
+    """
+    end = 1
+
+    while end < len(layers) and layers[end].DETERMINISTIC:
+        end += 1
+
+    return [CachedPrefix(layers[0], layers[1:end], cache)] + layers[end:]
+
+
+class CachedPrefix:
+    """CachedPrefix wraps a read layer and the prefix of a model, and reads the output of the prefix from a cache."""
+
+    def __init__(self, layer, prefix, cache):
+        """Init method for the CachedPrefix class.
+
+        Args:
+            layer (layer): Read layer of the model.
+            prefix (list): Deterministic layers that follow the read layer.
+            cache (DiskCache | MemoryCache): Cache of the output of the prefix.
+        """
+        self.__layer = layer
+        self.__prefix = prefix
+        self.__cache = cache
+        self.__fingerprint = fingerprint_layers([layer] + prefix)
+
+    def __getattr__(self, name):
+        """Forward everything else to the read layer.
+
+        Args:
+            name (str): Name of the attribute.
+
+        Raises:
+            AttributeError: If the attribute is private to the wrapper, which happens while unpickling.
+
+        Returns:
+            object: Attribute of the read layer.
+        """
+        if name.startswith("_CachedPrefix__") or name.startswith("__"):
+            raise AttributeError(name)
+
+        return getattr(self.__layer, name)
+
+    def __get_key(self, image):
+        """Return the key of the cached output of an image.
+
+        Args:
+            image (str | tuple): Name of the image, or the name and encoded bytes of an image read from an archive.
+
+        Returns:
+            str: Key of the image.
+        """
+        name = image[0] if isinstance(image, tuple) else image
+        signature = self.__layer._get_signature(image)
+
+        return hashlib.sha256(f"{self.__fingerprint}|{name}|{signature}".encode()).hexdigest()
+
+    def _read_image(self, image):
+        """Read a single image and apply the prefix to it, or read the output of the prefix from the cache.
+
+        Args:
+            image (str | tuple): Name of the image, or the name and encoded bytes of an image read from an archive.
+
+        Returns:
+            tuple: Name of the image and a list with the output of the prefix.
+        """
+        key = self.__get_key(image)
+        images = self.__cache.get(key)
+
+        if images is not None:
+            return image[0] if isinstance(image, tuple) else image, images
+
+        path, images = self.__layer._read_image(image)
+
+        for layer in self.__prefix:
+            images = layer._apply_layer(images, path)
+
+        # Images that could not be read are not cached, so they are read again once they are fixed
+        if all(output is not None and output.size > 0 for output in images):
+            self.__cache.put(key, images)
+
+        return path, images
+
+    def _flush(self):
+        """Finish the pending work of the read layer and of the prefix."""
+        for layer in [self.__layer] + self.__prefix:
+            layer._flush()
+
+    def _close(self):
+        """Release what the read layer and the prefix keep open across flushes."""
+        for layer in [self.__layer] + self.__prefix:
+            layer._close()
+
+    def _get_description(self):
+        """Return the description of the read layer, along with the cached layers.
+
+        Returns:
+            tuple: Name and parameters of the layer.
+        """
+        name, parameters = self.__layer._get_description()
+        cached = ", ".join(layer._get_name() for layer in self.__prefix)
+
+        return name, f"{parameters}, Cached: {cached}" if cached else parameters
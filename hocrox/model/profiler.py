@@ -0,0 +1,278 @@
+"""Profiler is used by the Model class to measure the time spent in each layer.
+
+When profiling is enabled, every layer is wrapped in a ProfiledLayer, which behaves like the original layer but records
+the wall time, the number of calls, the number of images going in and out and the bytes allocated for new images on
+every call.
+"""
+import random
+import threading
+import time
+
+import numpy as np
+
+__all__ = ["LayerProfile", "ProfiledLayer"]
+
+"""Maximum number of timings kept per layer for the percentiles, the rest are sampled."""
+MAX_SAMPLES = 10000
+
+
+class LayerProfile:
+    """LayerProfile holds the measurements of a single layer."""
+
+    def __init__(self):
+        """Init method for the LayerProfile class."""
+        self.calls = 0
+        self.seconds = 0.0
+        self.images_in = 0
+        self.images_out = 0
+        self.bytes_allocated = 0
+        self.samples = []
+
+        # Separate generator, so the reservoir sampling does not change the random state used by the layers
+        self.__random = random.Random(0)
+
+    def record(self, seconds, images_in, images_out, bytes_allocated):
+        """Record a call of the layer.
+
+        Args:
+            seconds (float): Wall time of the call.
+            images_in (int): Number of images given to the layer.
+            images_out (int): Number of images returned by the layer.
+            bytes_allocated (int): Bytes of the new images returned by the layer.
+        """
+        self.calls += 1
+        self.seconds += seconds
+        self.images_in += images_in
+        self.images_out += images_out
+        self.bytes_allocated += bytes_allocated
+
+        self.__add_sample(seconds * 1000 / max(images_in, 1))
+
+    def __add_sample(self, sample):
+        """Add a timing sample using reservoir sampling.
+
+        Args:
+            sample (float): Time per image in milliseconds.
+        """
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(sample)
+            return
+
+        index = self.__random.randrange(self.calls)
+
+        if index < MAX_SAMPLES:
+            self.samples[index] = sample
+
+    def merge(self, other):
+        """Merge the measurements of another profile, used to collect the measurements of worker processes.
+
+        Args:
+            other (LayerProfile): Profile to merge.
+        """
+        self.calls += other.calls
+        self.seconds += other.seconds
+        self.images_in += other.images_in
+        self.images_out += other.images_out
+        self.bytes_allocated += other.bytes_allocated
+
+        self.samples.extend(other.samples)
+
+        if len(self.samples) > MAX_SAMPLES:
+            self.samples = self.__random.sample(self.samples, MAX_SAMPLES)
+
+    def percentile(self, q):
+        """Return a percentile of the time per image.
+
+        Args:
+            q (float): Percentile to compute, between 0 and 100.
+
+        Returns:
+            float: Time per image in milliseconds.
+        """
+        if not self.samples:
+            return 0.0
+
+        return float(np.percentile(self.samples, q))
+
+    def __getstate__(self):
+        """Return the state of the profile for pickling.
+
+        Returns:
+            dict: State of the profile.
+        """
+        state = self.__dict__.copy()
+        del state["_LayerProfile__random"]
+
+        return state
+
+    def __setstate__(self, state):
+        """Restore the state of the profile after unpickling.
+
+        Args:
+            state (dict): State of the profile.
+        """
+        self.__dict__.update(state)
+        self.__random = random.Random(0)
+
+
+def _allocated_bytes(inputs, outputs):
+    """Compute the bytes of the images that a layer allocated.
+
+    Images passed through unchanged and views of other arrays do not count.
+
+    Args:
+        inputs (list[ndarray] | ndarray): Images given to the layer.
+        outputs (list[ndarray] | ndarray): Images returned by the layer.
+
+    Returns:
+        int: Bytes allocated.
+    """
+    if isinstance(outputs, np.ndarray):
+        return outputs.nbytes if outputs.base is None and outputs is not inputs else 0
+
+    input_ids = {id(image) for image in inputs} if isinstance(inputs, list) else set()
+
+    return sum(
+        image.nbytes
+        for image in outputs
+        if isinstance(image, np.ndarray) and image.base is None and id(image) not in input_ids
+    )
+
+
+class ProfiledLayer:
+    """ProfiledLayer wraps a layer and records the measurements of every call."""
+
+    def __init__(self, layer):
+        """Init method for the ProfiledLayer class.
+
+        Args:
+            layer (layer): Layer to profile.
+        """
+        self.__layer = layer
+        self.__profile = LayerProfile()
+        self.__lock = threading.Lock()
+
+    def __getattr__(self, name):
+        """Forward everything else to the original layer.
+
+        Args:
+            name (str): Name of the attribute.
+
+        Raises:
+            AttributeError: If the attribute is private to the wrapper, which happens while unpickling.
+
+        Returns:
+            object: Attribute of the original layer.
+        """
+        if name.startswith("_ProfiledLayer__") or name.startswith("__"):
+            raise AttributeError(name)
+
+        attribute = getattr(self.__layer, name)
+
+        # Only read layers have _read_image, so it is wrapped here instead of being defined on the wrapper
+        if name == "_read_image":
+            return self.__read_image
+
+        return attribute
+
+    def __record(self, start, inputs, outputs, images_in):
+        """Record a call of the layer.
+
+        Args:
+            start (float): Start time of the call.
+            inputs (list[ndarray] | ndarray): Images given to the layer.
+            outputs (list[ndarray] | ndarray): Images returned by the layer.
+            images_in (int): Number of images given to the layer.
+        """
+        seconds = time.perf_counter() - start
+        bytes_allocated = _allocated_bytes(inputs, outputs)
+
+        with self.__lock:
+            self.__profile.record(seconds, images_in, len(outputs), bytes_allocated)
+
+    def _apply_layer(self, images, name=None):
+        """Apply the original layer and record the measurements.
+
+        Args:
+            images (list[ndarray] | ndarray): Images to transform.
+            name (str, optional): Name of the image series. Defaults to None.
+
+        Returns:
+            list[ndarray] | ndarray: Transformed images.
+        """
+        start = time.perf_counter()
+        transformed_images = self.__layer._apply_layer(images, name)
+
+        self.__record(start, images, transformed_images, len(images))
+
+        return transformed_images
+
+    def __read_image(self, image):
+        """Read a single image with the original read layer and record the measurements.
+
+        Args:
+            image (str): Image to read.
+
+        Returns:
+            tuple: Name of the image and a list with the image.
+        """
+        start = time.perf_counter()
+        path, images = self.__layer._read_image(image)
+
+        self.__record(start, [], images, 1)
+
+        return path, images
+
+    def _get_layer(self):
+        """Return the original layer.
+
+        Returns:
+            layer: Original layer.
+        """
+        return self.__layer
+
+    def _get_profile(self):
+        """Return the measurements of the layer.
+
+        Returns:
+            LayerProfile: Measurements of the layer.
+        """
+        return self.__profile
+
+    def _pop_profile(self):
+        """Return the measurements of the layer and start a new profile.
+
+        Returns:
+            LayerProfile: Measurements of the layer.
+        """
+        with self.__lock:
+            profile, self.__profile = self.__profile, LayerProfile()
+
+        return profile
+
+    def _merge_profile(self, profile):
+        """Merge measurements from a copy of the layer, like the ones running in worker processes.
+
+        Args:
+            profile (LayerProfile): Measurements to merge.
+        """
+        with self.__lock:
+            self.__profile.merge(profile)
+
+    def __getstate__(self):
+        """Return the state of the wrapper for pickling.
+
+        Returns:
+            dict: State of the wrapper.
+        """
+        return {"layer": self.__layer, "profile": self.__profile}
+
+    def __setstate__(self, state):
+        """Restore the state of the wrapper after unpickling.
+
+        Args:
+            state (dict): State of the wrapper.
+        """
+        self.__layer = state["layer"]
+        self.__profile = state["profile"]
+        self.__lock = threading.Lock()
@@ -0,0 +1,238 @@
+"""Transport is used by the process executor of Model.flow() to send the transformed images back to the consumer.
+
+Pickling large images through the pipes of a process pool copies every image several times, which caps the throughput
+well below the decoding speed. The transport keeps a ring of shared memory slots instead. A free slot is given to a
+worker along with every chunk of images, the worker copies the transformed images into the slot and only sends their
+offsets, shapes and types through the pipe, and the consumer gets ndarray views of the slot without any copy.
+
+A slot goes back to the ring once every view of it is garbage collected. The number of chunks in flight is bounded by
+the number of slots, and chunks submitted while the consumer still holds every slot, or whose images do not fit in a
+slot, send their images through the pipe. A consumer that keeps the images it receives, like one appending them to a
+list, holds every slot after a few chunks, so the next images go through the pipe, it must copy the images it keeps to
+use the shared memory. The slots grow to the size of the largest chunk seen so far. The slots still viewed when the
+flow ends stay mapped until their views are collected, even at the exit of the interpreter.
+
+multiprocessing.shared_memory needs Python 3.8, on older versions the images always go through the pipe.
+"""
+import weakref
+from collections import deque
+
+import numpy as np
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:  # Python < 3.8
+    resource_tracker = shared_memory = None
+
+__all__ = ["SHARED_MEMORY_AVAILABLE", "SharedMemoryRing", "pack_series"]
+
+"""Whether multiprocessing.shared_memory is available."""
+SHARED_MEMORY_AVAILABLE = shared_memory is not None
+
+"""Alignment of the images in a slot, in bytes."""
+SLOT_ALIGNMENT = 64
+
+"""Slots are sized in multiples of this number of bytes, so they do not grow again for slightly larger chunks."""
+SLOT_GRANULARITY = 1024**2
+
+# Slots of closed rings whose views were collected. They are released while their last view is being deallocated, so
+# they are closed later by the next ring
+_released_segments = []
+
+
+if SHARED_MEMORY_AVAILABLE:
+
+    class _Segment(shared_memory.SharedMemory):
+        """Shared memory of a slot, it stays mapped as long as the consumer holds views of it."""
+
+        def __del__(self):
+            """Close the shared memory once it is collected, unless views of the slot are still alive.
+
+            The memory is then unmapped along with the last view, which can happen after the ring was collected, even
+            at the exit of the interpreter where SharedMemory would report a BufferError.
+            """
+            try:
+                self.close()
+            except (BufferError, OSError):
+                pass
+
+
+def _align(offset):
+    """Round an offset up to the alignment of the images in a slot.
+
+    Args:
+        offset (int): Offset in bytes.
+
+    Returns:
+        int: Aligned offset.
+    """
+    return -(-offset // SLOT_ALIGNMENT) * SLOT_ALIGNMENT
+
+
+def pack_series(series, slot):
+    """Copy the images of transformed image series into a slot, it runs in the worker processes.
+
+    Args:
+        series (list): List of image series, where each series is a tuple of the name and the list of images.
+        slot (tuple): Name and size of the slot, or None to send every image through the pipe.
+
+    Returns:
+        tuple: Image series where the images copied to the slot are replaced by their offset, shape and type, and the
+            size a slot needs to hold every image of the series.
+    """
+    segment = shared_memory.SharedMemory(slot[0]) if slot is not None else None
+    offset = 0
+    packed = []
+
+    try:
+        for path, images in series:
+            entries = []
+
+            for image in images:
+                if not isinstance(image, np.ndarray) or image.dtype.hasobject:
+                    entries.append(image)
+                    continue
+
+                start = _align(offset)
+                offset = start + image.nbytes
+
+                if segment is not None and offset <= slot[1]:
+                    np.ndarray(image.shape, image.dtype, buffer=segment.buf, offset=start)[...] = image
+                    entries.append((start, image.shape, image.dtype.str))
+                else:
+                    entries.append(image)
+
+            packed.append((path, entries))
+    finally:
+        if segment is not None:
+            segment.close()
+
+    return packed, offset
+
+
+class SharedMemoryRing:
+    """SharedMemoryRing holds the shared memory slots of the transport, it lives in the consumer process."""
+
+    def __init__(self, slots):
+        """Init method for the SharedMemoryRing class.
+
+        Args:
+            slots (int): Maximum number of slots.
+        """
+        self.__slots = slots
+        self.__slot_size = 0
+        self.__segments = {}
+        self.__free = deque()
+        self.__closed = False
+
+        # Started before the worker processes, so they share it and it does not unlink the slots when they exit
+        if SHARED_MEMORY_AVAILABLE:
+            resource_tracker.ensure_running()
+
+    def acquire(self):
+        """Take a free slot of the ring, creating or growing it if needed.
+
+        Returns:
+            tuple: Name and size of the slot, or None if no slot is available.
+        """
+        if not SHARED_MEMORY_AVAILABLE or self.__slot_size == 0:
+            return None
+
+        segment = self.__free.popleft() if self.__free else None
+
+        if segment is not None and segment.size < self.__slot_size:
+            self.__retire(segment)
+            segment = None
+
+        if segment is None:
+            if len(self.__segments) >= self.__slots:
+                return None
+
+            segment = _Segment(create=True, size=self.__slot_size)
+            self.__segments[segment.name] = segment
+
+        return segment.name, segment.size
+
+    def __retire(self, segment):
+        """Remove a slot from the ring.
+
+        Args:
+            segment (SharedMemory): Shared memory of the slot.
+        """
+        del self.__segments[segment.name]
+        segment.unlink()
+
+        try:
+            segment.close()
+        except BufferError:
+            # A view released by another thread can still be exported for a moment, it is closed when collected
+            pass
+
+    def unpack(self, series, slot, required):
+        """Replace the images copied to a slot by views of the slot.
+
+        Args:
+            series (list): Image series returned by pack_series().
+            slot (tuple): Name and size of the slot given to the worker, or None.
+            required (int): Size a slot needs to hold every image of the series.
+
+        Returns:
+            list: List of image series, where each series is a tuple of the name and the list of images.
+        """
+        if required > self.__slot_size:
+            self.__slot_size = -(-required // SLOT_GRANULARITY) * SLOT_GRANULARITY
+
+        if slot is None:
+            return series
+
+        segment = self.__segments[slot[0]]
+
+        if not any(isinstance(entry, tuple) for _, entries in series for entry in entries):
+            self.__free.append(segment)
+
+            return series
+
+        # Every view is based on this array, the slot is free again once the array and its views are collected
+        base = np.frombuffer(segment.buf, np.uint8)
+        weakref.finalize(base, self.__release, segment)
+
+        return [
+            (
+                path,
+                [
+                    np.ndarray(entry[1], entry[2], buffer=base, offset=entry[0]) if isinstance(entry, tuple) else entry
+                    for entry in entries
+                ],
+            )
+            for path, entries in series
+        ]
+
+    def __release(self, segment):
+        """Give a slot back to the ring, once the views of the slot are collected.
+
+        Args:
+            segment (SharedMemory): Shared memory of the slot.
+        """
+        (_released_segments if self.__closed else self.__free).append(segment)
+
+    def close(self):
+        """Remove every slot, the slots still viewed by the consumer are closed once their views are collected."""
+        self.__closed = True
+
+        free = {segment.name for segment in self.__free}
+
+        for name, segment in self.__segments.items():
+            segment.unlink()
+
+            if name in free:
+                segment.close()
+
+        self.__segments.clear()
+        self.__free.clear()
+
+        for segment in list(_released_segments):
+            try:
+                segment.close()
+                _released_segments.remove(segment)
+            except BufferError:
+                pass
@@ -4,6 +4,9 @@ This module contains some utility classes and functions.
 """
 
 from .layer import Layer
+from .cache import DiskCache, MemoryCache
 from .is_valid_layer import is_valid_layer
+from .stack_images import stack_images
+from .view import materialize
 
-__all__ = ["Layer", "is_valid_layer"]
+__all__ = ["Layer", "DiskCache", "MemoryCache", "is_valid_layer", "stack_images", "materialize"]
@@ -0,0 +1,86 @@
+"""Affine helpers are used by the geometric layers to describe their transformation as a 3x3 matrix.
+
+The matrices map the pixel coordinates of the input image to the pixel coordinates of the output image, following the
+same pixel center convention as cv2.resize. Consecutive matrices can be multiplied together, so a chain of geometric
+layers can be applied with a single cv2.warpAffine call.
+"""
+import cv2
+import numpy as np
+
+__all__ = ["identity_matrix", "crop_resize_matrix", "flip_matrix", "rotation_matrix"]
+
+
+def identity_matrix():
+    """Return the matrix that leaves the image unchanged.
+
+    Returns:
+        ndarray: 3x3 identity matrix.
+    """
+    return np.eye(3)
+
+
+def crop_resize_matrix(x, y, crop_width, crop_height, width, height):
+    """Return the matrix that crops a region of the image and resizes it.
+
+    Args:
+        x (int): Starting column of the cropped region.
+        y (int): Starting row of the cropped region.
+        crop_width (int): Width of the cropped region.
+        crop_height (int): Height of the cropped region.
+        width (int): Width of the resized image.
+        height (int): Height of the resized image.
+
+    Returns:
+        ndarray: 3x3 matrix of the transformation, or None if the cropped region is empty.
+    """
+    if crop_width <= 0 or crop_height <= 0:
+        return None
+
+    scale_x = width / crop_width
+    scale_y = height / crop_height
+
+    return np.array(
+        [
+            [scale_x, 0.0, (0.5 - x) * scale_x - 0.5],
+            [0.0, scale_y, (0.5 - y) * scale_y - 0.5],
+            [0.0, 0.0, 1.0],
+        ]
+    )
+
+
+def flip_matrix(flip_code, width, height):
+    """Return the matrix that flips the image like cv2.flip.
+
+    Args:
+        flip_code (int): 0 to flip vertically, 1 to flip horizontally and -1 to flip both ways.
+        width (int): Width of the image.
+        height (int): Height of the image.
+
+    Returns:
+        ndarray: 3x3 matrix of the transformation.
+    """
+    matrix = np.eye(3)
+
+    if flip_code in (1, -1):
+        matrix[0] = [-1.0, 0.0, width - 1]
+
+    if flip_code in (0, -1):
+        matrix[1] = [0.0, -1.0, height - 1]
+
+    return matrix
+
+
+def rotation_matrix(angle, width, height):
+    """Return the matrix that rotates the image around its center.
+
+    Args:
+        angle (float): Angle of the rotation in degrees.
+        width (int): Width of the image.
+        height (int): Height of the image.
+
+    Returns:
+        ndarray: 3x3 matrix of the transformation.
+    """
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+
+    return np.vstack([matrix, [0.0, 0.0, 1.0]])
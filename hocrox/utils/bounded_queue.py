@@ -0,0 +1,56 @@
+"""BoundedQueue is used to hand items from background threads to a consumer that can stop early.
+
+The producers block while the queue is full, so they stay at most a bounded number of items ahead of the consumer.
+Once the consumer stops, the blocked producers are unblocked and told to stop, instead of waiting forever for a slot.
+"""
+import queue
+import threading
+
+__all__ = ["BoundedQueue"]
+
+"""Seconds a producer blocked on a full queue waits before checking again whether the consumer stopped."""
+PUT_TIMEOUT = 0.1
+
+
+class BoundedQueue:
+    """BoundedQueue is a bounded queue whose producers stop once the consumer stops."""
+
+    def __init__(self, maxsize):
+        """Init method for the BoundedQueue class.
+
+        Args:
+            maxsize (int): Maximum number of items in the queue.
+        """
+        self.__items = queue.Queue(maxsize)
+        self.__stopped = threading.Event()
+
+    def put(self, item):
+        """Add an item, waiting for a free slot as long as the consumer did not stop.
+
+        Args:
+            item (object): Item to add.
+
+        Returns:
+            bool: True if the item was added, False if the consumer stopped and the producer must stop too.
+        """
+        while not self.__stopped.is_set():
+            try:
+                self.__items.put(item, timeout=PUT_TIMEOUT)
+
+                return True
+            except queue.Full:
+                pass
+
+        return False
+
+    def get(self):
+        """Take the next item, waiting for one if the queue is empty.
+
+        Returns:
+            object: Next item.
+        """
+        return self.__items.get()
+
+    def stop(self):
+        """Tell the producers the consumer stopped, which unblocks the ones waiting for a free slot."""
+        self.__stopped.set()
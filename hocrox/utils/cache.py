@@ -0,0 +1,410 @@
+"""Cache classes for Hocrox library.
+
+A cache stores the images of a model under a key, so a later run can start from them instead of computing them again.
+"""
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+__all__ = ["DEFAULT_DISK_CACHE_SIZE", "DEFAULT_MEMORY_CACHE_SIZE", "DiskCache", "MemoryCache"]
+
+"""Default size budget of a DiskCache in bytes."""
+DEFAULT_DISK_CACHE_SIZE = 10 * 1024**3
+
+"""Default size budget of a MemoryCache in bytes."""
+DEFAULT_MEMORY_CACHE_SIZE = 2 * 1024**3
+
+"""Share of the size budget kept when a DiskCache evicts entries, so it does not evict on every new entry."""
+CACHE_EVICTION_TARGET = 0.9
+
+"""Extension of the entries of a DiskCache."""
+DISK_CACHE_EXTENSION = ".npz"
+
+"""Name of the file holding the size of the entries of a DiskCache, shared by the processes using its folder."""
+DISK_CACHE_SIZE_FILE = ".size"
+
+
+class DiskCache:
+    """DiskCache stores lists of images as files in a local folder, and evicts the least recently used ones.
+
+    Every entry is a single `.npz` file named after its key. Reading an entry updates the modification time of its
+    file, which gives the order of the entries across runs. The size of the entries is kept in a file of the folder,
+    updated under a file lock, so the worker processes of a model share the budget. Once the files take more than
+    max_bytes, the folder is scanned again and the least recently used entries are deleted. File locks are not
+    available on Windows, where the worker processes do not see the entries of each other until the next scan, so the
+    budget can be exceeded up to once per process.
+
+    Here is an example code to use the DiskCache class with a model.
+
+    ```python
+    from hocrox.model import Model
+    from hocrox.utils import DiskCache
+
+    # Initializing the model
+    model = Model()
+
+    ...
+    ...
+
+    # Cache the output of the preprocessing layers in a local folder of at most 20 GiB
+    model.transform(cache=DiskCache("./cache", max_bytes=20 * 1024**3))
+    ```
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_DISK_CACHE_SIZE):
+        """Init method for the DiskCache class.
+
+        Args:
+            path (str): Folder of the cache, created if it does not exist.
+            max_bytes (int, optional): Size budget of the cache in bytes. Defaults to 10 GiB.
+
+        Raises:
+            ValueError: If the path parameter is not valid.
+            ValueError: If the max_bytes parameter is not valid.
+        """
+        if not isinstance(path, str) or os.path.isfile(path):
+            raise ValueError(f"The value {path} for the argument path is not valid")
+
+        if not isinstance(max_bytes, int) or isinstance(max_bytes, bool) or max_bytes < 1:
+            raise ValueError(f"The value {max_bytes} for the argument max_bytes is not valid")
+
+        os.makedirs(path, exist_ok=True)
+
+        self.__path = path
+        self.__max_bytes = max_bytes
+        self.__checked = False
+        self.__hits = 0
+        self.__misses = 0
+        self.__lock = threading.Lock()
+
+    def __get_file(self, key):
+        """Return the path of the file of an entry.
+
+        Args:
+            key (str): Key of the entry.
+
+        Returns:
+            str: Path of the file.
+        """
+        return os.path.join(self.__path, f"{key}{DISK_CACHE_EXTENSION}")
+
+    @contextmanager
+    def __lock_folder(self):
+        """Lock the folder against the other threads and processes using the cache.
+
+        Yields:
+            file: File holding the size of the entries, shared by the processes.
+        """
+        with self.__lock, open(os.path.join(self.__path, DISK_CACHE_SIZE_FILE), "a+") as f:
+            # Released when the file is closed
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+            yield f
+
+    def __scan(self):
+        """List the entries of the folder, from the least to the most recently used one.
+
+        Returns:
+            list[tuple]: Key and size of every entry.
+        """
+        files = []
+
+        with os.scandir(self.__path) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(DISK_CACHE_EXTENSION):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        # Evicted by another process while the folder is scanned
+                        continue
+
+                    files.append((stat.st_mtime_ns, entry.name[: -len(DISK_CACHE_EXTENSION)], stat.st_size))
+
+        return [(key, size) for _, key, size in sorted(files)]
+
+    def get(self, key):
+        """Return the images stored under a key.
+
+        Args:
+            key (str): Key of the entry.
+
+        Returns:
+            list[ndarray]: Stored images, or None if the key is not in the cache.
+        """
+        file = self.__get_file(key)
+
+        # The budget can be smaller than the one of the run that filled the folder, so it is checked on first use
+        if not self.__checked:
+            with self.__lock_folder() as f:
+                self.__write_size(f, self.__evict())
+
+        try:
+            with np.load(file) as data:
+                images = [data[f"arr_{index}"] for index in range(len(data.files))]
+
+            os.utime(file)
+        except (OSError, ValueError, KeyError):
+            # Missing entries, and entries evicted or truncated by another process, are misses
+            with self.__lock:
+                self.__misses += 1
+
+            return None
+
+        with self.__lock:
+            self.__hits += 1
+
+        return images
+
+    def put(self, key, images):
+        """Store images under a key, and evict the least recently used entries if the cache is over its budget.
+
+        Args:
+            key (str): Key of the entry.
+            images (list[ndarray]): Images to store.
+        """
+        file = self.__get_file(key)
+        temporary_file = f"{file}.{uuid.uuid4().hex}.tmp"
+
+        # Written under another name first, so a reader never sees an incomplete entry
+        with open(temporary_file, "wb") as f:
+            np.savez(f, *images)
+
+        size = os.path.getsize(temporary_file)
+
+        with self.__lock_folder() as f:
+            try:
+                previous_size = os.path.getsize(file)
+            except FileNotFoundError:
+                previous_size = 0
+
+            os.replace(temporary_file, file)
+
+            f.seek(0)
+
+            try:
+                total = int(f.read()) + size - previous_size
+            except ValueError:
+                # The size is computed by the first put on the folder
+                total = None
+
+            if total is None or total > self.__max_bytes:
+                total = self.__evict()
+
+            self.__write_size(f, total)
+
+    def stats(self):
+        """Return the counters of the cache, the hits and misses are the ones of the current process.
+
+        Returns:
+            dict: Number of hits, misses and entries of the cache, and the bytes taken by the entries.
+        """
+        entries = self.__scan()
+
+        with self.__lock:
+            return {
+                "hits": self.__hits,
+                "misses": self.__misses,
+                "entries": len(entries),
+                "bytes": sum(size for _, size in entries),
+            }
+
+    def __write_size(self, f, total):
+        """Write the size of the entries to the shared size file, it must be called with the folder locked.
+
+        Args:
+            f (file): File holding the size of the entries.
+            total (int): Size of the entries.
+        """
+        f.seek(0)
+        f.truncate()
+        f.write(str(total))
+
+        self.__checked = True
+
+    def __evict(self):
+        """Delete the least recently used entries until the cache is back under its budget.
+
+        The folder is scanned again, so the entries stored by the other processes are counted. It must be called with
+        the folder locked.
+
+        Returns:
+            int: Size of the remaining entries.
+        """
+        entries = self.__scan()
+        total = sum(size for _, size in entries)
+
+        if total <= self.__max_bytes:
+            return total
+
+        target = self.__max_bytes * CACHE_EVICTION_TARGET
+
+        for key, size in entries:
+            if total <= target:
+                break
+
+            total -= size
+
+            try:
+                os.remove(self.__get_file(key))
+            except FileNotFoundError:
+                # Already deleted by hand
+                pass
+
+        return total
+
+    def __getstate__(self):
+        """Return the state of the cache for pickling.
+
+        Returns:
+            dict: State of the cache.
+        """
+        return {"path": self.__path, "max_bytes": self.__max_bytes}
+
+    def __setstate__(self, state):
+        """Restore the state of the cache after unpickling.
+
+        Args:
+            state (dict): State of the cache.
+        """
+        self.__path = state["path"]
+        self.__max_bytes = state["max_bytes"]
+        self.__checked = False
+        self.__hits = 0
+        self.__misses = 0
+        self.__lock = threading.Lock()
+
+
+class MemoryCache:
+    """MemoryCache keeps lists of images in memory, and evicts the least recently used ones.
+
+    The images are stored without a copy and made read-only, so the layers that follow can not change the cached
+    images. Views of larger images, like crops and flips, are copied first, so the budget counts every byte the cache
+    keeps alive. Once the images take more than max_bytes, the least recently used ones are dropped. The cache lives in
+    the current process, so it helps the sequential and thread executors and .flow(), where the images are read again
+    at every epoch. A copy sent to worker processes starts empty.
+
+    Here is an example code to use the MemoryCache class with a model.
+
+    ```python
+    from hocrox.model import Model
+    from hocrox.layer import Read
+    from hocrox.utils import MemoryCache
+
+    # Initializing the model
+    model = Model()
+
+    # Keep the decoded images in at most 4 GiB of memory
+    model.add(Read(path="./img", cache=MemoryCache(max_bytes=4 * 1024**3)))
+
+    ...
+    ...
+
+    for epoch in range(10):
+        for path, images in model.flow():
+            ...
+    ```
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MEMORY_CACHE_SIZE):
+        """Init method for the MemoryCache class.
+
+        Args:
+            max_bytes (int, optional): Size budget of the cache in bytes. Defaults to 2 GiB.
+
+        Raises:
+            ValueError: If the max_bytes parameter is not valid.
+        """
+        if not isinstance(max_bytes, int) or isinstance(max_bytes, bool) or max_bytes < 1:
+            raise ValueError(f"The value {max_bytes} for the argument max_bytes is not valid")
+
+        self.__max_bytes = max_bytes
+        self.__entries = OrderedDict()
+        self.__size = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__lock = threading.Lock()
+
+    def get(self, key):
+        """Return the images stored under a key.
+
+        Args:
+            key (str): Key of the entry.
+
+        Returns:
+            list[ndarray]: Stored images, or None if the key is not in the cache.
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+
+            if entry is None:
+                self.__misses += 1
+
+                return None
+
+            self.__hits += 1
+            self.__entries.move_to_end(key)
+
+        return list(entry[0])
+
+    def put(self, key, images):
+        """Store images under a key, and drop the least recently used entries if the cache is over its budget.
+
+        Images larger than the whole budget are not stored.
+
+        Args:
+            key (str): Key of the entry.
+            images (list[ndarray]): Images to store.
+        """
+        # Views, like crops and flips, would keep their whole base image alive without counting it
+        images = [image.copy() if image.base is not None else image for image in images]
+        size = sum(image.nbytes for image in images)
+
+        if size > self.__max_bytes:
+            return
+
+        for image in images:
+            image.setflags(write=False)
+
+        with self.__lock:
+            previous = self.__entries.pop(key, None)
+            self.__size += size - (previous[1] if previous is not None else 0)
+            self.__entries[key] = (images, size)
+
+            while self.__size > self.__max_bytes:
+                _, (_, evicted_size) = self.__entries.popitem(last=False)
+                self.__size -= evicted_size
+
+    def stats(self):
+        """Return the counters of the cache.
+
+        Returns:
+            dict: Number of hits, misses and entries of the cache, and the bytes taken by the entries.
+        """
+        with self.__lock:
+            return {"hits": self.__hits, "misses": self.__misses, "entries": len(self.__entries), "bytes": self.__size}
+
+    def __getstate__(self):
+        """Return the state of the cache for pickling, without the images.
+
+        Returns:
+            dict: State of the cache.
+        """
+        return {"max_bytes": self.__max_bytes}
+
+    def __setstate__(self, state):
+        """Restore the state of the cache after unpickling, with no images.
+
+        Args:
+            state (dict): State of the cache.
+        """
+        self.__init__(state["max_bytes"])
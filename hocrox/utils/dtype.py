@@ -0,0 +1,136 @@
+"""Dtype helpers are used by the layers to transform images without upcasting them to float64.
+
+The dtype of a model, given with Model(dtype=...), is the dtype of the images it outputs. The layers keep uint8 images
+uint8 for as long as it is mathematically valid, so the color layers can use their lookup tables, and only the layers
+that need floats, like Rescale, convert them. Float arithmetic runs in float32, float16 images are only converted at
+the output of the model as OpenCV can not process them. The images are cast to the dtype of the model when they are
+yielded by Model.flow() and when the Save layer writes them as arrays.
+"""
+import threading
+
+import cv2
+import numpy as np
+
+__all__ = ["DTYPES", "get_dtype", "cast_image", "shift_image", "scale_hsv"]
+
+"""Dtypes supported by the dtype policy of a model."""
+DTYPES = ("uint8", "float16", "float32")
+
+# Temporary buffers of the float paths, one per thread as the thread executor shares the layers between threads
+_scratch = threading.local()
+
+
+def get_dtype(dtype):
+    """Return the numpy dtype of a dtype policy.
+
+    Args:
+        dtype (str): Dtype policy, one of DTYPES, or None.
+
+    Returns:
+        dtype: Numpy dtype, or None if there is no policy.
+    """
+    return np.dtype(dtype) if dtype is not None else None
+
+
+def _get_buffer(name, shape, dtype):
+    """Return a temporary buffer of the current thread, reused as long as the shape and dtype do not change.
+
+    Args:
+        name (str): Name of the buffer.
+        shape (tuple): Shape of the buffer.
+        dtype (dtype): Dtype of the buffer.
+
+    Returns:
+        ndarray: Buffer with undefined content.
+    """
+    buffer = getattr(_scratch, name, None)
+
+    if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+        buffer = np.empty(shape, dtype)
+        setattr(_scratch, name, buffer)
+
+    return buffer
+
+
+def cast_image(image, dtype):
+    """Cast an image to a dtype, rounding and clipping floats to the range of uint8.
+
+    Args:
+        image (ndarray): Image to cast.
+        dtype (dtype): Dtype of the result, None keeps the image unchanged.
+
+    Returns:
+        ndarray: Image of the given dtype, the image itself if it already has it.
+    """
+    if dtype is None or not isinstance(image, np.ndarray) or image.dtype == dtype:
+        return image
+
+    if dtype == np.uint8 and image.dtype.kind == "f":
+        image = np.rint(image)
+        np.clip(image, 0, 255, out=image)
+
+    return image.astype(dtype)
+
+
+def shift_image(img, value):
+    """Add a value to every channel of an image that is not uint8, clipping the result to the range of uint8.
+
+    The image is clipped before the value is added, so the result never leaves the dtype of the image. Float images
+    keep their dtype, other integer images are converted to uint8.
+
+    Args:
+        img (ndarray): Image or batch of images.
+        value (float): Value to add.
+
+    Returns:
+        ndarray: Updated image.
+    """
+    kind = img.dtype.kind
+
+    # Fractional values are added in float32, the result is truncated like the lookup table of uint8 images does
+    if kind != "f" and value != int(value):
+        img = img.astype(np.float32)
+
+    low = -value if img.dtype.kind in "fi" else max(-value, 0)
+
+    shifted = np.clip(img, low, 255 - value)
+
+    # Subtracted when negative, so the value stays in the range of unsigned dtypes
+    if value >= 0:
+        shifted += value
+    else:
+        shifted -= -value
+
+    return shifted if kind == "f" else shifted.astype(np.uint8)
+
+
+def scale_hsv(img, value):
+    """Scale the saturation and value channels of a BGR image that is not uint8.
+
+    The HSV representation is computed in float32, in a buffer reused by the next images of the same shape. Float images
+    keep their dtype, other integer images are converted to uint8.
+
+    Args:
+        img (ndarray): Image to change.
+        value (float): Factor of the saturation and value channels.
+
+    Returns:
+        ndarray: Updated image.
+    """
+    dtype = img.dtype if img.dtype.kind == "f" else np.dtype(np.uint8)
+
+    if img.dtype != np.float32:
+        bgr = _get_buffer("bgr", img.shape, np.float32)
+        np.copyto(bgr, img, casting="unsafe")
+        img = bgr
+
+    hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV, dst=_get_buffer("hsv", img.shape, np.float32))
+
+    # Float saturations range from 0 to 1, values keep the range of the image up to the one of uint8
+    saturation, brightness = hsv[:, :, 1], hsv[:, :, 2]
+    np.multiply(saturation, value, out=saturation)
+    np.minimum(saturation, 1, out=saturation)
+    np.multiply(brightness, value, out=brightness)
+    np.minimum(brightness, 255, out=brightness)
+
+    return cast_image(cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR), dtype)
@@ -1,6 +1,11 @@
 """Layer class is used to make layers for Hocrox."""
+import hashlib
 import random
 
+import numpy as np
+
+from .dtype import get_dtype
+
 __all__ = ["Layer"]
 
 
@@ -83,6 +88,15 @@ class Layer:
         "random_vertical_shift",
     ]
 
+    """Flag to mark layers that can transform a batch of images. These layers receive a single (N, H, W, C) ndarray
+    instead of a list of images when the model runs in batch mode, and must return an ndarray with the same number of
+    images."""
+    SUPPORTS_BATCH = False
+
+    """Flag to mark layers whose output only depends on their input and their parameters, like most preprocessing
+    layers. The run of such layers that directly follows the read layer can be cached, check DiskCache."""
+    DETERMINISTIC = False
+
     def __init__(self, name, type, supported_parent_layer, parameter_str, bypass_validation=False):
         """Init method for Layer class.
 
@@ -123,6 +137,9 @@ class Layer:
         self.__supported_parent_layer = supported_parent_layer
         self.__parameter_str = parameter_str
         self.__bypass_validation = bypass_validation
+        self.__seed = None
+        self.__index = 0
+        self.__dtype = None
 
     def _get_description(self):
         """Return the description string of the layer.
@@ -164,6 +181,151 @@ class Layer:
         """
         return self.__type
 
+    def _get_number_of_outputs(self):
+        """Return the number of images the layer outputs for each input image.
+
+        Returns:
+            int: Number of outputs, augmentation layers override it with their number_of_outputs.
+        """
+        return 1
+
+    def _needs_sources(self):
+        """Check if the layer needs the full list of images before the transformation starts.
+
+        Returns:
+            bool: True if the model must call _prepare() before running, else False.
+        """
+        return False
+
+    def _prepare(self, sources, fanout, resume=False):
+        """Prepare the layer before the transformation starts, only called when a layer of the model needs it.
+
+        Args:
+            sources (list): Names of every image returned by the read layer.
+            fanout (int): Number of images the layer receives for each source image.
+            resume (bool, optional): Whether the transformation resumes from a checkpoint, so the output of the
+                interrupted run must be kept. Defaults to False.
+        """
+
+    def _flush(self):
+        """Finish the pending work of the layer, called by the model once all the images are transformed.
+
+        Layers that work in the background, like the Save layer writing files, wait for it here and raise its errors.
+        Most layers have nothing to flush.
+        """
+
+    def _close(self):
+        """Release what the layer keeps open across flushes, called once a run is done with the layer.
+
+        It is called by the model after the last flush, and by each worker process of the process executor when it
+        exits. Layers like the Save layer writing shards close their files here. Most layers have nothing to close.
+        """
+
+    def _pop_outputs(self):
+        """Return the files written by the layer since the last call, used by incremental transforms.
+
+        Returns:
+            dict: Paths of the files written for each image series, empty for the layers that do not write files.
+        """
+        return {}
+
+    def _get_params(self):
+        """Return the parameters of the layer that change its output, used to fingerprint the model.
+
+        Layers return the arguments of their constructor, but not the state they build while running, so a model keeps
+        its fingerprint after a run. Layers that do not override it return None, and are fingerprinted from their own
+        attributes instead.
+
+        Returns:
+            dict: Parameters of the layer, or None if the layer does not declare them.
+        """
+        return None
+
+    def _get_random_state(self):
+        """Return the seed of the model and the index of the layer in the model, which decide its random numbers.
+
+        Returns:
+            tuple: Seed of the model, None without a seed, and index of the layer.
+        """
+        return self.__seed, self.__index
+
+    def _set_random_state(self, seed, index):
+        """Set the seed of the model and the index of the layer in the model, called by the model in model.add().
+
+        Args:
+            seed (int): Seed of the model, None to seed the generators from the global random module.
+            index (int): Index of the layer in the model.
+        """
+        self.__seed = seed
+        self.__index = index
+
+    def _set_dtype(self, dtype):
+        """Set the dtype policy of the model, called by the model in model.add().
+
+        Args:
+            dtype (str): Dtype of the images output by the model, None to keep the dtype of the images.
+        """
+        self.__dtype = dtype
+
+    def _get_dtype(self):
+        """Return the dtype policy of the model, layers that have to change the dtype of the images convert to it.
+
+        Returns:
+            dtype: Numpy dtype of the images output by the model, or None if the model has no dtype policy.
+        """
+        return get_dtype(self.__dtype)
+
+    def __setstate__(self, state):
+        """Restore the state of the layer after unpickling.
+
+        Layers pickled by older versions of Hocrox miss the attributes added since, they get their default values.
+
+        Args:
+            state (dict): State of the layer.
+        """
+        state.setdefault("_Layer__seed", None)
+        state.setdefault("_Layer__index", 0)
+        state.setdefault("_Layer__dtype", None)
+
+        self.__dict__.update(state)
+
+    def _get_generator(self, name, input_index):
+        """Return the random generator of one input image of the layer.
+
+        With a seed, every (image name, layer index, input index) gets its own numpy.random.Generator, so an image is
+        augmented the same way whatever the executor, the number of workers or the order of the images. The layer
+        draws the parameters of all the outputs of the input image from it at once.
+
+        Args:
+            name (str): Name of the image series.
+            input_index (int): Index of the input image among the images the layer receives for the series.
+
+        Returns:
+            numpy.random.Generator: Random generator, seeded from the global random module when the model has no seed.
+        """
+        if self.__seed is None:
+            return np.random.default_rng(random.getrandbits(64))
+
+        # The whole digest of the name goes into the seed, a 32-bit checksum would give colliding names the same
+        # augmentations on datasets of a few hundred thousand images
+        name_words = np.frombuffer(hashlib.sha256(str(name).encode()).digest(), dtype="<u4").tolist()
+
+        return np.random.default_rng([self.__seed, *name_words, self.__index, input_index])
+
+    @staticmethod
+    def _get_probabilities(rate, generator, size):
+        """Based on the probability rate, it determines whether each of the outputs of an image is transformed.
+
+        Args:
+            rate (float): Rate of the probability
+            generator (numpy.random.Generator): Generator to draw from.
+            size (int): Number of outputs.
+
+        Returns:
+            ndarray: Array of booleans based on the probability rate.
+        """
+        return generator.uniform(0, 101, size) <= rate * 100
+
     @staticmethod
     def _get_probability(rate):
         """Based on the probability rate, it determines whether to return True or False.
@@ -0,0 +1,102 @@
+"""LUT helpers are used by the color layers to transform uint8 images with lookup tables.
+
+Pointwise color changes of uint8 images only have 256 possible inputs per channel, so they are computed once on a
+256 entry table and applied on the image with cv2.LUT, instead of running float arithmetic on every pixel. Tables of
+consecutive layers working in the same color space can be composed into a single table.
+"""
+import cv2
+import numpy as np
+
+__all__ = ["shift_lut", "brightness_lut", "rescale_lut", "compose_luts", "apply_lut", "apply_hsv_lut"]
+
+
+def shift_lut(value):
+    """Return the table that adds a value to every channel of a BGR image.
+
+    Args:
+        value (float): Value to add.
+
+    Returns:
+        ndarray: Table of shape (256,).
+    """
+    return np.clip(np.arange(256) + value, 0, 255).astype(np.uint8)
+
+
+def brightness_lut(value):
+    """Return the table that scales the saturation and value channels of an HSV image.
+
+    Args:
+        value (float): Brightness factor.
+
+    Returns:
+        ndarray: Table of shape (256, 1, 3), the hue channel is left unchanged.
+    """
+    identity = np.arange(256)
+    scaled = np.clip(identity * value, 0, 255)
+
+    return np.stack([identity, scaled, scaled], axis=1).astype(np.uint8).reshape(256, 1, 3)
+
+
+def rescale_lut(value):
+    """Return the table that multiplies every channel of a BGR image, rounding and clipping to the range of uint8.
+
+    Args:
+        value (float): Rescale factor.
+
+    Returns:
+        ndarray: Table of shape (256,).
+    """
+    return np.clip(np.rint(np.arange(256) * value), 0, 255).astype(np.uint8)
+
+
+def compose_luts(first, second):
+    """Compose two tables, the result applies first and then second.
+
+    Args:
+        first (ndarray): Table applied first, None stands for the identity table.
+        second (ndarray): Table applied second, None stands for the identity table.
+
+    Returns:
+        ndarray: Composed table.
+    """
+    if first is None:
+        return second
+
+    if second is None:
+        return first
+
+    return np.take_along_axis(second, first.astype(np.intp), axis=0)
+
+
+def apply_lut(img, lut):
+    """Apply a table on an image or on a batch of images.
+
+    Args:
+        img (ndarray): Image or batch of images of dtype uint8.
+        lut (ndarray): Table to apply.
+
+    Returns:
+        ndarray: Updated image.
+    """
+    if img.ndim <= 3:
+        return cv2.LUT(img, lut)
+
+    # OpenCV only understands 2D images, so the batch is seen as one tall image
+    batch = np.ascontiguousarray(img)
+
+    return cv2.LUT(batch.reshape(-1, *batch.shape[2:]), lut).reshape(batch.shape)
+
+
+def apply_hsv_lut(img, lut):
+    """Apply a table on the HSV representation of a BGR image.
+
+    Args:
+        img (ndarray): BGR image of dtype uint8.
+        lut (ndarray): Table of shape (256, 1, 3) to apply on the HSV image.
+
+    Returns:
+        ndarray: Updated BGR image.
+    """
+    hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+
+    return cv2.cvtColor(cv2.LUT(hsv, lut), cv2.COLOR_HSV2BGR)
@@ -0,0 +1,230 @@
+"""Probe helpers read the dimensions of an image from its header, without decoding it.
+
+Only the first bytes of the file are read, so the size of an image is known before paying for the full decode. This is
+used by the Read layer to pick how much an image can be downscaled while it is decoded, and to skip the files that are
+not images or are truncated before they enter the model.
+"""
+import io
+import os
+import struct
+
+__all__ = ["probe_image", "probe_image_size"]
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+JPEG_SIGNATURE = b"\xff\xd8"
+
+"""JPEG start of frame markers, which hold the dimensions of the image."""
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+"""JPEG markers that are not followed by a length."""
+JPEG_STANDALONE_MARKERS = {0x01, 0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7, 0xD8}
+
+"""JPEG end of image marker, which ends every complete JPEG file."""
+JPEG_END_MARKER = b"\xff\xd9"
+
+"""PNG chunk type of the last chunk of every complete PNG file."""
+PNG_END_CHUNK = b"IEND"
+
+"""Magic bytes of the other image formats cv2.imread can decode, checked at the start of the file."""
+IMAGE_SIGNATURES = (
+    (b"BM", "bmp"),
+    (b"II*\x00", "tiff"),
+    (b"MM\x00*", "tiff"),
+    (b"\x00\x00\x00\x0cjP  \r\n\x87\n", "jp2"),
+    (b"\xffO\xffQ", "jp2"),
+    (b"\x59\xa6\x6a\x95", "ras"),
+    (b"v/1\x01", "exr"),
+    (b"#?RADIANCE", "hdr"),
+    (b"#?RGBE", "hdr"),
+)
+
+"""Number of bytes read at the start of a file to find its format."""
+HEADER_SIZE = 16
+
+"""Number of bytes read at the end of a file to find the end marker of its format, which can be followed by padding."""
+TAIL_SIZE = 1024
+
+
+def _png_size(f):
+    """Read the dimensions of a PNG image from its IHDR chunk.
+
+    Args:
+        f (file): Image file, positioned after the signature.
+
+    Returns:
+        tuple: Width and height of the image, or None if the header is not valid.
+    """
+    header = f.read(16)
+
+    if len(header) < 16 or header[4:8] != b"IHDR":
+        return None
+
+    return struct.unpack(">II", header[8:16])
+
+
+def _jpeg_size(f):
+    """Read the dimensions of a JPEG image from its start of frame segment.
+
+    Args:
+        f (file): Image file, positioned after the signature.
+
+    Returns:
+        tuple: Width and height of the image, or None if the header is not valid.
+    """
+    while True:
+        byte = f.read(1)
+
+        # Segments start with 0xFF, possibly repeated as padding
+        if byte != b"\xff":
+            return None
+
+        while byte == b"\xff":
+            byte = f.read(1)
+
+        if not byte:
+            return None
+
+        marker = byte[0]
+
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+
+        length = f.read(2)
+
+        if len(length) < 2:
+            return None
+
+        (length,) = struct.unpack(">H", length)
+
+        if marker in JPEG_SOF_MARKERS:
+            segment = f.read(5)
+
+            if len(segment) < 5:
+                return None
+
+            height, width = struct.unpack(">HH", segment[1:5])
+
+            return width, height
+
+        f.seek(length - 2, 1)
+
+
+def probe_image_size(source):
+    """Read the dimensions of a JPEG or PNG image from its header.
+
+    Args:
+        source (str | bytes): Path of the image, or the encoded image itself.
+
+    Returns:
+        tuple: Width and height of the image, or None if the format is not supported or the header is not valid.
+    """
+    try:
+        with io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else open(source, "rb") as f:
+            signature = f.read(8)
+
+            if signature.startswith(JPEG_SIGNATURE):
+                f.seek(len(JPEG_SIGNATURE))
+
+                return _jpeg_size(f)
+
+            if signature == PNG_SIGNATURE:
+                return _png_size(f)
+    except OSError:
+        return None
+
+    return None
+
+
+def _get_format(header):
+    """Find the format of an image from its magic bytes.
+
+    Args:
+        header (bytes): First bytes of the file.
+
+    Returns:
+        str: Format of the image, or None if the file is not an image cv2.imread can decode.
+    """
+    if header.startswith(JPEG_SIGNATURE + b"\xff"):
+        return "jpeg"
+
+    if header.startswith(PNG_SIGNATURE):
+        return "png"
+
+    if header.startswith(b"RIFF") and header[8:12] == b"WEBP":
+        return "webp"
+
+    # PBM, PGM, PPM and PAM images start with P1 to P7 followed by a whitespace
+    if header[:1] == b"P" and header[1:2] in (b"1", b"2", b"3", b"4", b"5", b"6", b"7") and header[2:3].isspace():
+        return "pnm"
+
+    for signature, image_format in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return image_format
+
+    return None
+
+
+def _check_image(f, size):
+    """Check the header and the end of an image file.
+
+    Args:
+        f (file): Image file, positioned at its start.
+        size (int): Size of the file in bytes.
+
+    Returns:
+        str: Reason the file is skipped, or None if the file looks like a complete image.
+    """
+    if size == 0:
+        return "empty file"
+
+    header = f.read(HEADER_SIZE)
+    image_format = _get_format(header)
+
+    if image_format is None:
+        return "not an image"
+
+    if image_format == "bmp":
+        # The header of BMP images holds the size of the file
+        return "truncated file" if len(header) < 6 or struct.unpack("<I", header[2:6])[0] > size else None
+
+    if image_format not in ("jpeg", "png"):
+        return None
+
+    if image_format == "jpeg":
+        f.seek(len(JPEG_SIGNATURE))
+        dimensions, end_marker = _jpeg_size(f), JPEG_END_MARKER
+    else:
+        f.seek(len(PNG_SIGNATURE))
+        dimensions, end_marker = _png_size(f), PNG_END_CHUNK
+
+    if dimensions is None or 0 in dimensions:
+        return "invalid header"
+
+    f.seek(max(size - TAIL_SIZE, 0))
+
+    return None if end_marker in f.read(TAIL_SIZE) else "truncated file"
+
+
+def probe_image(source):
+    """Check that a file is a complete image from its first and last bytes, without decoding it.
+
+    The format is found from the magic bytes of the file. The dimensions of JPEG and PNG images are read from their
+    header, and their end marker must be in the last bytes of the file, which catches most truncated downloads.
+
+    Args:
+        source (str | bytes): Path of the image, or the encoded image itself.
+
+    Returns:
+        str: Reason the file must be skipped, like "empty file", "not an image", "invalid header" or "truncated file",
+            or None if the file looks like a complete image.
+    """
+    try:
+        if isinstance(source, (bytes, bytearray)):
+            with io.BytesIO(source) as f:
+                return _check_image(f, len(source))
+
+        with open(source, "rb") as f:
+            return _check_image(f, os.fstat(f.fileno()).st_size)
+    except OSError as e:
+        return f"unreadable file: {e.strerror or e}"
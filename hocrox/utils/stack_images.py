@@ -0,0 +1,26 @@
+"""stack_images method is used to turn a list of images into a batch."""
+import numpy as np
+
+
+def stack_images(images):
+    """Stack a list of images into one contiguous batch of shape (N, H, W, C).
+
+    Layers that support batches receive the images in this form, so they can transform all of them with a single
+    vectorized operation. It should be used when building custom layers that support batches.
+
+    Args:
+        images (list[ndarray]): List of images to stack.
+
+    Returns:
+        ndarray: Batch of images, or None if the list is empty or the images do not share the same shape and dtype.
+    """
+    if len(images) == 0:
+        return None
+
+    first = images[0]
+
+    for image in images:
+        if not isinstance(image, np.ndarray) or image.shape != first.shape or image.dtype != first.dtype:
+            return None
+
+    return np.stack(images)
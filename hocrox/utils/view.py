@@ -0,0 +1,47 @@
+"""View helpers are used by the layers that can return views of their input images instead of new images.
+
+Flips and crops only change the order or the range of the pixels, so they are returned as strided views of the input
+image without copying it, and a chain of such layers does not allocate at all. The pixels are only copied once, by the
+first layer that needs contiguous memory. OpenCV functions copy strided views on their own, the Save layer writes them
+as they are, and the images yielded by Model.flow() are materialized so they can be used by any consumer.
+"""
+import numpy as np
+
+__all__ = ["flip_view", "materialize"]
+
+
+def flip_view(image, flip):
+    """Flip an image like cv2.flip, but return a view of the image instead of a new image.
+
+    Args:
+        image (ndarray): Image to flip.
+        flip (int): Flip code of cv2.flip, 0 flips vertically, a positive code flips horizontally and a negative code
+            flips both ways.
+
+    Returns:
+        ndarray: Flipped view of the image.
+    """
+    if flip == 0:
+        return image[::-1]
+
+    if flip > 0:
+        return image[:, ::-1]
+
+    return image[::-1, ::-1]
+
+
+def materialize(image):
+    """Copy a flipped view into a new contiguous image, as some consumers like torch.from_numpy need positive strides.
+
+    It should be used by custom layers that need contiguous memory.
+
+    Args:
+        image (ndarray): Image to materialize.
+
+    Returns:
+        ndarray: The image, or a contiguous copy of it when it has negative strides.
+    """
+    if isinstance(image, np.ndarray) and any(stride < 0 for stride in image.strides):
+        return np.ascontiguousarray(image)
+
+    return image
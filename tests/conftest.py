@@ -0,0 +1,27 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def images(tmp_path):
+    """Write a few random images to a folder.
+
+    Args:
+        tmp_path (Path): Temporary folder of the test.
+
+    Returns:
+        str: Path of the folder of the images.
+    """
+    path = os.path.join(tmp_path, "img")
+    os.makedirs(path)
+
+    rng = np.random.default_rng(0)
+
+    for index in range(6):
+        image = rng.integers(0, 256, (24 + index, 32, 3), dtype=np.uint8)
+        cv2.imwrite(os.path.join(path, f"{index}.png"), image)
+
+    return path
@@ -0,0 +1,60 @@
+import os
+from multiprocessing import Pool
+
+import numpy as np
+
+from hocrox.layer import Read
+from hocrox.layer.augmentation.flip import RandomFlip
+from hocrox.layer.preprocessing.transformation import Resize
+from hocrox.model import Model
+from hocrox.utils import DiskCache
+
+MAX_BYTES = 200 * 1024
+
+
+def _fill(args):
+    cache, worker = args
+
+    for index in range(40):
+        cache.put(f"{worker}-{index}", [np.full((64, 64, 3), index, dtype=np.uint8)])
+
+
+def _get_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path) if name.endswith(".npz"))
+
+
+def test_disk_cache_budget_is_shared_by_processes(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=MAX_BYTES)
+
+    with Pool(4) as pool:
+        pool.map(_fill, [(cache, worker) for worker in range(4)])
+
+    assert 0 < _get_size(tmp_path) <= MAX_BYTES
+    assert cache.stats()["bytes"] == _get_size(tmp_path)
+
+
+def test_disk_cache_evicts_the_least_recently_used_entries(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=MAX_BYTES)
+    image = np.zeros((64, 64, 3), dtype=np.uint8)
+
+    cache.put("first", [image])
+
+    for index in range(40):
+        cache.put(str(index), [image])
+        assert cache.get("first") is not None
+
+    assert cache.get("0") is None
+    assert _get_size(tmp_path) <= MAX_BYTES
+
+
+def test_prefix_cache_is_shared_by_seeds(images, tmp_path):
+    cache = DiskCache(str(tmp_path / "cache"))
+
+    for seed in (1, 2):
+        model = Model(seed=seed)
+        model.add(Read(path=images))
+        model.add(Resize((8, 8)))
+        model.add(RandomFlip(probability=0.5))
+        list(model.flow(cache=cache))
+
+    assert cache.stats()["hits"] == 6
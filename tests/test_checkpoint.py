@@ -0,0 +1,51 @@
+import os
+
+import numpy as np
+
+from hocrox.layer import Read, Save
+from hocrox.layer.augmentation.flip import RandomFlip
+from hocrox.layer.preprocessing.transformation import Resize
+from hocrox.model import Model
+from hocrox.model.manifest import fingerprint_layers
+
+
+def _get_model(images, output):
+    model = Model(seed=7)
+    model.add(Read(path=images))
+    model.add(Resize((8, 8)))
+    model.add(RandomFlip(probability=0.5, number_of_outputs=2))
+    model.add(Save(output, format="memmap", shape=(8, 8, 3)))
+
+    return model
+
+
+def test_fingerprint_does_not_change_after_a_run(images, tmp_path):
+    output = os.path.join(tmp_path, "out")
+    os.makedirs(output)
+
+    model = _get_model(images, output)
+    layers = model._Model__layers
+    before = fingerprint_layers(layers)
+
+    model.transform()
+
+    assert fingerprint_layers(layers) == before
+
+
+def test_resume_in_the_same_process(images, tmp_path):
+    output = os.path.join(tmp_path, "out")
+    checkpoint = os.path.join(tmp_path, "transform.ckpt")
+    os.makedirs(output)
+
+    model = _get_model(images, output)
+    model.transform(checkpoint=checkpoint)
+
+    path = os.path.join(output, "Save Layer.npy")
+    expected = np.load(path)
+
+    # The model object that ran the transformation is resumed, along with a new one
+    model.transform(checkpoint=checkpoint, resume=True)
+    np.testing.assert_array_equal(np.load(path), expected)
+
+    _get_model(images, output).transform(checkpoint=checkpoint, resume=True)
+    np.testing.assert_array_equal(np.load(path), expected)
@@ -0,0 +1,77 @@
+import itertools
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from hocrox.layer import Read
+from hocrox.layer.augmentation.flip import RandomFlip
+from hocrox.layer.augmentation.transformation import RandomRotate, RandomZoom
+from hocrox.layer.preprocessing.shift import HorizontalShift, VerticalShift
+from hocrox.layer.preprocessing.transformation import Rotate
+from hocrox.model import Model
+
+LAYERS = {
+    "random_zoom": lambda: RandomZoom(start=0.5, end=0.7, probability=1.0, number_of_outputs=2),
+    "horizontal_shift": lambda: HorizontalShift(0.4),
+    "vertical_shift": lambda: VerticalShift(-0.4),
+    "rotate": lambda: Rotate(45),
+    "random_rotate": lambda: RandomRotate(start_angle=30, end_angle=60, probability=1.0, number_of_outputs=2),
+    "random_flip": lambda: RandomFlip(probability=0.5, number_of_outputs=2),
+}
+
+
+@pytest.fixture
+def smooth_images(tmp_path):
+    """Write a few smooth images, the fused layers only interpolate them differently at sharp edges.
+
+    Args:
+        tmp_path (Path): Temporary folder of the test.
+
+    Returns:
+        str: Path of the folder of the images.
+    """
+    path = os.path.join(tmp_path, "smooth")
+    os.makedirs(path)
+
+    rng = np.random.default_rng(0)
+
+    for index in range(3):
+        # Bright images, so the black corners of the rotations differ from any part of the image
+        image = cv2.GaussianBlur(rng.random((96, 128, 3), dtype=np.float32), (0, 0), 8)
+        image = cv2.normalize(image, None, 128, 255, cv2.NORM_MINMAX)
+        cv2.imwrite(os.path.join(path, f"{index}.png"), image.astype(np.uint8))
+
+    return path
+
+
+def _flow(path, layers, compiled):
+    model = Model(seed=3)
+    model.add(Read(path=path))
+
+    for layer in layers:
+        model.add(LAYERS[layer]())
+
+    if compiled:
+        model.compile()
+
+    return dict(model.flow())
+
+
+@pytest.mark.parametrize("first, second", list(itertools.product(sorted(LAYERS), repeat=2)))
+def test_compiled_model_matches_the_model(smooth_images, first, second):
+    expected = _flow(smooth_images, [first, second], compiled=False)
+    actual = _flow(smooth_images, [first, second], compiled=True)
+
+    assert sorted(actual) == sorted(expected)
+
+    for name in expected:
+        assert len(actual[name]) == len(expected[name])
+
+        for actual_image, expected_image in zip(actual[name], expected[name]):
+            assert actual_image.shape == expected_image.shape
+
+            # A single resampling only interpolates the edges differently, it never shows other parts of the image
+            difference = np.abs(actual_image.astype(np.int16) - expected_image.astype(np.int16))
+            assert difference.max() <= 64
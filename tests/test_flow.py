@@ -0,0 +1,45 @@
+import gc
+import os
+import sys
+import weakref
+
+import cv2
+import numpy as np
+import pytest
+
+from hocrox.layer import Read
+from hocrox.model import Model
+from hocrox.model.transport import SHARED_MEMORY_AVAILABLE
+
+
+@pytest.mark.skipif(not SHARED_MEMORY_AVAILABLE, reason="shared memory needs Python 3.8")
+def test_kept_views_outlive_their_slots(tmp_path):
+    from multiprocessing import shared_memory
+
+    # The first chunks are sent through the pipes, while the size of the shared memory slots is unknown
+    for index in range(40):
+        cv2.imwrite(os.path.join(tmp_path, f"{index}.png"), np.full((16, 16, 3), index, dtype=np.uint8))
+
+    model = Model()
+    model.add(Read(path=str(tmp_path)))
+
+    errors = []
+    unraisablehook, sys.unraisablehook = sys.unraisablehook, errors.append
+
+    try:
+        kept = [image for _, images in model.flow(executor="process", workers=2) for image in images]
+
+        # At the exit of the interpreter, the slots can be collected before the views of the consumer
+        for finalizer in gc.get_objects():
+            if isinstance(finalizer, weakref.finalize):
+                info = finalizer.peek()
+
+                if info is not None and any(isinstance(arg, shared_memory.SharedMemory) for arg in info[2]):
+                    finalizer.detach()
+
+        gc.collect()
+    finally:
+        sys.unraisablehook = unraisablehook
+
+    assert not errors
+    assert sorted(int(image[0, 0, 0]) for image in kept) == list(range(40))
@@ -0,0 +1,22 @@
+import os
+
+from hocrox.layer import Read, Save
+from hocrox.layer.preprocessing.transformation import Resize
+from hocrox.model import Model
+
+
+def test_gil_report_does_not_save_images(images, tmp_path):
+    output = os.path.join(tmp_path, "out")
+    os.makedirs(output)
+
+    model = Model()
+    model.add(Read(path=images))
+    model.add(Save(output, format="memmap", shape=(8, 8, 3)))
+    model.add(Resize((8, 8)))
+    model.add(Save(output))
+
+    report = model.gil_report(workers=2, samples=4)
+
+    assert "Resize" in report
+    assert "Save" not in report
+    assert os.listdir(output) == []
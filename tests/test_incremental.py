@@ -0,0 +1,65 @@
+import json
+import os
+
+from hocrox.layer import Read, Save
+from hocrox.layer.preprocessing.transformation import Resize
+from hocrox.model import Model
+from hocrox.model.manifest import MANIFEST_NAME
+
+
+def _transform(images, output, workers=1, writers=0):
+    model = Model()
+    model.add(Read(path=images, workers=workers))
+    model.add(Resize((8, 8)))
+    model.add(Save(output, writers=writers))
+    model.transform(incremental=True)
+
+
+def _get_mtimes(output):
+    names = [name for name in os.listdir(output) if name.endswith(".npy")]
+
+    return {name: os.stat(os.path.join(output, name)).st_mtime_ns for name in names}
+
+
+def test_execution_settings_keep_the_manifest(images, tmp_path):
+    output = os.path.join(tmp_path, "out")
+    os.makedirs(output)
+
+    _transform(images, output)
+    before = _get_mtimes(output)
+
+    _transform(images, output, workers=2, writers=2)
+
+    assert _get_mtimes(output) == before
+
+
+def test_deleted_outputs_are_transformed_again(images, tmp_path):
+    output = os.path.join(tmp_path, "out")
+    os.makedirs(output)
+
+    _transform(images, output)
+    before = _get_mtimes(output)
+
+    deleted = sorted(before)[0]
+    os.remove(os.path.join(output, deleted))
+
+    _transform(images, output)
+    after = _get_mtimes(output)
+
+    assert sorted(after) == sorted(before)
+    assert {name for name in after if after[name] != before[name]} == {deleted}
+
+
+def test_images_without_outputs_are_not_recorded(images, tmp_path):
+    output = os.path.join(tmp_path, "out")
+    os.makedirs(output)
+
+    # An empty file can not be decoded, so nothing is saved for it
+    open(os.path.join(images, "empty.png"), "wb").close()
+    _transform(images, output)
+
+    with open(os.path.join(output, MANIFEST_NAME)) as f:
+        sources = [json.loads(line).get("source") for line in f]
+
+    assert "empty.png" not in sources
+    assert "0.png" in sources
@@ -0,0 +1,22 @@
+from hocrox.layer.augmentation.flip import RandomFlip
+
+
+def test_generators_of_names_with_the_same_crc32_differ():
+    layer = RandomFlip()
+    layer._set_random_state(42, 1)
+
+    # Both names have the CRC-32 1306201125
+    first = layer._get_generator("plumless", 0).integers(0, 2**32, 4)
+    second = layer._get_generator("buckeroo", 0).integers(0, 2**32, 4)
+
+    assert first.tolist() != second.tolist()
+
+
+def test_generators_are_reproducible():
+    layer = RandomFlip()
+    layer._set_random_state(42, 1)
+
+    first = layer._get_generator("img/0.png", 3).integers(0, 2**32, 4)
+    second = layer._get_generator("img/0.png", 3).integers(0, 2**32, 4)
+
+    assert first.tolist() == second.tolist()
@@ -0,0 +1,38 @@
+import io
+import os
+import tarfile
+import zipfile
+
+from hocrox.layer import Read
+from hocrox.model import Model
+
+
+def _flow(path):
+    model = Model()
+    model.add(Read(path=path))
+
+    return {name: images for name, images in model.flow()}
+
+
+def test_empty_archive_members_are_skipped(images, tmp_path):
+    with open(os.path.join(images, "0.png"), "rb") as f:
+        data = f.read()
+
+    tar_path = os.path.join(tmp_path, "img.tar")
+    zip_path = os.path.join(tmp_path, "img.zip")
+
+    with tarfile.open(tar_path, "w") as archive:
+        for name, content in (("0.png", data), ("empty.png", b""), ("broken.png", b"not an image")):
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+
+    with zipfile.ZipFile(zip_path, "w") as archive:
+        archive.writestr("0.png", data)
+        archive.writestr("empty.png", b"")
+
+    for path in (tar_path, zip_path):
+        flow = _flow(path)
+
+        assert len(flow["0.png"]) == 1
+        assert flow["empty.png"] == []
@@ -0,0 +1,46 @@
+import glob
+import io
+import json
+import os
+
+import numpy as np
+
+from hocrox.layer import Read, Save
+from hocrox.layer.preprocessing.transformation import Resize
+from hocrox.model import Model
+
+
+def _read_shards(output):
+    images = []
+
+    for index in glob.glob(os.path.join(output, "index-*.jsonl")):
+        with open(index) as f:
+            for line in f:
+                entry = json.loads(line)
+
+                with open(os.path.join(output, entry["shard"]), "rb") as shard:
+                    shard.seek(entry["offset"])
+                    images.append(np.load(io.BytesIO(shard.read(entry["size"]))))
+
+    return images
+
+
+def test_shards_of_branches_and_runs_do_not_clash(images, tmp_path):
+    output = os.path.join(tmp_path, "out")
+    os.makedirs(output)
+
+    model = Model()
+    model.add(Read(path=images))
+
+    for size in (4, 8):
+        branch = model.branch()
+        branch.add(Resize((size, size)))
+        branch.add(Save(output, format="shard", shard_size=1024))
+
+    model.transform()
+    model.transform()
+
+    shapes = sorted(image.shape for image in _read_shards(output))
+
+    # 6 images saved by 2 branches in 2 runs
+    assert shapes == [(4, 4, 3)] * 12 + [(8, 8, 3)] * 12